@@ -0,0 +1,105 @@
+"""
+Compares the heap based search core against the original A*.
+
+The original implementation scanned the closed list and the open
+queue with ``any(...)`` for every neighbour. It is reproduced below
+using plain tuples instead of ``pyasge.Point2D`` so that it can run
+without pyasge; the algorithm is otherwise unchanged.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_astar
+"""
+from queue import PriorityQueue
+
+from benchmarks.common import SHIPPED_MAPS, load_tmx_costs, perfect_maze, random_grid, sample_queries, time_calls
+from game.Pathfinding.GridAStar import GridAStar
+from game.gameobjects.costgrid import CostGrid
+
+
+class LegacyNode:
+    def __init__(self, coord, parent=None, g=0, h=0):
+        self.coord = coord
+        self.parent = parent
+        self.g = g
+        self.h = h
+        self.f = g + h
+
+    def __lt__(self, other):
+        return self.f < other.f
+
+
+def legacy_find_path(costs, width, height, start, goal):
+    def heuristic(a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    def neighbours(coord):
+        result = []
+        for dx, dy in ((0, -1), (1, 0), (0, 1), (-1, 0)):
+            nx, ny = coord[0] + dx, coord[1] + dy
+            if 0 <= nx < width and 0 <= ny < height and costs[ny][nx] == 0:
+                result.append((nx, ny))
+        return result
+
+    open_list = PriorityQueue()
+    open_list.put((0, LegacyNode(start, g=0, h=heuristic(start, goal))))
+    closed = []
+    while not open_list.empty():
+        _, node = open_list.get()
+        if node.coord == goal:
+            path = []
+            while node is not None:
+                path.append(node.coord)
+                node = node.parent
+            path.reverse()
+            return path
+        closed.append(node)
+        for coord in neighbours(node.coord):
+            if any(closed_node.coord == coord for closed_node in closed):
+                continue
+            g = node.g + 1
+            neighbour = LegacyNode(coord, node, g, heuristic(coord, goal))
+            if not any(entry[1].coord == coord and entry[1].g <= g for entry in open_list.queue):
+                open_list.put((neighbour.f, neighbour))
+    return []
+
+
+def compare(label, costs, width, height, queries, legacy_queries=None):
+    search = GridAStar(CostGrid(costs))
+    legacy_queries = queries if legacy_queries is None else legacy_queries
+
+    for start, goal in legacy_queries:
+        new = search.search(start, goal)
+        old = legacy_find_path(costs, width, height, start, goal)
+        assert len(new) == len(old), f"{label}: path length mismatch for {start}->{goal}"
+
+    legacy_time = time_calls(lambda s, g: legacy_find_path(costs, width, height, s, g), legacy_queries)
+    heap_time = time_calls(search.search, legacy_queries, repeat=3)
+    print(f"{label:<28} {len(legacy_queries):>5} queries  legacy {legacy_time * 1000:9.2f} ms"
+          f"  heap {heap_time * 1000:8.2f} ms  speedup x{legacy_time / heap_time:7.1f}")
+
+    if legacy_queries is not queries:
+        heap_time = time_calls(search.search, queries)
+        print(f"{'':<28} {len(queries):>5} long queries (heap only) {heap_time * 1000 / len(queries):8.2f} ms/query")
+
+
+def main():
+    print("Shipped maps (random passable start/goal pairs)")
+    for name, tmx_file in SHIPPED_MAPS.items():
+        costs, width, height = load_tmx_costs(tmx_file)
+        compare(name, costs, width, height, sample_queries(costs, 200, seed=1))
+
+    # the legacy search is quadratic in explored tiles, so on the big
+    # grids it is only timed on short queries; the heap search also
+    # runs corner to corner style long queries
+    print("\nSynthetic 512x512 grids")
+    for label, costs in (("random 25% walls", random_grid(512, 512, 0.25, seed=2)),
+                         ("perfect maze", perfect_maze(511, 511, seed=3))):
+        height, width = len(costs), len(costs[0])
+        short = sample_queries(costs, 20, seed=4, max_steps=40)
+        long = sample_queries(costs, 10, seed=5)
+        compare(label, costs, width, height, long, legacy_queries=short)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Player pickup checks: scanning every entity vs the tile spatial hash.
+
+Thousands of coins are scattered over an open map and the player
+random-walks across it, one tile per step. After every step the brute
+force side tests the player against every coin, as `GamePlay` did
+before the spatial hash (collected ones included until their flag is
+checked); the hashed side only tests the coins filed around the
+player. Both collect exactly the same coins.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_collisions
+"""
+import random
+import time
+
+from game.simulation.spatialhash import SpatialHash
+from game.simulation.world import COIN_SIZE, LARGEST_SIZE, PLAYER_SIZE, World, coin_store
+
+TILE = (64, 64)
+MAP_TILES = 256
+STEPS = 2000
+COIN_COUNTS = (1000, 5000, 20000)
+
+
+def scatter(count, seed):
+    rng = random.Random(seed)
+    coins = coin_store()
+    for _ in range(count):
+        coins.add(x=rng.randrange(MAP_TILES) * TILE[0], y=rng.randrange(MAP_TILES) * TILE[1])
+    return coins
+
+
+def walk(seed):
+    rng = random.Random(seed)
+    x = y = MAP_TILES // 2
+    tiles = []
+    for _ in range(STEPS):
+        dx, dy = rng.choice(((0, -1), (1, 0), (0, 1), (-1, 0)))
+        x = min(max(x + dx, 0), MAP_TILES - 1)
+        y = min(max(y + dy, 0), MAP_TILES - 1)
+        tiles.append((x * TILE[0], y * TILE[1]))
+    return tiles
+
+
+def brute_force(coins, steps):
+    xs, ys, taken = coins.x.tolist(), coins.y.tolist(), coins.collected
+    collected = 0
+    for x, y in steps:
+        for coin in range(len(coins)):
+            if not taken[coin] and World.overlaps(x, y, PLAYER_SIZE, xs[coin], ys[coin], COIN_SIZE):
+                taken[coin] = True
+                collected += 1
+    return collected
+
+
+def hashed(coins, steps):
+    xs, ys, taken = coins.x.tolist(), coins.y.tolist(), coins.collected
+    index = SpatialHash(TILE, LARGEST_SIZE)
+    for coin in range(len(coins)):
+        index.insert(coin, xs[coin], ys[coin])
+    collected = 0
+    for x, y in steps:
+        for coin in index.query(x, y, *PLAYER_SIZE):
+            if World.overlaps(x, y, PLAYER_SIZE, xs[coin], ys[coin], COIN_SIZE):
+                taken[coin] = True
+                index.remove(coin)
+                collected += 1
+    return collected
+
+
+def main():
+    steps = walk(seed=1)
+    for count in COIN_COUNTS:
+        begin = time.perf_counter()
+        slow = brute_force(scatter(count, seed=count), steps)
+        brute_ms = (time.perf_counter() - begin) * 1000
+
+        begin = time.perf_counter()
+        fast = hashed(scatter(count, seed=count), steps)
+        hash_ms = (time.perf_counter() - begin) * 1000
+
+        assert slow == fast
+        print(f"{count:>6} coins  {STEPS} steps  brute force {brute_ms / STEPS * 1000:9.1f} us/step"
+              f"  hashed {hash_ms / STEPS * 1000:6.1f} us/step  x{brute_ms / hash_ms:7.1f}"
+              f"  ({fast} collected)")
+
+
+if __name__ == "__main__":
+    main()
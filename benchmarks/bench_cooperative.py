@@ -0,0 +1,75 @@
+"""
+Cooperative (windowed, reserved) routes vs independent routes for wandering enemies.
+
+Worlds on the shipped maps are ticked with a growing number of
+enemies, once with each enemy walking its route blind and once with
+every route fitted around the others by the `CooperativePlanner`.
+Reports the time per tick, how often enemies share a tile (sampled
+every few ticks, as a share of all enemy samples) and how the
+planner's windows were settled: taken straight from the route,
+searched in full, or searched part of the way.
+
+The mazes have one-tile corridors, so there is often no room to step
+aside; the open desert map shows the planner with room to work.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_cooperative
+"""
+import time
+
+import numpy as np
+
+from benchmarks.common import SHIPPED_MAPS, load_tmx_costs
+from game.gameobjects.costgrid import CostGrid
+from game.simulation.world import World
+
+RUNS = {"Maze": (10, 30, 100), "Maze2": (10, 30, 100), "Maze3": (10, 30, 100), "desert": (100, 300)}
+TICKS = 2000
+WARMUP_TICKS = 60
+SAMPLE_EVERY = 10
+
+
+def shared_tiles(world) -> int:
+    """How many enemies are on a tile with at least one other enemy."""
+    tiles = (world.enemies.y // world.tile_size[1]) * world.grid.width + world.enemies.x // world.tile_size[0]
+    _, counts = np.unique(tiles, return_counts=True)
+    return int(counts[counts > 1].sum())
+
+
+def run(name, count, cooperative):
+    costs, _, _ = load_tmx_costs(SHIPPED_MAPS[name])
+    world = World(CostGrid(costs), (64, 64), seed=count, cooperative=cooperative)
+    world.enemies.clear()
+    world.enemy_paths.clear()
+    world.enemy_routes.clear()
+    world.enemy_requests.clear()
+    world.enemy_index.clear()
+    world.init_enemies(count)
+    for _ in range(WARMUP_TICKS):
+        world.tick()
+
+    shared = samples = 0
+    begin = time.perf_counter()
+    for tick in range(TICKS):
+        world.tick()
+        if tick % SAMPLE_EVERY == 0:
+            shared += shared_tiles(world)
+            samples += count
+    elapsed = time.perf_counter() - begin
+    world.pathing.close()
+    return elapsed * 1000 / TICKS, shared / samples, world.cooperation
+
+
+def main():
+    print(f"{'map':<8} {'enemies':>7}  {'independent':>20}  {'cooperative':>20}  windows reused/fitted/partial")
+    for name, counts in RUNS.items():
+        for count in counts:
+            solo_ms, solo_shared, _ = run(name, count, False)
+            coop_ms, coop_shared, planner = run(name, count, True)
+            print(f"{name:<8} {count:>7}  {solo_ms:7.3f} ms {solo_shared:8.1%}  {coop_ms:7.3f} ms {coop_shared:8.1%}"
+                  f"  {planner.reused}/{planner.fitted}/{planner.partial}")
+
+
+if __name__ == "__main__":
+    main()
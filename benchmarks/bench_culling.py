@@ -0,0 +1,104 @@
+"""
+Sprite culling: submitting every entity vs looking the view up in the spatial hash.
+
+Thousands of coins are scattered over a large map and a 1080p camera
+pans across it. The unculled side submits every coin each frame, as
+`GamePlay.render` used to; a stub renderer just counts the calls. The
+culled side asks the coins' `SpatialHash` for the camera's view and
+submits only the coins that overlap it, the way `GamePlay.on_screen`
+does. Submissions drop in proportion to the share of the map in view.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_culling
+"""
+import random
+import time
+
+import numpy as np
+
+from game.simulation.spatialhash import SpatialHash
+from game.simulation.world import LARGEST_SIZE, coin_store
+
+TILE = (64, 64)
+VIEW = (1920, 1080)
+FRAMES = 300
+MAP_SIZES = (64, 256)
+COIN_COUNTS = (1000, 20000)
+
+
+class StubRenderer:
+    def __init__(self):
+        self.calls = 0
+
+    def render(self, sprite):
+        self.calls += 1
+
+
+def scatter(count, size, seed):
+    rng = random.Random(seed)
+    coins = coin_store()
+    index = SpatialHash(TILE, LARGEST_SIZE)
+    for _ in range(count):
+        x, y = rng.randrange(size) * TILE[0], rng.randrange(size) * TILE[1]
+        index.insert(coins.add(x=x, y=y), x, y)
+    return coins, index
+
+
+def camera_path(size, seed):
+    rng = random.Random(seed)
+    limit_x = size * TILE[0] - VIEW[0]
+    limit_y = size * TILE[1] - VIEW[1]
+    x, y = limit_x / 2, limit_y / 2
+    views = []
+    for _ in range(FRAMES):
+        x = min(max(x + rng.uniform(-40, 40), 0), limit_x)
+        y = min(max(y + rng.uniform(-40, 40), 0), limit_y)
+        views.append((x, y, x + VIEW[0], y + VIEW[1]))
+    return views
+
+
+def unculled(coins, views):
+    renderer = StubRenderer()
+    sprites = list(range(len(coins)))
+    for _ in views:
+        for sprite in sprites:
+            renderer.render(sprite)
+    return renderer.calls
+
+
+def culled(coins, index, views):
+    renderer = StubRenderer()
+    sprites = list(range(len(coins)))
+    for min_x, min_y, max_x, max_y in views:
+        keys = np.array(index.query(min_x, min_y, max_x - min_x, max_y - min_y), dtype=np.intp)
+        x = coins.x[keys]
+        y = coins.y[keys]
+        inside = (x + LARGEST_SIZE[0] > min_x) & (x < max_x) & (y + LARGEST_SIZE[1] > min_y) & (y < max_y)
+        for key in np.sort(keys[inside]).tolist():
+            renderer.render(sprites[key])
+    return renderer.calls
+
+
+def main():
+    for size in MAP_SIZES:
+        views = camera_path(size, seed=size)
+        in_view = VIEW[0] * VIEW[1] / (size * TILE[0] * size * TILE[1])
+        for count in COIN_COUNTS:
+            coins, index = scatter(count, size, seed=count)
+
+            begin = time.perf_counter()
+            every = unculled(coins, views)
+            every_ms = (time.perf_counter() - begin) * 1000
+
+            begin = time.perf_counter()
+            some = culled(coins, index, views)
+            culled_ms = (time.perf_counter() - begin) * 1000
+
+            print(f"{size:>4}x{size:<4} map ({100 * in_view:5.2f}% in view)  {count:>6} coins  "
+                  f"unculled {every / FRAMES:8.0f} submits {every_ms / FRAMES * 1000:8.1f} us/frame  "
+                  f"culled {some / FRAMES:7.1f} submits {culled_ms / FRAMES * 1000:7.1f} us/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Enemy bookkeeping per tick: one object per enemy vs component arrays.
+
+Many enemies walk long ready-made routes across an open map, so no
+path searches are made and only the per-tick bookkeeping is measured
+(thawing, the distance check and detection roll, speed ticks and
+stepping along the route). The object side loops over plain enemy
+objects the way `World.update_enemies` did before the entity stores;
+the array side ticks a real `World` whose enemies live in an
+`EntityStore`, handed its routes as compact paths the way the pathing
+returns them. Both move every enemy the same number of steps.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_entities
+"""
+import math
+import random
+import time
+
+import numpy as np
+
+from game.Pathfinding.CompactPath import EMPTY_PATH, compact_path
+from game.gameobjects.costgrid import CostGrid
+from game.simulation.world import World
+
+TILE = (64, 64)
+MAP_TILES = 128
+TICKS = 600
+ROUTE_LENGTH = 1000
+ENEMY_COUNTS = (10, 100, 1000, 5000)
+
+
+def routes(count, seed):
+    """A long back and forth walk along a random row for every enemy."""
+    rng = random.Random(seed)
+    walks = []
+    for _ in range(count):
+        row = rng.randrange(MAP_TILES)
+        walks.append([(abs((step % (2 * MAP_TILES - 2)) - (MAP_TILES - 1)), row) for step in range(ROUTE_LENGTH)])
+    return walks
+
+
+class Enemy:
+    def __init__(self, route):
+        self.x, self.y = route[0][0] * TILE[0], route[0][1] * TILE[1]
+        self.logic_state = 0
+        self.navigation_path = route
+        self.current_path_step = 0
+        self.detection_range = 5
+        self.movement_speed = 9
+        self.current_speed_tick = 0
+        self.frozen = False
+        self.freeze_time = 0
+
+
+def object_ticks(walks, player, seed):
+    rng = random.Random(seed)
+    enemies = [Enemy(list(route)) for route in walks]
+    clock = 0.0
+    steps = 0
+    for _ in range(TICKS):
+        clock += World.TIMESTEP
+        for enemy in enemies:
+            if enemy.frozen and clock > enemy.freeze_time:
+                enemy.frozen = False
+            if enemy.frozen:
+                continue
+
+            if math.hypot(enemy.x - player[0], enemy.y - player[1]) <= enemy.detection_range * TILE[0]:
+                enemy.logic_state = 1
+            elif rng.randint(0, 100) > 98:
+                enemy.logic_state = 0
+
+            if len(enemy.navigation_path) > 0:
+                enemy.current_speed_tick += 1
+                if enemy.current_speed_tick >= enemy.movement_speed:
+                    if enemy.current_path_step < len(enemy.navigation_path):
+                        tile = enemy.navigation_path[enemy.current_path_step]
+                        enemy.x, enemy.y = tile[0] * TILE[0], tile[1] * TILE[1]
+                        enemy.current_path_step += 1
+                        enemy.current_speed_tick = 0
+                        steps += 1
+    return steps
+
+
+def array_ticks(walks, seed):
+    world = World(CostGrid(np.zeros((MAP_TILES, MAP_TILES), dtype=np.int32)), TILE, seed=seed, cooperative=False)
+    world.enemies.clear()
+    world.enemy_paths.clear()
+    world.enemy_routes.clear()
+    world.enemy_requests.clear()
+    world.enemy_index.clear()
+    for route in walks:
+        world.enemy_paths.append(EMPTY_PATH)
+        world.enemy_routes.append(EMPTY_PATH)
+        world.enemy_requests.append(None)
+        index = world.enemies.add()
+        world.move_enemy(index, route[0])
+        world.assign_enemy_path(index, route)
+
+    for _ in range(TICKS):
+        world.clock += World.TIMESTEP
+        world.ticks += 1
+        world.update_enemies()
+    world.pathing.close()
+    return int(world.enemies.path_step.sum())
+
+
+def main():
+    player = (MAP_TILES // 2 * TILE[0], MAP_TILES // 2 * TILE[1])
+    for count in ENEMY_COUNTS:
+        walks = routes(count, seed=count)
+        compact = [compact_path(route) for route in walks]
+
+        begin = time.perf_counter()
+        slow = object_ticks(walks, player, seed=count)
+        object_ms = (time.perf_counter() - begin) * 1000
+
+        begin = time.perf_counter()
+        fast = array_ticks(compact, seed=count)
+        array_ms = (time.perf_counter() - begin) * 1000
+
+        assert slow == fast
+        print(f"{count:>5} enemies  {TICKS} ticks  objects {object_ms / TICKS * 1000:8.1f} us/tick"
+              f"  arrays {array_ms / TICKS * 1000:7.1f} us/tick  x{object_ms / array_ms:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
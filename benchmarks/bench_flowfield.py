@@ -0,0 +1,73 @@
+"""
+Per-frame cost of chasing the player: one A* per enemy vs a shared flow field.
+
+Each simulated frame the player steps to a new tile, which is the worst
+case for the flow field because it has to be rebuilt every frame. The
+A* side runs one search per chasing enemy, as `GamePlay.update_enemies`
+did before the flow field was added (no path cache, to match).
+
+Run from the repository root::
+
+    python -m benchmarks.bench_flowfield
+"""
+import random
+import time
+
+from benchmarks.common import load_tmx_costs, passable_tiles, random_grid
+from game.Pathfinding.FlowField import FlowField
+from game.Pathfinding.GridAStar import GridAStar
+from game.gameobjects.costgrid import CostGrid
+
+ENEMY_COUNTS = (10, 100, 1000)
+
+
+def player_walk(grid, frames, seed):
+    """A random walk over passable tiles, one tile per frame."""
+    rng = random.Random(seed)
+    tile = tuple(grid.passable_cells()[0].tolist())
+    walk = []
+    for _ in range(frames):
+        options = [(tile[0] + dx, tile[1] + dy) for bit, dx, dy in grid.DIRECTIONS
+                   if grid.neighbours[tile[1], tile[0]] & bit]
+        tile = rng.choice(options) if options else tile
+        walk.append(tile)
+    return walk
+
+
+def per_frame(label, costs, frames=5):
+    grid = CostGrid(costs)
+    astar = GridAStar(grid)
+    field = FlowField(grid)
+    tiles = passable_tiles(costs)
+    walk = player_walk(grid, frames, seed=1)
+
+    for count in ENEMY_COUNTS:
+        enemies = random.Random(count).choices(tiles, k=count)
+
+        # the A* side is slow at high counts, so it runs fewer frames
+        astar_frames = walk[:max(1, frames * 10 // count)]
+        begin = time.perf_counter()
+        for player in astar_frames:
+            for enemy in enemies:
+                astar.search(enemy, player)
+        astar_ms = (time.perf_counter() - begin) * 1000 / len(astar_frames)
+
+        begin = time.perf_counter()
+        for player in walk:
+            field.update(player)
+            for enemy in enemies:
+                field.next_step(*enemy)
+        field_ms = (time.perf_counter() - begin) * 1000 / len(walk)
+
+        print(f"{label:<22} {count:>5} enemies  A* {astar_ms:10.2f} ms/frame"
+              f"  flow field {field_ms:7.2f} ms/frame  x{astar_ms / field_ms:8.1f}")
+
+
+def main():
+    costs, _, _ = load_tmx_costs("./data/map/Maze.tmx")
+    per_frame("Maze (30x20)", costs)
+    per_frame("random 128x128", random_grid(128, 128, 0.25, seed=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Hierarchical planning (HPA*) vs flat A* on large maps.
+
+Reports the one-off cluster build time, the time to rebuild after a
+handful of tiles change, and the time and length of long cross-map
+queries. Flat A* is only run on a few queries at the larger sizes.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_hpa
+"""
+import random
+import time
+
+from benchmarks.common import random_grid, sample_queries
+from game.Pathfinding.GridAStar import GridAStar
+from game.Pathfinding.HPAStar import HierarchicalPlanner
+from game.gameobjects.costgrid import CostGrid
+
+
+def long_queries(costs, count, seed):
+    """Queries whose ends are at least half the map apart."""
+    size = len(costs)
+    return [(start, goal) for start, goal in sample_queries(costs, count * 20, seed=seed)
+            if abs(start[0] - goal[0]) + abs(start[1] - goal[1]) > size][:count]
+
+
+def run(size, density=0.2, queries=20, astar_queries=3):
+    costs = random_grid(size, size, density, seed=size)
+    grid = CostGrid(costs)
+
+    begin = time.perf_counter()
+    planner = HierarchicalPlanner(grid)
+    build = time.perf_counter() - begin
+
+    # toggle a few tiles and rebuild only their clusters
+    rng = random.Random(size)
+    cells = [(rng.randrange(size), rng.randrange(size)) for _ in range(4)]
+    for x, y in cells:
+        grid.costs[y, x] = 0 if grid.costs[y, x] else 10
+    grid.refresh()
+    begin = time.perf_counter()
+    planner.update_cells(cells)
+    update = time.perf_counter() - begin
+
+    astar = GridAStar(grid)
+    work = long_queries(costs, queries, seed=1)
+    for start, goal in work:
+        planner.search(start, goal)  # the first pass fills the refinement cache
+
+    begin = time.perf_counter()
+    hpa_length = sum(len(planner.search(start, goal)) for start, goal in work)
+    hpa_ms = (time.perf_counter() - begin) * 1000 / len(work)
+
+    begin = time.perf_counter()
+    astar_length = sum(len(astar.search(start, goal)) for start, goal in work[:astar_queries])
+    astar_ms = (time.perf_counter() - begin) * 1000 / astar_queries
+    hpa_sample = sum(len(planner.search(start, goal)) for start, goal in work[:astar_queries])
+
+    print(f"{size:>5}x{size:<5} build {build:7.2f} s  update {update * 1000:7.1f} ms"
+          f"  query HPA* {hpa_ms:8.2f} ms  A* {astar_ms:9.2f} ms"
+          f"  path length x{hpa_sample / max(astar_length, 1):5.3f} of optimal")
+    return hpa_length
+
+
+def main():
+    for size in (128, 256, 512, 1024):
+        run(size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Node expansions and query time of Jump Point Search vs A*.
+
+Every query is checked to return a path of the same length from both
+searches. ``desert`` is the open-field case (see `load_tmx_costs`),
+the Maze maps and the perfect maze are corridor mazes.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_jps
+"""
+from benchmarks.common import SHIPPED_MAPS, load_tmx_costs, perfect_maze, random_grid, sample_queries, time_calls
+from game.Pathfinding.GridAStar import GridAStar
+from game.Pathfinding.JumpPointSearch import GridJPS
+from game.gameobjects.costgrid import CostGrid
+
+
+def compare(label, costs, queries):
+    grid = CostGrid(costs)
+    astar = GridAStar(grid)
+    jps = GridJPS(grid)
+
+    astar_expanded = jps_expanded = 0
+    for start, goal in queries:
+        astar_path = astar.search(start, goal)
+        jps_path = jps.search(start, goal)
+        assert len(astar_path) == len(jps_path), f"{label}: length mismatch for {start}->{goal}"
+        astar_expanded += astar.nodes_expanded
+        jps_expanded += jps.nodes_expanded
+
+    astar_time = time_calls(astar.search, queries, repeat=3)
+    jps_time = time_calls(jps.search, queries, repeat=3)
+    print(f"{label:<22} {len(queries):>4} queries  expanded A* {astar_expanded:>9} JPS {jps_expanded:>8}"
+          f" (x{astar_expanded / max(jps_expanded, 1):6.1f} fewer)"
+          f"  time A* {astar_time * 1000:8.1f} ms JPS {jps_time * 1000:8.1f} ms")
+
+
+def main():
+    for name, tmx_file in SHIPPED_MAPS.items():
+        costs, _, _ = load_tmx_costs(tmx_file)
+        compare(name, costs, sample_queries(costs, 200, seed=1))
+
+    for label, costs in (("open 256x256", random_grid(256, 256, 0.0, seed=2)),
+                         ("random 5% 256x256", random_grid(256, 256, 0.05, seed=2)),
+                         ("random 25% 256x256", random_grid(256, 256, 0.25, seed=2)),
+                         ("perfect maze 255x255", perfect_maze(255, 255, seed=3))):
+        compare(label, costs, sample_queries(costs, 20, seed=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Leaderboard: the old in-memory list vs the SQLite `Leaderboard`, as history grows.
+
+For every size the board is filled with that many past scores, then a
+round of games is finished: each posts a score under an often taken
+name and reads back the top 5. The list side does what `GamePlay`
+used to (a linear ``any()`` scan per name tried, then a bubble sort of
+the whole list); it is only run while that stays bearable. The SQLite
+side posts through the indexes of an on-disk database and also looks
+up the new entry's rank.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_leaderboard
+"""
+import os
+import random
+import tempfile
+import time
+
+from game.leaderboard import Leaderboard, LeaderboardEntry
+
+SIZES = (1000, 10000, 100000, 1000000)
+LIST_LIMIT = 2000
+GAMES = 200
+NAMES = ["Alice", "Bob", "Charlie", "David", "Eve", "Steve", "Quinn", "Richard", "Wojciech"]
+
+
+def history(size, seed):
+    rng = random.Random(seed)
+    return [(f"player{index}", rng.randint(0, 10000)) for index in range(size)]
+
+
+def list_games(entries, seed):
+    rng = random.Random(seed)
+    board = [LeaderboardEntry(name, score) for name, score in entries]
+    for _ in range(GAMES):
+        base = rng.choice(NAMES)
+        count = 1
+        name = base
+        while any(entry.name == name for entry in board):
+            count += 1
+            name = f"{base}{count}"
+        board.append(LeaderboardEntry(name, rng.randint(0, 10000)))
+
+        n = len(board)
+        for i in range(n):
+            for j in range(0, n - i - 1):
+                if board[j].score < board[j + 1].score or \
+                        (board[j].score == board[j + 1].score and board[j].name > board[j + 1].name):
+                    board[j], board[j + 1] = board[j + 1], board[j]
+        board[:5]
+
+
+def sqlite_games(board, seed):
+    rng = random.Random(seed)
+    for _ in range(GAMES):
+        entry = board.add(rng.choice(NAMES), rng.randint(0, 10000))
+        board.top(5)
+        board.rank(entry.id)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        for size in SIZES:
+            entries = history(size, seed=size)
+
+            path = os.path.join(folder, f"leaderboard{size}.db")
+            board = Leaderboard(path)
+            begin = time.perf_counter()
+            board.add_many(entries)
+            fill_s = time.perf_counter() - begin
+
+            begin = time.perf_counter()
+            sqlite_games(board, seed=size)
+            sqlite_ms = (time.perf_counter() - begin) * 1000
+            board.close()
+
+            if size <= LIST_LIMIT:
+                begin = time.perf_counter()
+                list_games(entries, seed=size)
+                list_text = f"{(time.perf_counter() - begin) * 1000 / GAMES:10.2f} ms/game"
+            else:
+                list_text = "   skipped     "
+
+            print(f"{size:>8} entries  list {list_text}  sqlite {sqlite_ms / GAMES:6.3f} ms/game "
+                  f"(post, top 5 and rank)  filled in {fill_s:5.2f} s, {os.path.getsize(path) / 1024 / 1024:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Map redraws: one whole-map texture vs chunks with dirty flags and culling.
+
+No GPU is involved; a stub renderer counts the work each approach asks
+for. A 1080p camera pans over a large map while one random tile
+changes every few frames (as `GameMap.set_cost` will cause). The
+whole-map side re-renders every tile in to its single texture on
+every change, as `GameMap.blit` used to; the chunked side drives
+`MapChunks`, re-rendering only the dirty chunks in view and only
+drawing the chunks in view. The biggest texture either side needs is
+reported too, as GPUs commonly cap textures at 8192 or 16384 pixels a
+side.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_mapchunks
+"""
+import random
+
+from game.gameobjects.mapchunks import MapChunks
+
+TILE = (64, 64)
+VIEW = (1920, 1080)
+FRAMES = 600
+CHANGE_EVERY = 10
+MAP_SIZES = (64, 256, 1024)
+
+
+class StubRenderer:
+    """Counts the tiles rendered in to textures and the textures drawn to screen."""
+
+    def __init__(self):
+        self.tiles_blitted = 0
+        self.textures_drawn = 0
+
+    def blit(self, tiles):
+        self.tiles_blitted += tiles
+
+    def draw(self):
+        self.textures_drawn += 1
+
+
+def camera_path(size, seed):
+    rng = random.Random(seed)
+    limit_x = size * TILE[0] - VIEW[0]
+    limit_y = size * TILE[1] - VIEW[1]
+    x, y = limit_x / 2, limit_y / 2
+    views = []
+    for _ in range(FRAMES):
+        x = min(max(x + rng.uniform(-40, 40), 0), limit_x)
+        y = min(max(y + rng.uniform(-40, 40), 0), limit_y)
+        views.append((x, y, x + VIEW[0], y + VIEW[1]))
+    return views
+
+
+def changes(size, seed):
+    rng = random.Random(seed)
+    return {frame: (rng.randrange(size), rng.randrange(size)) for frame in range(0, FRAMES, CHANGE_EVERY)}
+
+
+def whole_map(size, views, changed):
+    renderer = StubRenderer()
+    redraw = True
+    for frame, _ in enumerate(views):
+        if frame in changed:
+            redraw = True
+        if redraw:
+            renderer.blit(size * size)
+            redraw = False
+        renderer.draw()
+    return renderer
+
+
+def chunked(size, views, changed):
+    renderer = StubRenderer()
+    chunks = MapChunks(size, size, TILE)
+
+    def blit(chunk):
+        x, y, end_x, end_y = chunks.tiles(chunk)
+        renderer.blit((end_x - x) * (end_y - y))
+
+    for frame, view in enumerate(views):
+        if frame in changed:
+            chunks.mark_dirty(*changed[frame])
+        chunks.draw(view, blit, lambda chunk: renderer.draw())
+    return renderer, chunks
+
+
+def main():
+    for size in MAP_SIZES:
+        views = camera_path(size, seed=size)
+        changed = changes(size, seed=size)
+
+        whole = whole_map(size, views, changed)
+        split, chunks = chunked(size, views, changed)
+
+        chunk_px = chunks.chunk_tiles * TILE[0]
+        print(f"{size:>5}x{size:<5} whole map: {whole.tiles_blitted / FRAMES:9.1f} tiles blitted/frame, "
+              f"{size * TILE[0]}px texture  |  chunked: {split.tiles_blitted / FRAMES:7.1f} tiles blitted/frame, "
+              f"{split.textures_drawn / FRAMES:4.1f} chunks drawn, {chunks.culled / FRAMES:7.1f} culled/frame, "
+              f"{chunk_px}px textures, {int(chunks.dirty.sum())} of {len(chunks)} chunks never blitted")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Map startup: parsing the TMX with pytmx vs loading the map cache.
+
+The cold side does what `GameMap` did on every launch: parse the TMX
+(and its tileset) with pytmx, walk every tile of every layer and build
+the cost grid and its region labels. The cached side memory-maps the
+arrays `mapcache` compiled earlier and wraps them in a `CostGrid`. No
+images are loaded on either side. Besides the shipped maps, larger
+mazes are generated in a temporary folder, using the shipped tileset,
+to show how both scale.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_mapload
+"""
+import os
+import tempfile
+
+import pytmx
+from pytmx import TiledTileLayer
+
+from benchmarks.common import SHIPPED_MAPS, perfect_maze, time_calls
+from game.gameobjects.costgrid import CostGrid, tmx_costs
+from game.gameobjects.mapcache import compile_map, load_map
+
+GENERATED_SIZES = (64, 128, 256)
+REPEAT = 5
+
+
+def write_maze_tmx(folder: str, size: int) -> str:
+    """Writes a size x size perfect maze as a two layer TMX file using the shipped tileset."""
+    costs = perfect_maze(size + 1 - size % 2, size + 1 - size % 2, seed=size)[:size]
+    tileset = os.path.abspath("./data/map/Kenney_basic.tsx")
+    layers = []
+    for layer_id, (name, cost, gid, solid) in enumerate((("Walls", 10, 15, True), ("Floor", 0, 1, False)), 1):
+        rows = [",".join(str(gid if bool(row[x]) == solid else 0) for x in range(size)) for row in costs]
+        layers.append(f' <layer id="{layer_id}" name="{name}" width="{size}" height="{size}">\n'
+                      f'  <properties>\n   <property name="cost" value="{cost}"/>\n  </properties>\n'
+                      f'  <data encoding="csv">\n' + ",\n".join(rows) + '\n</data>\n </layer>\n')
+
+    path = os.path.join(folder, f"maze{size}.tmx")
+    with open(path, "w") as file:
+        file.write(f'<?xml version="1.0" encoding="UTF-8"?>\n'
+                   f'<map version="1.9" orientation="orthogonal" renderorder="right-down" width="{size}" '
+                   f'height="{size}" tilewidth="32" tileheight="32" infinite="0" nextlayerid="3" nextobjectid="1">\n'
+                   f' <tileset firstgid="1" source="{tileset}"/>\n' + "".join(layers) + '</map>\n')
+    return path
+
+
+def cold_load(tmx_file: str) -> None:
+    tmxdata = pytmx.TiledMap(tmx_file, image_loader=lambda filename, colorkey, **kwargs: lambda rect, flags: rect)
+    for layer in tmxdata.visible_layers:
+        if isinstance(layer, TiledTileLayer):
+            tiles = [[None for _ in range(layer.width)] for _ in range(layer.height)]
+            for x, y, tile in layer.tiles():
+                tiles[y][x] = tile
+    CostGrid(tmx_costs(tmxdata)).components()
+
+
+def cached_load(tmx_file: str, cache_dir: str) -> None:
+    compiled = load_map(tmx_file, cache_dir)
+    CostGrid(compiled.costs, compiled.components).components()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        maps = dict(SHIPPED_MAPS)
+        maps.update({f"maze{size}": write_maze_tmx(folder, size) for size in GENERATED_SIZES})
+        for name, tmx_file in maps.items():
+            cache_dir = os.path.join(folder, "cache", name)
+            compile_ms = time_calls(compile_map, [(tmx_file, cache_dir)]) * 1000
+            cold_ms = time_calls(cold_load, [(tmx_file,)], REPEAT) * 1000
+            cached_ms = time_calls(cached_load, [(tmx_file, cache_dir)], REPEAT) * 1000
+            print(f"{name:>8}  compile {compile_ms:8.2f} ms  cold TMX {cold_ms:8.2f} ms  "
+                  f"cached {cached_ms:6.2f} ms  x{cold_ms / cached_ms:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
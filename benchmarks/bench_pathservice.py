@@ -0,0 +1,64 @@
+"""
+Main-thread cost of path requests: searched inline vs in worker processes.
+
+A batch of requests is submitted to a `PathService` and polled until
+every callback has run. "main thread" is the time spent inside
+`submit` and `poll`, which is what the game loop pays per frame; "wall"
+is how long the whole batch took to come back. With workers the main
+thread only queues tiles and applies results, while throughput scales
+with the number of free cores (results on a single core machine show
+the overhead of the pool, not a speed up).
+
+Run from the repository root::
+
+    python -m benchmarks.bench_pathservice
+"""
+import os
+import time
+
+from benchmarks.common import perfect_maze, random_grid, sample_queries
+from game.Pathfinding.PathService import PathService
+from game.gameobjects.costgrid import CostGrid
+
+REQUESTS = 200
+
+
+def run(label, costs):
+    grid = CostGrid(costs)
+    queries = sample_queries(costs, REQUESTS, seed=1)
+    cpus = os.cpu_count() or 1
+    for workers in sorted({0, 1, 2, cpus}):
+        service = PathService(grid, workers)
+        # warm the workers up so process start up and table building
+        # aren't counted against the batch
+        warm = [service.submit(*queries[0]) for _ in range(max(1, workers))]
+        for future in warm:
+            future.result()
+        service.poll()
+
+        finished = []
+        begin = time.perf_counter()
+        main_thread = 0.0
+        tick = time.perf_counter()
+        for start, goal in queries:
+            service.submit(start, goal, finished.append)
+        main_thread += time.perf_counter() - tick
+        while len(finished) < len(queries):
+            tick = time.perf_counter()
+            service.poll()
+            main_thread += time.perf_counter() - tick
+            time.sleep(0.001)
+        wall = time.perf_counter() - begin
+        service.close()
+
+        print(f"{label:<22} {workers:>2} workers: main thread {main_thread * 1000:8.1f} ms"
+              f"  wall {wall * 1000:8.1f} ms  ({len(queries) / wall:7.1f} paths/s)")
+
+
+def main():
+    run("random 256x256", random_grid(256, 256, 0.3, seed=2))
+    run("maze 255x255", perfect_maze(255, 255, seed=3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Enemy perception: a check per enemy vs one batched `Perception` pass.
+
+Enemies stand on random passable tiles of a shipped maze while the
+player hops between random passable tiles, one hop per tick. The
+per-enemy side measures the distance with ``math.hypot``, rolls
+``random.randint`` and, for enemies in range, walks the line of sight
+tile by tile, as a loop over enemy objects would. The batched side does
+the same for every enemy with `Perception.detect` and
+`Perception.whims`. Both sides agree on who can see the player.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_perception
+"""
+import math
+import random
+import time
+
+import numpy as np
+
+from benchmarks.common import SHIPPED_MAPS, load_tmx_costs, passable_tiles
+from game.gameobjects.costgrid import CostGrid
+from game.simulation.perception import Perception
+
+TILE = (64, 64)
+TICKS = 500
+DETECTION_RANGE = 5
+ENEMY_COUNTS = (10, 100, 1000)
+
+
+def line_of_sight(grid, start, goal):
+    steps = 2 * max(abs(goal[0] - start[0]), abs(goal[1] - start[1]))
+    for step in range(steps + 1):
+        t = step / max(steps, 1)
+        x = math.floor(start[0] + 0.5 + t * (goal[0] - start[0]))
+        y = math.floor(start[1] + 0.5 + t * (goal[1] - start[1]))
+        if not grid.is_passable(x, y):
+            return False
+    return True
+
+
+def per_enemy(grid, enemies, players, seed):
+    rng = random.Random(seed)
+    seen = 0
+    for player in players:
+        player_tile = (int(player[0] // TILE[0]), int(player[1] // TILE[1]))
+        for x, y in enemies:
+            if math.hypot(x - player[0], y - player[1]) <= DETECTION_RANGE * TILE[0] \
+                    and line_of_sight(grid, (int(x // TILE[0]), int(y // TILE[1])), player_tile):
+                seen += 1
+            rng.randint(0, 100)
+    return seen
+
+
+def batched(grid, enemies, players, seed):
+    perception = Perception(grid, TILE, np.random.default_rng(seed))
+    xs = np.array([x for x, _ in enemies], dtype=np.float64)
+    ys = np.array([y for _, y in enemies], dtype=np.float64)
+    ranges = np.full(len(enemies), DETECTION_RANGE, dtype=np.int32)
+    seen = 0
+    for player_x, player_y in players:
+        seen += int(perception.detect(xs, ys, ranges, player_x, player_y).sum())
+        perception.whims(len(enemies))
+    return seen
+
+
+def main():
+    costs, _, _ = load_tmx_costs(SHIPPED_MAPS["Maze"])
+    grid = CostGrid(costs)
+    tiles = passable_tiles(costs)
+    rng = random.Random(1)
+    players = [(x * TILE[0], y * TILE[1]) for x, y in (rng.choice(tiles) for _ in range(TICKS))]
+    for count in ENEMY_COUNTS:
+        enemies = [(x * TILE[0], y * TILE[1]) for x, y in (rng.choice(tiles) for _ in range(count))]
+
+        begin = time.perf_counter()
+        slow = per_enemy(grid, enemies, players, seed=count)
+        loop_ms = (time.perf_counter() - begin) * 1000
+
+        begin = time.perf_counter()
+        fast = batched(grid, enemies, players, seed=count)
+        batch_ms = (time.perf_counter() - begin) * 1000
+
+        assert slow == fast
+        print(f"{count:>5} enemies  {TICKS} ticks  per enemy {loop_ms / TICKS * 1000:8.1f} us/tick"
+              f"  batched {batch_ms / TICKS * 1000:6.1f} us/tick  x{loop_ms / batch_ms:5.1f}"
+              f"  ({fast / TICKS:.1f} detections/tick)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Profiler overhead: an instrumented hot loop with the profiler off and on.
+
+The loop does a little arithmetic per call, about as much as the
+smallest instrumented functions do, once bare, once wrapped in a
+`Profiler.scope` plus a `Profiler.count`, with the profiler disabled
+and enabled. Then a headless world is ticked with the shared
+`profiler` off and on, closing a frame every tick as the game does.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_profiler
+"""
+import time
+
+from game.profiler import Profiler, profiler
+from game.simulation.headless import RandomClicks, load_world, run
+
+CALLS = 200000
+TICKS = 10000
+
+
+def bare(calls):
+    total = 0
+    for value in range(calls):
+        total += value * value
+    return total
+
+
+def instrumented(prof, calls):
+    total = 0
+    for value in range(calls):
+        with prof.scope("work"):
+            total += value * value
+        prof.count("items")
+        if value % 100 == 99:
+            prof.end_frame()
+    return total
+
+
+def timed(function, *args):
+    begin = time.perf_counter()
+    function(*args)
+    return (time.perf_counter() - begin) * 1e9
+
+
+def main():
+    bare_ns = timed(bare, CALLS) / CALLS
+    off_ns = timed(instrumented, Profiler(enabled=False), CALLS) / CALLS
+    on_ns = timed(instrumented, Profiler(enabled=True), CALLS) / CALLS
+    print(f"per call  bare {bare_ns:6.0f} ns  profiler off {off_ns:6.0f} ns (+{off_ns - bare_ns:4.0f})  "
+          f"profiler on {on_ns:6.0f} ns (+{on_ns - bare_ns:4.0f})")
+
+    for enabled in (False, True):
+        profiler.reset()
+        profiler.enabled = enabled
+        world = load_world("./data/map/Maze.tmx", seed=1)
+        stats = run(world, TICKS, RandomClicks(seed=1))
+        world.pathing.close()
+        print(f"world ticks, profiler {'on ' if enabled else 'off'}  {stats['ticks_per_second']:9.0f} ticks/s")
+    profiler.enabled = False
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Repairing routes with D* Lite vs planning them again with A* after small map edits.
+
+Each agent plans a long route, then walks it a few tiles at a time
+while, between steps, one wall beside it is knocked down and one tile
+on the route ahead is walled off (`CostGrid.set_cost`), as long as
+that leaves a way round. After every edit the route is repaired by
+the agent's `DStarLiteSearch` and, for comparison, planned from
+scratch by `GridAStar` on the same patched tables; both must agree on
+the route's length. Random maps have many ways round a new wall, so
+repairs stay local; in perfect mazes every opening can shorten routes
+across the whole map, and the repair has much more to redo.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_replan
+"""
+import random
+import time
+
+from benchmarks.common import perfect_maze, random_grid, sample_queries
+from game.Pathfinding.DStarLite import DStarLite
+from game.Pathfinding.GridAStar import GridAStar
+from game.gameobjects.costgrid import CostGrid
+
+AGENTS = 4
+EDITS = 10
+STRIDE = 3  # tiles walked between edits
+
+
+def long_queries(costs, count, seed):
+    """Queries whose ends are at least half the map apart."""
+    size = len(costs)
+    return [(start, goal) for start, goal in sample_queries(costs, count * 20, seed=seed)
+            if abs(start[0] - goal[0]) + abs(start[1] - goal[1]) > size][:count]
+
+
+def edit_near(grid, path, goal, rng):
+    """ Opens a wall beside the route and walls off a tile on the route ahead, returning the tiles changed
+
+    A new wall that would cut the goal off is taken down again, so every
+    edit leaves a way round (in a perfect maze, only through the opening).
+    """
+    changed = []
+    x, y = path[rng.randrange(len(path))].tolist()
+    for dx, dy in rng.sample(((0, -1), (1, 0), (0, 1), (-1, 0)), 4):
+        nx, ny = x + dx, y + dy
+        if 0 < nx < grid.width - 1 and 0 < ny < grid.height - 1 and not grid.passable[ny, nx]:
+            grid.set_cost(nx, ny, 0)
+            changed.append((nx, ny))
+            break
+    if len(path) > 4:
+        x, y = path[rng.randrange(2, len(path) - 1)].tolist()
+        grid.set_cost(x, y, 1)
+        if grid.connected(tuple(path[0].tolist()), goal):
+            changed.append((x, y))
+        else:
+            grid.set_cost(x, y, 0)
+    return changed
+
+
+def run(label, costs, seed):
+    grid = CostGrid(costs)
+    core = DStarLite(grid)
+    astar = GridAStar(grid)
+    rng = random.Random(seed)
+
+    plan_ms = repair_ms = replan_ms = 0.0
+    repaired = replanned = edits = 0
+    for start, goal in long_queries(costs, AGENTS, seed):
+        begin = time.perf_counter()
+        agent = core.begin(start, goal)
+        path = agent.path()
+        plan_ms += (time.perf_counter() - begin) * 1000
+
+        for _ in range(EDITS):
+            if len(path) <= STRIDE + 1:
+                break
+            agent.move_to(tuple(path[STRIDE].tolist()))
+            if goal == agent.start:
+                break
+            path = path[STRIDE:]
+            changed = edit_near(grid, path, goal, rng)
+            astar.update_cells(changed)
+            edits += 1
+
+            expanded = agent.nodes_expanded
+            begin = time.perf_counter()
+            path = agent.path()
+            repair_ms += (time.perf_counter() - begin) * 1000
+            repaired += agent.nodes_expanded - expanded
+
+            begin = time.perf_counter()
+            fresh = astar.search(agent.start, goal)
+            replan_ms += (time.perf_counter() - begin) * 1000
+            replanned += astar.nodes_expanded
+            assert len(fresh) == len(path), f"D* Lite route of {len(path)} tiles, A* {len(fresh)}"
+            if not len(path):
+                break
+
+    edits = max(edits, 1)
+    print(f"{label:<12} first plan {plan_ms / AGENTS:8.1f} ms  per edit: repair {repair_ms / edits:7.2f} ms"
+          f" ({repaired // edits:6d} nodes)  A* replan {replan_ms / edits:7.2f} ms ({replanned // edits:6d} nodes)"
+          f"  x{replan_ms / max(repair_ms, 1e-9):5.1f}")
+
+
+def main():
+    for size in (128, 256, 512, 1024):
+        run(f"random{size}", random_grid(size, size, 0.2, seed=size), size)
+        # perfect mazes need odd sides to have a wall all the way round
+        run(f"maze{size}", perfect_maze(size - 1, size - 1, seed=size), size)
+
+
+if __name__ == "__main__":
+    main()
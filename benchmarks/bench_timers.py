@@ -0,0 +1,76 @@
+"""
+Expiry checks: polling every deadline each tick vs a `TimerQueue`.
+
+Many effects (freezes, multipliers, future spawns) each expire at
+their own random game time over the next 10 seconds, and the clock is
+ticked at 60 Hz until all of them have. The polling side checks every
+pending deadline every tick, as the world's power-ups used to; the
+queue side schedules each one on a `TimerQueue` and only pops what is
+due. Both expire the same effects on the same ticks.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_timers
+"""
+import random
+import time
+
+from game.simulation.timers import TimerQueue
+
+TIMESTEP = 1 / 60
+SPAN = 10.0
+COUNTS = (10, 1000, 100000)
+
+
+def deadlines(count, seed):
+    rng = random.Random(seed)
+    return [rng.uniform(0, SPAN) for _ in range(count)]
+
+
+def polling(due):
+    active = [True] * len(due)
+    expired = []
+    clock = 0.0
+    ticks = 0
+    while clock <= SPAN:
+        clock += TIMESTEP
+        ticks += 1
+        for index, deadline in enumerate(due):
+            if active[index] and clock >= deadline:
+                active[index] = False
+                expired.append((ticks, index))
+    return expired
+
+
+def queued(due):
+    timers = TimerQueue()
+    expired = []
+    ticks = 0
+    for index, deadline in enumerate(due):
+        timers.schedule(deadline, lambda index=index: expired.append((ticks, index)))
+    clock = 0.0
+    while clock <= SPAN:
+        clock += TIMESTEP
+        ticks += 1
+        timers.run_due(clock)
+    return expired
+
+
+def main():
+    for count in COUNTS:
+        due = deadlines(count, seed=count)
+
+        begin = time.perf_counter()
+        slow = polling(due)
+        polling_ms = (time.perf_counter() - begin) * 1000
+
+        begin = time.perf_counter()
+        fast = queued(due)
+        queue_ms = (time.perf_counter() - begin) * 1000
+
+        assert sorted(slow) == sorted(fast)
+        print(f"{count:>7} timers  polling {polling_ms:9.1f} ms  queue {queue_ms:7.1f} ms  x{polling_ms / queue_ms:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Worst frame of a burst of path requests: run to completion vs time-sliced.
+
+A batch of requests (a third of them to tiles the start can't reach,
+like the random enemy targets in `GamePlay.update_enemies`) arrives in
+one frame. Run to completion, the whole batch lands in that frame;
+time-sliced, every frame spends at most a fixed number of expansions
+and the batch finishes over several frames instead. Unreachable goals
+are rejected by their connected component before any expansion.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_timeslice
+"""
+import random
+import time
+
+from benchmarks.common import passable_tiles, perfect_maze, random_grid
+from game.Pathfinding.GridAStar import GridAStar
+from game.gameobjects.costgrid import CostGrid
+
+REQUESTS = 30
+BUDGETS = (200, 1000, 5000)
+
+
+def burst(costs, seed):
+    rng = random.Random(seed)
+    tiles = passable_tiles(costs)
+    grid = CostGrid(costs)
+    labels = grid.components()
+    queries = []
+    while len(queries) < REQUESTS:
+        start = rng.choice(tiles)
+        if len(queries) % 3 == 2:
+            # a goal in some other region, or a wall if the map is connected
+            goal = (rng.randrange(grid.width), rng.randrange(grid.height))
+            if labels[goal[1], goal[0]] == labels[start[1], start[0]]:
+                continue
+        else:
+            goal = rng.choice(tiles)
+        queries.append((start, goal))
+    return grid, queries
+
+
+def run(label, costs):
+    grid, queries = burst(costs, seed=1)
+    astar = GridAStar(grid)
+
+    begin = time.perf_counter()
+    for start, goal in queries:
+        astar.search(start, goal)
+    whole_ms = (time.perf_counter() - begin) * 1000
+    print(f"{label:<22} run to completion: one {whole_ms:8.2f} ms frame")
+
+    for budget in BUDGETS:
+        searches = [astar.begin(start, goal) for start, goal in queries]
+        worst = 0.0
+        frames = 0
+        while searches:
+            begin = time.perf_counter()
+            spent = 0
+            while searches and spent < budget:
+                before = searches[0].nodes_expanded
+                searches[0].step(budget - spent)
+                spent += searches[0].nodes_expanded - before
+                if not searches[0].pending:
+                    searches.pop(0)
+            worst = max(worst, (time.perf_counter() - begin) * 1000)
+            frames += 1
+        print(f"{'':<22} budget {budget:>5}/frame: worst {worst:6.2f} ms over {frames:>4} frames")
+
+
+def main():
+    run("random 256x256", random_grid(256, 256, 0.3, seed=2))
+    run("maze 255x255", perfect_maze(255, 255, seed=3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+UI text: building text objects every frame vs retained `Screen` texts.
+
+The immediate side draws the game over screen and the HUD the way
+`GamePlay` used to: a new text object for every line every frame and
+the HUD string formatted every frame. The retained side draws the same
+screens through `game.ui.Screen`. Text objects are stand-ins that
+behave like `pyasge.Text` (setting the string re-lays out the glyphs),
+so the counts of objects made and strings set carry over to the game.
+The score changes every 30 frames, like picking up a coin now and then.
+Per frame allocations are reported as the text objects made and the
+strings set, each of which allocates in pyasge.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_ui
+"""
+import time
+
+from game.ui import BoundText, Screen
+
+FRAMES = 3000
+SCORE_EVERY = 30
+
+
+class StubText:
+    made = 0
+    strings = 0
+
+    def __init__(self, string, x, y):
+        StubText.made += 1
+        self.x = x
+        self.y = y
+        self.colour = None
+        self.string = string
+
+    @property
+    def string(self):
+        return self._string
+
+    @string.setter
+    def string(self, value):
+        StubText.strings += 1
+        self._string = value
+        self.glyphs = [ord(character) for character in value]  # stand in for re-laying out the glyphs
+
+
+class StubRenderer:
+    def render(self, text):
+        pass
+
+
+class Game:
+    def __init__(self):
+        self.score = 0
+        self.lives = 3
+        self.level = 1
+        self.leaderboard = [("YOU", 7), ("Alice", 19), ("Bob", 15), ("Eve", 11), ("Quinn", 6)]
+
+
+def immediate(game, renderer, frame):
+    renderer.render(StubText(f"You Lose! Your Score Was: {game.score}", 400, 300))
+    renderer.render(StubText("Leaderboard", 400, 350))
+    for place, (name, score) in enumerate(game.leaderboard):
+        renderer.render(StubText(f"{place + 1}. {name}: {score}", 400, 400 + 50 * place))
+    renderer.render(StubText("Press SPACE to restart", 450, 650))
+    hud.string = f"Score: {game.score}  Lives: {game.lives}  Level: {game.level}"
+    renderer.render(hud)
+
+
+def retained_screens(game):
+    entries = [BoundText("{}. {}: {}", 400, 400 + 50 * place,
+                         lambda place=place: (place + 1, *game.leaderboard[place])) for place in range(5)]
+    loser = Screen(StubText,
+                   BoundText("You Lose! Your Score Was: {}", 400, 300, lambda: (game.score,)),
+                   BoundText("Leaderboard", 400, 350), *entries,
+                   BoundText("Press SPACE to restart", 450, 650))
+    hud_screen = Screen(StubText, BoundText("Score: {}  Lives: {}  Level: {}", 10, 10,
+                                            lambda: (game.score, game.lives, game.level)))
+    return loser, hud_screen
+
+
+def run(draw):
+    game = Game()
+    renderer = StubRenderer()
+    StubText.made = StubText.strings = 0
+    begin = time.perf_counter()
+    for frame in range(FRAMES):
+        if frame % SCORE_EVERY == 0:
+            game.score += 1
+        draw(game, renderer, frame)
+    elapsed = time.perf_counter() - begin
+    return elapsed, StubText.made, StubText.strings
+
+
+hud = StubText("UI Label", 10, 50)
+
+
+def main():
+    screens = {}
+
+    def retained(game, renderer, frame):
+        if not screens:
+            screens["loser"], screens["hud"] = retained_screens(game)
+        screens["loser"].render(renderer)
+        screens["hud"].render(renderer)
+
+    for name, draw in (("immediate", immediate), ("retained", retained)):
+        # one untimed run first, so both sides start warm
+        run(draw)
+        screens.clear()
+        elapsed, made, strings = run(draw)
+        print(f"{name:>9}: {elapsed / FRAMES * 1e6:6.1f} us/frame, {made / FRAMES:5.2f} texts made/frame, "
+              f"{strings / FRAMES:5.2f} strings set/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Shared helpers for the headless benchmarks.
+
+None of these helpers need a window, a renderer or pyasge. Maps are
+read straight from the TMX files with pytmx (no images are loaded) and
+synthetic grids are generated from a seeded random number generator so
+that every run measures exactly the same work.
+"""
+import random
+import time
+
+import pytmx
+from pytmx import TiledTileLayer
+
+SHIPPED_MAPS = {
+    "Maze": "./data/map/Maze.tmx",
+    "Maze2": "./data/map/Maze2.tmx",
+    "Maze3": "./data/map/Maze3.tmx",
+    "desert": "./data/map/desert.tmx",
+}
+
+
+def load_tmx_costs(tmx_file: str):
+    """ Builds the pathfinding cost map of a TMX file
+
+    Mirrors the cost accumulation in `GameMap` without creating any
+    tiles. The desert map only has a single ground layer (cost 1 on
+    every tile), which the game's ``cost == 0`` rule would treat as
+    solid, so costs are rebased by the map minimum. That keeps the
+    mazes unchanged and turns desert into the open-field case.
+
+    Returns:
+        (costs, width, height) where costs is a list of rows
+    """
+    tmxdata = pytmx.TiledMap(tmx_file)
+    costs = [[0 for _ in range(tmxdata.width)] for _ in range(tmxdata.height)]
+    for layer in tmxdata.visible_layers:
+        if isinstance(layer, TiledTileLayer):
+            cost = int(layer.properties["cost"])
+            for y, row in enumerate(layer.data):
+                for x, gid in enumerate(row):
+                    if gid:
+                        costs[y][x] += cost
+
+    lowest = min(min(row) for row in costs)
+    if lowest:
+        costs = [[cost - lowest for cost in row] for row in costs]
+    return costs, tmxdata.width, tmxdata.height
+
+
+def random_grid(width: int, height: int, density: float = 0.25, seed: int = 0):
+    """Scatters walls (cost 10) over an open grid, keeping the corners clear."""
+    rng = random.Random(seed)
+    costs = [[10 if rng.random() < density else 0 for _ in range(width)] for _ in range(height)]
+    for x, y in ((0, 0), (width - 1, 0), (0, height - 1), (width - 1, height - 1)):
+        costs[y][x] = 0
+    return costs
+
+
+def perfect_maze(width: int, height: int, seed: int = 0):
+    """Carves a perfect maze (exactly one route between any two cells) with a randomised DFS."""
+    rng = random.Random(seed)
+    costs = [[10 for _ in range(width)] for _ in range(height)]
+    stack = [(1, 1)]
+    costs[1][1] = 0
+    while stack:
+        x, y = stack[-1]
+        options = [(dx, dy) for dx, dy in ((0, -2), (2, 0), (0, 2), (-2, 0))
+                   if 0 < x + dx < width - 1 and 0 < y + dy < height - 1 and costs[y + dy][x + dx]]
+        if not options:
+            stack.pop()
+            continue
+        dx, dy = rng.choice(options)
+        costs[y + dy // 2][x + dx // 2] = 0
+        costs[y + dy][x + dx] = 0
+        stack.append((x + dx, y + dy))
+    return costs
+
+
+def passable_tiles(costs):
+    return [(x, y) for y, row in enumerate(costs) for x, cost in enumerate(row) if cost == 0]
+
+
+def sample_queries(costs, count: int, seed: int = 0, max_steps: int = None):
+    """ Picks (start, goal) pairs of passable tiles
+
+    Args:
+        max_steps: When set, every goal is reachable from its start in
+            exactly this many steps (found with a breadth first walk),
+            which keeps queries short even inside winding mazes.
+    """
+    rng = random.Random(seed)
+    tiles = passable_tiles(costs)
+    queries = []
+    while len(queries) < count:
+        start = rng.choice(tiles)
+        if max_steps is None:
+            queries.append((start, rng.choice(tiles)))
+            continue
+
+        ring = _ring(costs, start, max_steps)
+        if ring:
+            queries.append((start, rng.choice(ring)))
+    return queries
+
+
+def _ring(costs, start, steps):
+    height, width = len(costs), len(costs[0])
+    seen = {start}
+    frontier = [start]
+    for _ in range(steps):
+        following = []
+        for x, y in frontier:
+            for nx, ny in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+                if 0 <= nx < width and 0 <= ny < height and costs[ny][nx] == 0 and (nx, ny) not in seen:
+                    seen.add((nx, ny))
+                    following.append((nx, ny))
+        frontier = following
+    return frontier
+
+
+def time_calls(function, arguments, repeat: int = 1):
+    """Returns the best total wall time (seconds) of calling function over every argument tuple."""
+    best = None
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        for args in arguments:
+            function(*args)
+        elapsed = time.perf_counter() - begin
+        best = elapsed if best is None else min(best, elapsed)
+    return best
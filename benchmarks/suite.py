@@ -0,0 +1,340 @@
+"""
+The benchmark suite: pathfinding and simulation timings checked against a baseline.
+
+Every case is a list of operations (a path query, a world tick) timed
+one by one; each is run ``repeat`` times and keeps its fastest time,
+which filters out most scheduler noise. A case reports the mean time
+per operation (its throughput) and the 95th percentile (its latency).
+
+The cases cover `TilePathing.find_tiles`, the search behind
+`AStarPathing.find_path`, on the shipped maps and on seeded random and
+perfect mazes from 32x32 to 2048x2048, with goals that can and can't be
+reached, and `World.tick` with increasing numbers of wandering enemies,
+walking their routes blind and fitted around each other.
+Nothing needs a window, a GPU or pyasge.
+
+Timings are only comparable on the machine and in the conditions they
+were taken in, so no absolute figures are kept in the repository. By
+default the suite checks out another git revision (``--against``,
+HEAD unless given) in a temporary worktree and times its cases and the
+working tree's case by case, in turn, for a few rounds, keeping each
+case's fastest time on either side. The run exits with status 1 if any
+case's mean or p95 has grown by more than the threshold (and by more
+than `NOISE_MS`), so it can gate performance work in CI against the
+merge base. ``--save`` instead writes the results to a file given with
+``--baseline``, which later runs on the same machine can be compared
+with.
+
+Run from the repository root::
+
+    python -m benchmarks.suite --against origin/main
+    python -m benchmarks.suite --threshold 0.2 --only maze --quick
+    python -m benchmarks.suite --save --baseline /tmp/before.json
+    python -m benchmarks.suite --baseline /tmp/before.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from benchmarks.common import SHIPPED_MAPS, load_tmx_costs, perfect_maze, random_grid, sample_queries
+from game.Pathfinding.TilePathing import TilePathing
+from game.gameobjects.costgrid import CostGrid
+from game.simulation.world import World
+
+THRESHOLD = 0.25
+# runs of the suite on each side of a comparison
+ROUNDS = 3
+# growth smaller than this many ms per operation is timer noise, never a regression
+NOISE_MS = 0.01
+# synthetic map sizes and how many queries (and repeats) each can afford
+SIZES = {32: (200, 3), 128: (50, 3), 512: (10, 3), 2048: (2, 1)}
+QUICK_LIMIT = 512
+ENEMY_COUNTS = (10, 100, 1000)
+TICKS = 300
+WARMUP_TICKS = 60
+
+
+class Case:
+    """ A named benchmark: ``setup()`` returns the operations to time
+
+    Args:
+        name: The case's key in the baseline
+        setup: Builds the case's data, untimed, and returns a list of
+            zero-argument callables, one per operation
+        reset: Called untimed before every operation, e.g. to empty a cache
+        repeat: How many times the operations are run
+        size: The side of the case's map, for ``--quick`` to skip big ones
+        fresh: Whether to set up again before every repeat, for
+            operations that change what the next one does (world ticks)
+    """
+
+    def __init__(self, name: str, setup, reset=None, repeat: int = 3, size: int = 0, fresh: bool = False) -> None:
+        self.name = name
+        self.setup = setup
+        self.reset = reset
+        self.repeat = repeat
+        self.size = size
+        self.fresh = fresh
+
+    def run(self):
+        """The case's timings, or None if it has nothing to time on this map."""
+        operations = self.setup()
+        if not operations:
+            return None
+        best = np.full(len(operations), np.inf)
+        for repeat in range(self.repeat):
+            if self.fresh and repeat:
+                operations = self.setup()
+            for index, operation in enumerate(operations):
+                if self.reset is not None:
+                    self.reset()
+                begin = time.perf_counter()
+                operation()
+                best[index] = min(best[index], time.perf_counter() - begin)
+
+        best *= 1000
+        mean = float(best.mean())
+        return {"ops": len(operations), "mean_ms": mean, "p95_ms": float(np.percentile(best, 95)),
+                "per_second": 1000 / mean if mean else 0.0}
+
+
+def unreachable_queries(grid, count: int, seed: int):
+    """ (start, goal) pairs with no path between them
+
+    Goals are in another connected region when the map has one,
+    otherwise they are blocked tiles; a map that is open everywhere
+    has none.
+    """
+    rng = random.Random(seed)
+    components = grid.components()
+    cells = grid.passable_cells()
+    walls = np.argwhere(~grid.passable)[:, ::-1]
+    labels = components[cells[:, 1], cells[:, 0]]
+    queries = []
+    for _ in range(count):
+        start = cells[rng.randrange(len(cells))]
+        others = cells[labels != components[start[1], start[0]]]
+        goals = others if len(others) else walls
+        if not len(goals):
+            return []
+        queries.append((tuple(start.tolist()), tuple(goals[rng.randrange(len(goals))].tolist())))
+    return queries
+
+
+def path_cases(label: str, make_costs, queries: int, repeat: int, size: int = 0):
+    """A reachable and an unreachable query case on one map, sharing the map between them."""
+    state = {}
+
+    def pathing():
+        if "pathing" not in state:
+            costs = make_costs()
+            state["costs"] = costs
+            state["pathing"] = TilePathing(CostGrid(costs))
+            state["pathing"].get_search()
+        return state["pathing"]
+
+    def reachable():
+        search = pathing()
+        return [lambda start=start, goal=goal: search.find_tiles(start, goal)
+                for start, goal in sample_queries(state["costs"], queries, seed=size or queries)]
+
+    def unreachable():
+        search = pathing()
+        return [lambda start=start, goal=goal: search.find_tiles(start, goal)
+                for start, goal in unreachable_queries(search.grid, queries, seed=size or queries)]
+
+    # every query is searched in full rather than answered from the path cache
+    clear = lambda: state["pathing"].cache.clear()
+    return [Case(f"path/{label}/reachable", reachable, clear, repeat, size),
+            Case(f"path/{label}/unreachable", unreachable, clear, repeat, size)]
+
+
+def enemy_case(count: int, cooperative: bool = False) -> Case:
+    def setup():
+        costs, _, _ = load_tmx_costs(SHIPPED_MAPS["Maze"])
+        world = World(CostGrid(costs), (64, 64), seed=count, cooperative=cooperative)
+        world.enemies.clear()
+        world.enemy_paths.clear()
+        world.enemy_routes.clear()
+        world.enemy_requests.clear()
+        world.enemy_index.clear()
+        world.init_enemies(count)
+        for _ in range(WARMUP_TICKS):
+            world.tick()
+        return [world.tick] * TICKS
+
+    kind = "tick_cooperative" if cooperative else "tick"
+    return Case(f"world/{kind}/{count}_enemies", setup, fresh=True)
+
+
+def cases() -> list:
+    found = []
+    for name, tmx_file in SHIPPED_MAPS.items():
+        found += path_cases(name, lambda tmx_file=tmx_file: load_tmx_costs(tmx_file)[0], 100, 3)
+    for size, (queries, repeat) in SIZES.items():
+        found += path_cases(f"random{size}", lambda size=size: random_grid(size, size, 0.25, seed=size),
+                            queries, repeat, size)
+        # perfect mazes need odd sides to have a wall all the way round
+        found += path_cases(f"maze{size}", lambda size=size: perfect_maze(size - 1, size - 1, seed=size),
+                            queries, repeat, size)
+    found += [enemy_case(count) for count in ENEMY_COUNTS]
+    found += [enemy_case(count, cooperative=True) for count in ENEMY_COUNTS]
+    return found
+
+
+def load_baseline(path: str) -> dict:
+    try:
+        with open(path) as file:
+            return json.load(file)["cases"]
+    except FileNotFoundError:
+        return {}
+
+
+@contextmanager
+def worktree(revision: str):
+    """Checks a git revision out in a temporary worktree, yielding its path."""
+    with tempfile.TemporaryDirectory() as folder:
+        tree = os.path.join(folder, "tree")
+        subprocess.run(["git", "worktree", "add", "--detach", "--quiet", tree, revision], check=True)
+        try:
+            yield tree
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", tree], check=True)
+
+
+def run_suite(tree: str, only: str, quick: bool) -> dict:
+    """ Runs the suite checked out at tree once, in a fresh process
+
+    Returns:
+        The results by case name, as the suite saves them with ``--save``
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        results = os.path.join(folder, "results.json")
+        command = [sys.executable, "-m", "benchmarks.suite", "--save", "--baseline", results, "--only", only]
+        if quick:
+            command.append("--quick")
+        with open(os.path.join(tree, "benchmarks", "suite.py")) as file:
+            if "--rounds" in file.read():
+                command += ["--rounds", "1"]  # the caller takes care of the rounds
+        subprocess.run(command, cwd=tree, check=True, stdout=subprocess.DEVNULL)
+        return load_baseline(results)
+
+
+def fastest(runs) -> dict:
+    """Every case's lowest mean and p95 over several runs of the suite."""
+    best = {}
+    for results in runs:
+        for name, result in results.items():
+            kept = best.setdefault(name, dict(result))
+            kept["mean_ms"] = min(kept["mean_ms"], result["mean_ms"])
+            kept["p95_ms"] = min(kept["p95_ms"], result["p95_ms"])
+            kept["per_second"] = 1000 / kept["mean_ms"] if kept["mean_ms"] else 0.0
+    return best
+
+
+def run_cases(selected) -> dict:
+    results = {}
+    for case in selected:
+        result = case.run()
+        if result is not None:
+            results[case.name] = result
+    return results
+
+
+def regressions(result: dict, base: dict, threshold: float, latency_threshold: float) -> list:
+    """The ways a case's result is worse than its baseline by more than the thresholds."""
+    found = []
+    if result["mean_ms"] > base["mean_ms"] * (1 + threshold) and result["mean_ms"] - base["mean_ms"] > NOISE_MS:
+        found.append(f"throughput {result['per_second']:.1f}/s vs {base['per_second']:.1f}/s")
+    if result["p95_ms"] > base["p95_ms"] * (1 + latency_threshold) and result["p95_ms"] - base["p95_ms"] > NOISE_MS:
+        found.append(f"p95 {result['p95_ms']:.3f} ms vs {base['p95_ms']:.3f} ms")
+    return found
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--against", default="HEAD", metavar="REVISION",
+                        help="git revision to time alongside and compare with, HEAD if not given")
+    parser.add_argument("--baseline", default=None, metavar="PATH",
+                        help="compare with results saved earlier on this machine instead")
+    parser.add_argument("--save", action="store_true", help="save the results to --baseline instead of comparing")
+    parser.add_argument("--rounds", type=int, default=ROUNDS,
+                        help="times each side is run, taking each case's fastest")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed growth in mean time per operation, e.g. 0.25 for 25%%")
+    parser.add_argument("--latency-threshold", type=float, default=None,
+                        help="allowed growth in p95 time per operation, --threshold if not given")
+    parser.add_argument("--only", default="", help="only run cases whose name contains this")
+    parser.add_argument("--quick", action="store_true", help=f"skip maps larger than {QUICK_LIMIT}x{QUICK_LIMIT}")
+    args = parser.parse_args()
+    latency_threshold = args.threshold if args.latency_threshold is None else args.latency_threshold
+    if args.save and args.baseline is None:
+        parser.error("--save needs a --baseline file to save to")
+
+    selected = [case for case in cases()
+                if args.only in case.name and not (args.quick and case.size > QUICK_LIMIT)]
+    if args.save or args.baseline is not None:
+        results = fastest(run_cases(selected) for _ in range(args.rounds))
+        baseline = {} if args.save else load_baseline(args.baseline)
+    else:
+        # alternate between the two sides case by case, each in a fresh
+        # process, so that load on the machine changing part way through
+        # affects both alike
+        print(f"Timing {args.against} and the working tree, {args.rounds} rounds each...")
+        runs, reference_runs = [], []
+        with worktree(args.against) as tree:
+            for round_ in range(args.rounds):
+                for case in selected:
+                    sides = [(reference_runs, tree), (runs, os.curdir)]
+                    for found, root in sides[::-1] if round_ % 2 else sides:
+                        result = run_suite(root, case.name, args.quick).get(case.name)
+                        if result is not None:
+                            found.append({case.name: result})
+        results = fastest(runs)
+        baseline = fastest(reference_runs)
+
+    failed = []
+    print(f"{'case':<36} {'ops':>5} {'mean ms':>10} {'p95 ms':>10} {'ops/s':>10}  vs reference")
+    for case in selected:
+        result = results.get(case.name)
+        if result is None:
+            print(f"{case.name:<36} skipped, nothing to time on this map")
+            continue
+        base = baseline.get(case.name)
+        if base is None:
+            verdict = "new" if not args.save else ""
+        else:
+            change = result["mean_ms"] / base["mean_ms"] - 1 if base["mean_ms"] else 0.0
+            problems = regressions(result, base, args.threshold, latency_threshold)
+            verdict = f"{change:+6.1%}" + (f"  REGRESSED: {', '.join(problems)}" if problems else "")
+            if problems:
+                failed.append(case.name)
+        print(f"{case.name:<36} {result['ops']:>5} {result['mean_ms']:>10.3f} {result['p95_ms']:>10.3f} "
+              f"{result['per_second']:>10.1f}  {verdict}")
+
+    if args.save:
+        saved = dict(load_baseline(args.baseline), **results)
+        with open(args.baseline, "w") as file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "processor": platform.processor(), "cases": saved}, file, indent=1, sort_keys=True)
+            file.write("\n")
+        print(f"Saved {len(results)} cases to {args.baseline}")
+        return 0
+
+    if failed:
+        print(f"{len(failed)} of {len(results)} cases regressed by more than the threshold: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,74 +1,55 @@
 import pyasge
-from queue import PriorityQueue
 
+from game.Pathfinding.TilePathing import PathRequest, TilePathing
 
-class AStarNode:
-    def __init__(self, coord, parent=None, g=0, h=0):
-        self.coord = coord
-        self.parent = parent
-        self.g = g
-        self.h = h
-        self.f = g + h
 
+class AStarPathing(TilePathing):
+    """
+    `TilePathing` for the game's map, speaking in `pyasge.Point2D` tiles.
 
-    def __lt__(self, other):
-        return self.f < other.f
+    The grid and the number of worker processes are read from the
+    shared `GameData` every time, so swapping the map is picked up on
+    the next query.
+    """
 
-
-class AStarPathing:
-    def __init__(self, gamedata):
+    def __init__(self, gamedata, algorithm: str = "astar"):
+        super().__init__(algorithm=algorithm)
         self.data = gamedata
         self.path = []
 
+    def current_grid(self):
+        return self.data.game_map.grid
+
+    def worker_count(self) -> int:
+        return self.data.path_workers
+
     def heuristic(self, current: pyasge.Point2D, target: pyasge.Point2D):
 
         return abs(current.x - target.x) + abs(current.y - target.y)
 
     def find_path(self, startCoord: pyasge.Point2D, endCoord: pyasge.Point2D):
-        self.path = []
-        open_list = PriorityQueue()
-        open_list.put((0, AStarNode(startCoord, g=0, h=self.heuristic(startCoord, endCoord))))
-        closed = []
-
-        while not open_list.empty():
-            current_f, current_node = open_list.get()
-
-            if current_node.coord == endCoord:
-                self.retrace_path(current_node)
-                return
+        tiles = self.find_tiles((int(startCoord.x), int(startCoord.y)), (int(endCoord.x), int(endCoord.y)))
+        self.path = [pyasge.Point2D(x, y) for x, y in tiles.tolist()]
 
-            closed.append(current_node)
-            neighbors = self.get_neighbours(current_node.coord)
+    def request_path(self, startCoord: pyasge.Point2D, endCoord: pyasge.Point2D, callback) -> PathRequest:
+        """ Queues a path to be searched for over the next few frames
 
-            for neighbor_coord in neighbors:
-                if any(closed_node.coord == neighbor_coord for closed_node in closed):
-                    continue
+        See `TilePathing.request_tiles`.
 
-                g_cost = current_node.g + 1  # Assuming uniform cost for moving to a neighbor
-                h_cost = self.heuristic(neighbor_coord, endCoord)
-                neighbor_node = AStarNode(neighbor_coord, current_node, g_cost, h_cost)
-
-                if not any(open_node[1].coord == neighbor_coord and open_node[1].g <= g_cost for open_node in
-                           open_list.queue):
-                    open_list.put((neighbor_node.f, neighbor_node))
+        :param startCoord: the tile to start from
+        :param endCoord: the tile to reach
+        :param callback: called with the path, a list of Point2D tiles
+        :return: the request, which can be cancelled while pending
+        """
+        return self.request_tiles((int(startCoord.x), int(startCoord.y)), (int(endCoord.x), int(endCoord.y)),
+                                  lambda tiles: callback([pyasge.Point2D(x, y) for x, y in tiles.tolist()]))
 
     def get_neighbours(self, coord: pyasge.Point2D):
-        neighbors = []
-        directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]  # Up, Right, Down, Left
-
-        for dx, dy in directions:
-            new_x = int(coord.x + dx)
-            new_y = int(coord.y + dy)
-            if 0 <= new_x < self.data.game_map.width and 0 <= new_y < self.data.game_map.height:
-                if self.data.game_map.costs[new_y][new_x] == 0:
-                    neighbors.append(pyasge.Point2D(new_x, new_y))
-
-        return neighbors
-
-
-    def retrace_path(self, endNode):
-        currentNode = endNode
-        while currentNode is not None:
-            self.path.append(currentNode.coord)
-            currentNode = currentNode.parent
-        self.path.reverse()
+        x = int(coord.x)
+        y = int(coord.y)
+        grid = self.data.game_map.grid
+        if not grid.in_bounds(x, y):
+            return []
+
+        mask = grid.neighbours[y, x]
+        return [pyasge.Point2D(x + dx, y + dy) for bit, dx, dy in grid.DIRECTIONS if mask & bit]
@@ -0,0 +1,12 @@
+from game.Pathfinding.GridAStar import GridAStar
+from game.Pathfinding.HPAStar import HierarchicalPlanner
+from game.Pathfinding.JumpPointSearch import GridJPS
+
+# search cores that can be selected by name, e.g. with AStarPathing.algorithm.
+# All of them return compact paths (see `compact_path`) from ``search``, and
+# none of them depend on pyasge, so they can also run in worker processes
+ALGORITHMS = {
+    "astar": GridAStar,
+    "jps": GridJPS,
+    "hpa": HierarchicalPlanner,
+}
@@ -0,0 +1,42 @@
+import numpy as np
+
+
+def compact_path(tiles) -> np.ndarray:
+    """ Packs a path in to a read-only ``(N, 2)`` int32 array of (x, y) tiles
+
+    Paths are handed out of the cache to every agent walking them, so
+    they are made read-only rather than copied; slicing one (as the
+    cache does for suffixes) gives a read-only view of the same memory.
+    Paths that already are compact are returned as they are.
+
+    Args:
+        tiles: Any sequence of (x, y) pairs, or a compact path
+    """
+    if isinstance(tiles, np.ndarray) and tiles.dtype == np.int32 and not tiles.flags.writeable:
+        return tiles
+    path = np.array(tiles, dtype=np.int32).reshape(-1, 2)
+    path.flags.writeable = False
+    return path
+
+
+def path_from_indices(indices, width: int) -> np.ndarray:
+    """A compact path from flat ``y * width + x`` tile indices, as search cores store them."""
+    indices = np.array(indices, dtype=np.int32)
+    path = np.empty((len(indices), 2), dtype=np.int32)
+    np.divmod(indices, width, out=(path[:, 1], path[:, 0]))
+    path.flags.writeable = False
+    return path
+
+
+def tile_positions(path: np.ndarray, tile_size) -> np.ndarray:
+    """ The world positions of a path's tiles, worked out once for the whole path
+
+    Returns:
+        A read-only ``(N, 2)`` float64 array of each tile's top left corner
+    """
+    positions = path * np.asarray(tile_size, dtype=np.float64)
+    positions.flags.writeable = False
+    return positions
+
+
+EMPTY_PATH = compact_path(())
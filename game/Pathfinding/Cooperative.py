@@ -0,0 +1,335 @@
+from heapq import heappop, heappush
+
+from game.Pathfinding.CompactPath import compact_path, path_from_indices
+
+
+def without_loops(tiles: list) -> list:
+    """ Cuts out every part of a path that comes back to a tile it has already been on
+
+    A fitted path can wait or step aside and back to let others past;
+    the next window should follow the route, not repeat the dodges.
+    """
+    kept = []
+    seen = {}
+    for tile in tiles:
+        index = seen.get(tile)
+        if index is not None:
+            for dropped in kept[index + 1:]:
+                del seen[dropped]
+            del kept[index + 1:]
+        else:
+            seen[tile] = len(kept)
+            kept.append(tile)
+    return kept
+
+
+class ReservationTable:
+    """
+    Which agent will be on which tile when, for cooperative planning.
+
+    Keys are ``(tile, slot)`` pairs, a tile being its flat ``y * width
+    + x`` index and a slot one step of movement on a shared clock. Every
+    agent's keys are also kept by agent, so its reservations can be
+    dropped in one go when it plans again or stops.
+    """
+
+    def __init__(self) -> None:
+        self._owners = {}
+        self._held = {}
+
+    def __len__(self) -> int:
+        return len(self._owners)
+
+    @property
+    def lookup(self):
+        """ `owner` taking a ``(tile, slot)`` key, for hot loops
+
+        This is the table's own ``dict.get``, so it reads reservations
+        without going through a method call per lookup, and can't
+        change them.
+        """
+        return self._owners.get
+
+    def owner(self, tile: int, slot: int):
+        """The agent holding a tile at a slot, or None."""
+        return self._owners.get((tile, slot))
+
+    def blocked(self, agent, tile: int, slot: int) -> bool:
+        """Whether another agent holds the tile at that slot."""
+        owner = self._owners.get((tile, slot))
+        return owner is not None and owner != agent
+
+    def reserve(self, agent, tiles, slot: int) -> None:
+        """ Holds each of tiles for the agent, the first at slot and the rest one slot after another
+
+        Tiles another agent already holds are left to it.
+        """
+        owners = self._owners
+        held = self._held.setdefault(agent, [])
+        for offset, tile in enumerate(tiles):
+            key = (tile, slot + offset)
+            if key not in owners:
+                owners[key] = agent
+                held.append(key)
+
+    def release(self, agent) -> None:
+        """Drops every reservation the agent holds."""
+        owners = self._owners
+        for key in self._held.pop(agent, ()):
+            if owners.get(key) == agent:
+                del owners[key]
+
+    def clear(self) -> None:
+        self._owners.clear()
+        self._held.clear()
+
+
+class CooperativePlanner:
+    """
+    Windowed cooperative A* (WHCA*) for many agents sharing a grid.
+
+    Agents keep following spatial routes found the usual way (from the
+    shared path cache, so agents heading the same way reuse each
+    other's routes), but only after the first `window` steps of each
+    route have been fitted around everyone else's in a
+    `ReservationTable`. The fitting is an A* search over (tile, time)
+    in which an agent may also wait a step, and may not move on to a
+    tile another agent holds at that time or swap tiles with one. It
+    aims for the route's tile `window` steps along and then carries on
+    down the rest of the route, so deviations stay local. When the
+    start of a route is free of other agents it is taken as it is,
+    without searching at all.
+
+    Agents are queued with `submit` when they have a new route or have
+    walked half their window, and `advance` fits as many of them as a
+    fixed budget of search expansions allows per tick, oldest first;
+    the rest wait for the next tick. When the end of a window can't be
+    reached (say, someone is coming the other way down a corridor) the
+    agent takes the part of it that gets furthest along its route, and
+    has its next window fitted sooner.
+
+    This class has no dependency on pyasge so it can be used by tools
+    and benchmarks that run without a window.
+    """
+
+    # steps of every route fitted around other agents
+    WINDOW = 16
+    # expansions spent fitting windows per tick, shared between agents
+    BATCH_BUDGET = 400
+    # a single window gives up after this many expansions
+    AGENT_BUDGET = 200
+
+    def __init__(self, grid, window: int = WINDOW) -> None:
+        self.grid = grid
+        self.window = window
+        self.batch_budget = self.BATCH_BUDGET
+        self.agent_budget = self.AGENT_BUDGET
+        self.reservations = ReservationTable()
+        self.nodes_expanded = 0  # by the last `advance`
+        self.reused = 0  # windows taken straight from the route, over the planner's life
+        self.fitted = 0  # windows searched for successfully
+        self.partial = 0  # windows only fitted part of the way
+        self._waiting = {}  # agent -> None, an ordered set
+        self._tables = None
+        self._tables_version = None
+
+    def waiting(self, agent) -> bool:
+        """Whether the agent has been submitted and not yet planned."""
+        return agent in self._waiting
+
+    def submit(self, agent) -> None:
+        """Queues an agent to have its window fitted by `advance`."""
+        self._waiting[agent] = None
+
+    def hold(self, agent, tile, slot: int) -> None:
+        """ Keeps an agent's tile for it for a window from slot, while it waits to be planned
+
+        Args:
+            agent: The agent
+            tile (Tuple[int,int]): The tile it is standing on
+            slot: The current slot on the reservation clock
+        """
+        self.reservations.release(agent)
+        self.reservations.reserve(agent, [tile[1] * self.grid.width + tile[0]] * (self.window + 1), slot)
+
+    def release(self, agent) -> None:
+        """Forgets an agent, e.g. when it has finished its route or was given another."""
+        self._waiting.pop(agent, None)
+        self.reservations.release(agent)
+
+    def clear(self) -> None:
+        """Forgets every agent and reservation, e.g. for a new level."""
+        self._waiting.clear()
+        self.reservations.clear()
+
+    def advance(self, slot: int, locate, assign, budget: int = None) -> int:
+        """ Fits the windows of waiting agents until the budget runs out
+
+        Args:
+            slot: The current slot on the reservation clock
+            locate: Called with an agent, returns the compact route it
+                should follow from the tile it is on to its goal, or an
+                empty one if it no longer needs planning
+            assign: Called with an agent, its fitted path (a compact
+                path that may repeat a tile to wait) and how many of the
+                path's steps were fitted
+            budget: Expansions to spend, `batch_budget` if not given
+
+        Returns:
+            The number of expansions actually spent
+        """
+        budget = self.batch_budget if budget is None else budget
+        spent = 0
+        waiting = self._waiting
+        while waiting and spent < budget:
+            agent = next(iter(waiting))
+            del waiting[agent]
+            self.reservations.release(agent)
+            route = locate(agent)
+            if len(route) < 2:
+                continue
+            path, fitted, expanded = self.fit(agent, route, slot)
+            spent += max(expanded, 1)
+            assign(agent, path, fitted)
+        self.nodes_expanded = spent
+        return spent
+
+    def fit(self, agent, route, slot: int):
+        """ Fits the start of a route around the other agents' reservations, reserving it
+
+        Args:
+            agent: The agent following the route
+            route: A compact path from the agent's tile to its goal; any
+                loops or waits left in it from earlier windows are cut out
+            slot: The slot the agent is on its first tile
+
+        Returns:
+            ``(path, fitted, expanded)``: the path to follow, the number
+            of its steps that were fitted around other agents and the
+            search expansions spent
+        """
+        width = self.grid.width
+        tiles = (route[:, 1] * width + route[:, 0]).tolist()
+        if len(set(tiles)) != len(tiles):
+            tiles = without_loops(tiles)
+            route = path_from_indices(tiles, width)
+        end = min(self.window, len(tiles) - 1)
+        tiles = tiles[:end + 1]
+
+        if not any(self._conflict(agent, tiles[step - 1], tiles[step], slot + step) for step in range(1, end + 1)):
+            self.reservations.reserve(agent, tiles, slot)
+            self.reused += 1
+            return route, end, 0
+
+        found, back, reached, expanded = self._search(agent, tiles, self.window, slot)
+        self.reservations.reserve(agent, found, slot)
+        if reached == end:
+            self.fitted += 1
+        else:
+            self.partial += 1
+        path = compact_path(path_from_indices(found + back, width).tolist() + route[reached + 1:].tolist())
+        return path, len(found) - 1, expanded
+
+    def _conflict(self, agent, tile: int, following: int, slot: int) -> bool:
+        """Whether stepping from tile to following, arriving at slot, runs in to another agent."""
+        reservations = self.reservations
+        if reservations.blocked(agent, following, slot):
+            return True
+        # swapping tiles with an agent coming the other way
+        other = reservations.owner(following, slot - 1)
+        return other is not None and other != agent and reservations.owner(tile, slot) == other
+
+    def _grid_tables(self):
+        """Flat passable and neighbour lists of the grid, read again only when its costs change."""
+        grid = self.grid
+        if self._tables_version != grid.version:
+            width = grid.width
+            # a bit of 0 is waiting where the agent is
+            steps = tuple((bit, dy * width + dx) for bit, dx, dy in grid.DIRECTIONS) + ((0, 0),)
+            self._tables = grid.passable.ravel().tolist(), grid.neighbours.ravel().tolist(), steps
+            self._tables_version = grid.version
+        return self._tables
+
+    def _search(self, agent, tiles, horizon: int, slot: int):
+        """ Space-time A* along the start of a route, within horizon steps
+
+        Aims for the last of tiles (flat indices). If it can't be reached
+        without running in to another agent, settles for the state
+        furthest along the route at the end of the horizon, preferring
+        one on the route to one stepped aside from it, or, if every way
+        runs in to someone before then, the one that lasts longest.
+
+        Returns:
+            ``(found, back, reached, expanded)``: the tiles to step
+            through, one per slot, any tiles after those back to the
+            route, the index in tiles where they rejoin it and the
+            expansions spent
+        """
+        passable, neighbours, steps = self._grid_tables()
+        width = self.grid.width
+        start = tiles[0]
+        goal = tiles[-1]
+        along = {tile: index for index, tile in enumerate(tiles)}
+        gx, gy = goal % width, goal // width
+        owner_of = self.reservations.lookup
+
+        h = abs(start % width - gx) + abs(start // width - gy)
+        frontier = [(h, h, 0, 0, start)]
+        parents = {(start, 0): None}
+        best = None  # (route index, -time, tile) of the furthest state lasting the horizon
+        lasting = (0, 0, start)  # (time, route index, tile) of the longest lasting state on the route
+        sequence = 1
+        expanded = 0
+        while frontier and expanded < self.agent_budget:
+            _, _, _, time, tile = heappop(frontier)
+            if tile in along:
+                lasting = max(lasting, (time, along[tile], tile))
+            if tile == goal:
+                best = (along[tile], -time, tile)
+                break
+            if time >= horizon:
+                # off the route counts as no progress, but beats running in to someone
+                progress = (along.get(tile, -1), -time, tile)
+                if best is None or progress > best:
+                    best = progress
+                continue
+            expanded += 1
+            mask = neighbours[tile]
+            arrival = slot + time + 1
+            # whoever is on this tile next slot, if they came from a neighbour
+            incoming = owner_of((tile, arrival))
+            for bit, offset in steps:
+                if bit and not mask & bit:
+                    continue
+                following = tile + offset
+                state = (following, time + 1)
+                if state in parents or (not bit and not passable[tile]):
+                    continue
+                # the same checks as `_conflict`, inlined for the hot loop
+                owner = owner_of((following, arrival))
+                if owner is not None and owner != agent:
+                    continue
+                if incoming is not None and incoming != agent and owner_of((following, arrival - 1)) == incoming:
+                    continue
+                parents[state] = (tile, time)
+                h = abs(following % width - gx) + abs(following // width - gy)
+                heappush(frontier, (time + 1 + h, h, sequence, time + 1, following))
+                sequence += 1
+
+        if best is None:
+            time, reached, tile = lasting
+        else:
+            reached, time, tile = best
+            time = -time
+        found = []
+        state = (tile, time)
+        while state is not None:
+            found.append(state[0])
+            state = parents[state]
+        found.reverse()
+        if reached < 0:
+            # stepped aside off the route: go back the way it came to where it left
+            left = max(index for index, tile in enumerate(found) if tile in along)
+            reached = along[found[left]]
+            return found, found[left:-1][::-1], reached, expanded
+        return found, [], reached, expanded
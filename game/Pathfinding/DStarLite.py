@@ -0,0 +1,270 @@
+from heapq import heappop, heappush
+
+from game.Pathfinding.CompactPath import EMPTY_PATH, compact_path, path_from_indices
+
+INFINITY = float("inf")
+
+
+class DStarLite:
+    """
+    Incremental replanning (D* Lite) over a uniform-cost, 4-connected tile grid.
+
+    One `DStarLite` holds the flattened passable and neighbour tables of
+    a `CostGrid`, shared by every agent planning on it; each agent keeps
+    its own search state in a `DStarLiteSearch` made with `begin`. The
+    tables are patched from `CostGrid.changed_cells` when tiles change
+    with `CostGrid.set_cost`, and rebuilt only if the grid was refreshed
+    as a whole.
+
+    This class has no dependency on pyasge so it can be used by tools
+    and benchmarks that run without a window.
+    """
+
+    def __init__(self, grid) -> None:
+        self.grid = grid
+        self.width = grid.width
+        self.height = grid.height
+        self.steps = tuple((bit, dy * grid.width + dx) for bit, dx, dy in grid.DIRECTIONS)
+        self._load()
+
+    def _load(self) -> None:
+        self.passable = self.grid.passable.ravel().tolist()
+        self.neighbours = self.grid.neighbours.ravel().tolist()
+        self.version = self.grid.version
+
+    def sync(self) -> None:
+        """Brings the tables up to date with the grid's costs."""
+        if self.version == self.grid.version:
+            return
+        changed = self.grid.changed_cells(self.version)
+        if changed is None:
+            self._load()
+            return
+
+        grid = self.grid
+        for x, y in changed:
+            for nx, ny in ((x, y), (x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+                if grid.in_bounds(nx, ny):
+                    self.passable[ny * self.width + nx] = bool(grid.passable[ny, nx])
+                    self.neighbours[ny * self.width + nx] = int(grid.neighbours[ny, nx])
+        self.version = grid.version
+
+    def begin(self, start, goal) -> "DStarLiteSearch":
+        """ Starts planning an agent's route, see `DStarLiteSearch`
+
+        Args:
+            start (Tuple[int,int]): The tile the agent is on
+            goal (Tuple[int,int]): The tile it is heading for
+        """
+        return DStarLiteSearch(self, start, goal)
+
+
+class DStarLiteSearch:
+    """
+    One agent's route to a fixed goal, kept up to date as it moves and as tiles change.
+
+    The search runs backwards from the goal, so a tile's g-cost is its
+    distance to the goal and stays valid wherever the agent walks.
+    `move_to` tells it where the agent has got to and `path` gives the
+    route from there. When the grid's costs have changed since the last
+    call, `path` only re-opens the tiles around the changed ones and
+    the search repairs the distances that depended on them, rather
+    than starting again. g-costs and right-hand side (one step
+    lookahead) values are kept in dicts, so an agent only holds state
+    for the tiles its searches touched.
+
+    Like `GridAStar`, an agent may start inside a wall and step out of
+    it, but never walks through one, and a goal in another connected
+    region (see `CostGrid.components`) is given up on without searching.
+    """
+
+    def __init__(self, core: DStarLite, start, goal) -> None:
+        self.core = core
+        self.goal = tuple(goal)
+        self.start = tuple(start)
+        self.nodes_expanded = 0  # over the whole life of the search
+        self.repairs = 0
+        self._restart()
+
+    def _index(self, tile) -> int:
+        return tile[1] * self.core.width + tile[0]
+
+    def _restart(self) -> None:
+        self.core.sync()
+        self.version = self.core.version
+        self._start_index = self._last_index = self._index(self.start)
+        self._goal_index = self._index(self.goal)
+        self._g = {}
+        self._rhs = {self._goal_index: 0}
+        self._queue = []  # (k1, k2, sequence, tile), stale entries skipped
+        self._queued = {}  # tile -> its current key
+        self._sequence = 0
+        self._km = 0
+        self._push(self._goal_index, (self._heuristic(self._goal_index), 0))
+
+    def _heuristic(self, index: int) -> int:
+        width = self.core.width
+        start = self._start_index
+        return abs(index % width - start % width) + abs(index // width - start // width)
+
+    def _key(self, index: int):
+        best = min(self._g.get(index, INFINITY), self._rhs.get(index, INFINITY))
+        return best + self._heuristic(index) + self._km, best
+
+    def _push(self, index: int, key) -> None:
+        self._queued[index] = key
+        heappush(self._queue, (key[0], key[1], self._sequence, index))
+        self._sequence += 1
+
+    def _update(self, index: int) -> None:
+        if self._g.get(index, INFINITY) != self._rhs.get(index, INFINITY):
+            self._push(index, self._key(index))
+        else:
+            self._queued.pop(index, None)
+
+    def _open(self, index: int) -> bool:
+        return self.core.passable[index] or index == self._start_index
+
+    def _lookahead(self, index: int):
+        """The best cost to the goal through any open neighbour."""
+        if not self._open(index):
+            return INFINITY
+        g = self._g
+        mask = self.core.neighbours[index]
+        return min((g.get(index + offset, INFINITY) for bit, offset in self.core.steps if mask & bit),
+                   default=INFINITY) + 1
+
+    def _predecessors(self, index: int):
+        """The tiles that can step on to this one."""
+        if not self.core.passable[index]:
+            return []
+        mask = self.core.neighbours[index]
+        found = [index + offset for bit, offset in self.core.steps if mask & bit]
+        start = self._start_index
+        if not self.core.passable[start] and abs(start - index) in (1, self.core.width):
+            found.append(start)  # stepping out of a wall
+        return found
+
+    def move_to(self, tile) -> None:
+        """ Tells the search the agent is now on another tile """
+        tile = tuple(tile)
+        if tile == self.start:
+            return
+        self.start = tile
+        self._start_index = self._index(tile)
+        # keys already queued were worked out against the old start
+        self._km += self._heuristic(self._last_index)
+        self._last_index = self._start_index
+
+    def _repair(self, cells) -> None:
+        core = self.core
+        goal = self._goal_index
+        touched = set()
+        for x, y in cells:
+            for nx, ny in ((x, y), (x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+                if 0 <= nx < core.width and 0 <= ny < core.height:
+                    touched.add(ny * core.width + nx)
+        for index in touched:
+            if index != goal:
+                self._rhs[index] = self._lookahead(index)
+                self._update(index)
+        self.repairs += 1
+
+    def _top(self):
+        queue = self._queue
+        queued = self._queued
+        while queue:
+            k1, k2, _, index = queue[0]
+            if queued.get(index) == (k1, k2):
+                return (k1, k2), index
+            heappop(queue)
+        return None
+
+    def _compute(self) -> int:
+        g = self._g
+        rhs = self._rhs
+        goal = self._goal_index
+        start = self._start_index
+        expanded = 0
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            key, index = top
+            if not (key < self._key(start) or rhs.get(start, INFINITY) > g.get(start, INFINITY)):
+                break
+
+            fresh = self._key(index)
+            if key < fresh:
+                self._push(index, fresh)
+                continue
+
+            expanded += 1
+            del self._queued[index]
+            old = g.get(index, INFINITY)
+            best = rhs.get(index, INFINITY)
+            if old > best:
+                g[index] = best
+                for predecessor in self._predecessors(index):
+                    if predecessor != goal and best + 1 < rhs.get(predecessor, INFINITY):
+                        rhs[predecessor] = best + 1
+                        self._update(predecessor)
+            else:
+                g[index] = INFINITY
+                for predecessor in self._predecessors(index) + [index]:
+                    if predecessor != goal and (predecessor == index or rhs.get(predecessor) == old + 1):
+                        rhs[predecessor] = self._lookahead(predecessor)
+                    self._update(predecessor)
+
+        self.nodes_expanded += expanded
+        return expanded
+
+    def path(self):
+        """ The shortest route from the agent's tile to the goal
+
+        Repairs the search first if the grid's costs changed.
+
+        Returns:
+            A compact path (see `compact_path`) from the agent's tile to
+            the goal inclusive, empty if the goal can not be reached
+        """
+        if self.start == self.goal:
+            return compact_path([self.start])
+
+        core = self.core
+        if self.version != core.grid.version:
+            changed = core.grid.changed_cells(self.version)
+            if changed is None:
+                self._restart()
+            else:
+                core.sync()
+                self._repair(changed)
+                self.version = core.version
+        if not core.grid.connected(self.start, self.goal):
+            # nothing to repair towards; the queue is kept for when it opens up again
+            return EMPTY_PATH
+        self._compute()
+
+        g = self._g
+        index = self._start_index
+        if min(g.get(index, INFINITY), self._rhs.get(index, INFINITY)) == INFINITY:
+            return EMPTY_PATH
+
+        # walk downhill on g, which leads to the goal along a shortest route
+        indices = [index]
+        limit = core.width * core.height
+        while index != self._goal_index:
+            if not self._open(index) or len(indices) > limit:
+                return EMPTY_PATH
+            mask = core.neighbours[index]
+            best = INFINITY
+            following = None
+            for bit, offset in core.steps:
+                if mask & bit and g.get(index + offset, INFINITY) < best:
+                    best = g[index + offset]
+                    following = index + offset
+            if following is None:
+                return EMPTY_PATH
+            index = following
+            indices.append(index)
+        return path_from_indices(indices, core.width)
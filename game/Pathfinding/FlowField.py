@@ -0,0 +1,125 @@
+import numpy as np
+
+
+class FlowField:
+    """
+    A shared distance map for steering many agents towards one goal.
+
+    Rather than every chasing agent running its own search to the same
+    tile, a single breadth first search is run backwards from the goal
+    over the whole grid. Each frontier is expanded as one NumPy
+    operation, so the cost is one vectorised pass per distance ring
+    instead of one Python loop iteration per tile. Every tile then
+    stores the neighbouring tile that is one step closer to the goal,
+    and an agent follows the field with an O(1) lookup per move.
+
+    Steps have a uniform cost, so the breadth first distances are the
+    same as the ones Dijkstra (or A*) would find.
+    """
+
+    def __init__(self, grid) -> None:
+        self.grid = grid
+        self.goal = None
+        self.distance = None
+        self.next_tile = None
+        self.rebuilds = 0
+        self._version = None
+        self._adjacency = None
+
+    def update(self, goal) -> bool:
+        """ Points the field at goal, rebuilding only if something changed
+
+        Args:
+            goal (Tuple[int,int]): The tile agents should head for
+
+        Returns:
+            True if the field had to be rebuilt
+        """
+        if goal == self.goal and self._version == self.grid.version:
+            return False
+
+        self.rebuild(goal)
+        return True
+
+    def rebuild(self, goal) -> None:
+        grid = self.grid
+        size = grid.width * grid.height
+        if self._version != grid.version:
+            self._adjacency = self._build_adjacency()
+
+        # index ``size`` is a sentinel that blocked directions point at;
+        # it is marked as visited so it never joins a frontier
+        adjacency = self._adjacency
+        distance = np.full(size + 1, -1, dtype=np.int32)
+        distance[size] = 0
+        first_seen = np.zeros(size + 1, dtype=np.intp)
+
+        gx, gy = goal
+        if grid.is_passable(gx, gy):
+            frontier = np.array([gy * grid.width + gx], dtype=np.intp)
+            distance[frontier] = 0
+            ring = 0
+            while frontier.size:
+                reached = adjacency[frontier].ravel()
+                reached = reached[distance[reached] < 0]
+
+                # drop tiles reached from more than one frontier tile
+                order = np.arange(reached.size)
+                first_seen[reached] = order
+                reached = reached[first_seen[reached] == order]
+
+                ring += 1
+                distance[reached] = ring
+                frontier = reached
+
+        # every tile (walls included, so agents stuck in one can get out)
+        # points at its neighbour with the lowest distance to the goal
+        neighbour_distance = distance[adjacency[:size]].astype(np.int64)
+        neighbour_distance[(neighbour_distance < 0) | (adjacency[:size] == size)] = np.iinfo(np.int32).max
+        closest = neighbour_distance.argmin(axis=1)
+        tiles = np.arange(size)
+        best = neighbour_distance[tiles, closest]
+        own = distance[:size]
+        downhill = (best < np.iinfo(np.int32).max) & ((own < 0) | (best < own))
+
+        next_tile = np.full(size, -1, dtype=np.int32)
+        next_tile[downhill] = adjacency[tiles[downhill], closest[downhill]]
+
+        self.goal = goal
+        self.distance = own
+        self.next_tile = next_tile
+        self._version = grid.version
+        self.rebuilds += 1
+
+    def _build_adjacency(self) -> np.ndarray:
+        """The up, right, down and left neighbour of every tile, ``size`` where blocked."""
+        grid = self.grid
+        size = grid.width * grid.height
+        neighbours = grid.neighbours.ravel()
+        tiles = np.arange(size, dtype=np.intp)
+        adjacency = np.full((size + 1, 4), size, dtype=np.intp)
+        for column, (bit, dx, dy) in enumerate(grid.DIRECTIONS):
+            open_side = (neighbours & bit) != 0
+            adjacency[:size, column][open_side] = tiles[open_side] + dy * grid.width + dx
+        return adjacency
+
+    def distance_to_goal(self, x: int, y: int) -> int:
+        """Steps from (x, y) to the goal, or -1 if it can't be reached."""
+        if not self.grid.in_bounds(x, y):
+            return -1
+        return int(self.distance[y * self.grid.width + x])
+
+    def next_step(self, x: int, y: int):
+        """ The next tile to move to when heading for the goal
+
+        Returns:
+            An (x, y) tile, or None if (x, y) is the goal or the goal
+            can not be reached from it.
+        """
+        if not self.grid.in_bounds(x, y):
+            return None
+
+        index = int(self.next_tile[y * self.grid.width + x])
+        if index < 0:
+            return None
+        return index % self.grid.width, index // self.grid.width
@@ -0,0 +1,237 @@
+from array import array
+from enum import Enum
+from heapq import heappop, heappush
+
+import numpy as np
+
+from game.Pathfinding.CompactPath import EMPTY_PATH, compact_path, path_from_indices
+
+
+class SearchStatus(Enum):
+    PENDING = 'pending'
+    FOUND = 'found'
+    UNREACHABLE = 'unreachable'
+    ABANDONED = 'abandoned'
+
+
+class GridAStar:
+    """
+    A* search over a uniform-cost, 4-connected tile grid.
+
+    The grid is flattened so that every tile is addressed by a single
+    integer index (``y * width + x``) and neighbours are read from the
+    precomputed `CostGrid` neighbour bitmask. The frontier is a binary
+    heap of ``(f, h, sequence, index)`` tuples: ties on ``f`` prefer the
+    tile closest to the goal, and the sequence number keeps the
+    ordering stable without ever comparing node objects. Best known
+    g-costs, parents and the closed set are flat arrays indexed by tile,
+    so a search allocates three buffers rather than a node object or
+    dict entry per tile it touches. Stale heap entries are skipped when
+    popped (lazy deletion) instead of being searched for and removed.
+    Paths come back compact (see `compact_path`).
+
+    Searches can be run to completion with `search`, or started with
+    `begin` and advanced a bounded number of expansions at a time so a
+    long query is spread over several frames. Goals in a different
+    connected region to the start (see `CostGrid.components`) are
+    rejected without expanding anything.
+
+    This class has no dependency on pyasge so it can be used by tools
+    and benchmarks that run without a window.
+    """
+
+    def __init__(self, grid) -> None:
+        self.grid = grid
+        self.width = grid.width
+        self.height = grid.height
+
+        # plain lists index far faster than numpy scalars in the hot loop
+        self.passable = grid.passable.ravel().tolist()
+        self.neighbours = grid.neighbours.ravel().tolist()
+        width = grid.width
+        self.steps = tuple((bit, dy * width + dx, dx, dy) for bit, dx, dy in grid.DIRECTIONS)
+        self.nodes_expanded = 0
+
+    def search(self, start, goal) -> np.ndarray:
+        """ Finds the shortest path between two tiles
+
+        Args:
+            start (Tuple[int,int]): The tile to start from
+            goal (Tuple[int,int]): The tile to reach
+
+        Returns:
+            A read-only ``(N, 2)`` int32 array of (x, y) tiles from start
+            to goal inclusive, empty when the goal can not be reached.
+        """
+        search = self.begin(start, goal)
+        search.step()
+        self.nodes_expanded = search.nodes_expanded
+        return search.path
+
+    def begin(self, start, goal, max_expansions: int = None) -> "IncrementalSearch":
+        """ Starts a search that can be advanced a few nodes at a time
+
+        Args:
+            start (Tuple[int,int]): The tile to start from
+            goal (Tuple[int,int]): The tile to reach
+            max_expansions: Give up once this many nodes have been
+                expanded in total, or None to search until done
+
+        Returns:
+            An `IncrementalSearch`; call its ``step`` until it is no
+            longer pending.
+        """
+        return IncrementalSearch(self, start, goal, max_expansions)
+
+    def update_cells(self, cells) -> None:
+        """ Re-reads the tables around tiles whose costs changed (see `CostGrid.set_cost`)
+
+        Args:
+            cells: An iterable of (x, y) tiles whose costs were changed
+        """
+        grid = self.grid
+        for x, y in cells:
+            for nx, ny in ((x, y), (x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+                if grid.in_bounds(nx, ny):
+                    self.passable[ny * self.width + nx] = bool(grid.passable[ny, nx])
+                    self.neighbours[ny * self.width + nx] = int(grid.neighbours[ny, nx])
+
+    def _retrace(self, parents, index):
+        indices = []
+        while index != -1:
+            indices.append(index)
+            index = parents[index]
+        indices.reverse()
+        return path_from_indices(indices, self.width)
+
+
+class IncrementalSearch:
+    """
+    A single A* query that can be paused and resumed.
+
+    All of the search state (frontier, g-costs, parents and closed set)
+    lives on the object, so `step` can stop after a given number of
+    expansions and carry on from the same place on the next call. The
+    result is exactly the path `GridAStar.search` would return.
+
+    Queries that can be answered without searching (start equals goal,
+    tiles off the map, a blocked goal or a goal in another connected
+    region) are finished as soon as the object is created.
+    """
+
+    def __init__(self, core: GridAStar, start, goal, max_expansions: int = None) -> None:
+        self.core = core
+        self.start = start
+        self.goal = goal
+        self.max_expansions = max_expansions
+        self.status = SearchStatus.PENDING
+        self.path = EMPTY_PATH
+        self.nodes_expanded = 0
+
+        width = core.width
+        height = core.height
+        if start == goal:
+            self._finish(SearchStatus.FOUND, compact_path([start]))
+            return
+
+        sx, sy = start
+        gx, gy = goal
+        if not (0 <= sx < width and 0 <= sy < height) \
+                or not (0 <= gx < width and 0 <= gy < height) or not core.passable[gy * width + gx]:
+            self._finish(SearchStatus.UNREACHABLE)
+            return
+
+        if not core.grid.connected(start, goal):
+            self._finish(SearchStatus.UNREACHABLE)
+            return
+
+        self._start_index = sy * width + sx
+        self._goal_index = gy * width + gx
+
+        h = abs(sx - gx) + abs(sy - gy)
+        cells = width * height
+        self._frontier = [(h, h, 0, self._start_index)]
+        # no path is longer than the number of tiles, so that marks unseen ones
+        self._best_g = [cells] * cells
+        self._best_g[self._start_index] = 0
+        self._parents = array("i", [-1]) * cells
+        self._closed = bytearray(cells)
+        self._sequence = 1
+
+    @property
+    def pending(self) -> bool:
+        return self.status is SearchStatus.PENDING
+
+    def step(self, budget: int = None) -> SearchStatus:
+        """ Expands at most budget more nodes
+
+        Args:
+            budget: The number of nodes to expand before pausing, or
+                None to run until the search finishes
+
+        Returns:
+            The status of the search after this call
+        """
+        if self.status is not SearchStatus.PENDING:
+            return self.status
+
+        core = self.core
+        width = core.width
+        neighbours = core.neighbours
+        steps = core.steps
+        gx, gy = self.goal
+        goal_index = self._goal_index
+        frontier = self._frontier
+        best_g = self._best_g
+        parents = self._parents
+        closed = self._closed
+        sequence = self._sequence
+
+        remaining = budget if budget is not None else float("inf")
+        if self.max_expansions is not None:
+            remaining = min(remaining, self.max_expansions - self.nodes_expanded)
+        expanded = 0
+
+        while frontier and expanded < remaining:
+            _, _, _, index = heappop(frontier)
+            if closed[index]:
+                continue
+            if index == goal_index:
+                self.nodes_expanded += expanded
+                self._finish(SearchStatus.FOUND, core._retrace(parents, index))
+                return self.status
+
+            closed[index] = 1
+            expanded += 1
+
+            x = index % width
+            y = index // width
+            g = best_g[index] + 1
+
+            mask = neighbours[index]
+            for bit, offset, dx, dy in steps:
+                if not mask & bit:
+                    continue
+                neighbour = index + offset
+                if closed[neighbour]:
+                    continue
+                if g < best_g[neighbour]:
+                    best_g[neighbour] = g
+                    parents[neighbour] = index
+                    h = abs(x + dx - gx) + abs(y + dy - gy)
+                    heappush(frontier, (g + h, h, sequence, neighbour))
+                    sequence += 1
+
+        self._sequence = sequence
+        self.nodes_expanded += expanded
+        if not frontier:
+            self._finish(SearchStatus.UNREACHABLE)
+        elif self.max_expansions is not None and self.nodes_expanded >= self.max_expansions:
+            self._finish(SearchStatus.ABANDONED)
+        return self.status
+
+    def _finish(self, status: SearchStatus, path=None) -> None:
+        self.status = status
+        self.path = EMPTY_PATH if path is None else path
+        # the bookkeeping can be large, drop it as soon as it is unneeded
+        self._frontier = self._best_g = self._parents = self._closed = None
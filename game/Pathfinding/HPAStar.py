@@ -0,0 +1,377 @@
+from collections import deque
+from heapq import heappop, heappush
+
+import numpy as np
+
+from game.Pathfinding.CompactPath import EMPTY_PATH, compact_path, path_from_indices
+
+
+class HierarchicalPlanner:
+    """
+    Hierarchical path planning (HPA*) over a `CostGrid`.
+
+    The map is cut in to square clusters. Wherever two neighbouring
+    clusters share a run of open tiles along their border, one or two
+    transitions (pairs of facing tiles) are placed on it; these tiles
+    are the nodes of a small abstract graph. Nodes in the same cluster
+    are joined by edges holding their walking distance inside the
+    cluster, and the two tiles of a transition by an edge of cost 1.
+
+    A long query connects its start and goal to the nodes of their own
+    clusters, runs A* over the abstract graph and then refines each
+    abstract edge back in to tiles with a search confined to a single
+    cluster. Refined edges are cached, so repeated routes through the
+    same area are mostly lookups. Paths are near optimal rather than
+    optimal; short queries are better served by `GridAStar`.
+
+    When costs change, `update_cells` rebuilds only the clusters that
+    contain the changed tiles (and the transitions on their borders).
+    """
+
+    # a border run longer than this gets a transition at each end
+    # instead of a single one in the middle
+    WIDE_ENTRANCE = 6
+
+    def __init__(self, grid, cluster_size: int = 16) -> None:
+        self.grid = grid
+        self.width = grid.width
+        self.height = grid.height
+        self.cluster_size = cluster_size
+        self.clusters_x = (grid.width + cluster_size - 1) // cluster_size
+        self.clusters_y = (grid.height + cluster_size - 1) // cluster_size
+        self.nodes_expanded = 0
+
+        self.transitions = {}  # border -> [(tile, tile)]
+        self.inter_edges = {}  # tile -> {tile on the other side of a border}
+        self.intra_edges = {}  # cluster -> {tile: {tile: cost}}
+        self.graph = {}  # tile -> [(tile, cost)], both kinds of edge merged for searching
+        self.refined = {}  # cluster -> {(tile, tile): tuple of tiles}
+
+        self._load_grid()
+        for border in self._all_borders():
+            self._build_border(border)
+        for cluster in self._all_clusters():
+            self._build_cluster(cluster)
+
+    def _load_grid(self) -> None:
+        self.passable = self.grid.passable.ravel().tolist()
+        self.neighbours = self.grid.neighbours.ravel().tolist()
+        self.steps = tuple((bit, dy * self.width + dx) for bit, dx, dy in self.grid.DIRECTIONS)
+
+    # -- structure ---------------------------------------------------------
+
+    def cluster_of(self, index: int):
+        return (index % self.width) // self.cluster_size, (index // self.width) // self.cluster_size
+
+    def _bounds(self, cluster):
+        cx, cy = cluster
+        size = self.cluster_size
+        return cx * size, cy * size, min((cx + 1) * size, self.width), min((cy + 1) * size, self.height)
+
+    def _all_clusters(self):
+        return [(cx, cy) for cy in range(self.clusters_y) for cx in range(self.clusters_x)]
+
+    def _all_borders(self):
+        borders = []
+        for cx, cy in self._all_clusters():
+            if cx + 1 < self.clusters_x:
+                borders.append(((cx, cy), (cx + 1, cy)))
+            if cy + 1 < self.clusters_y:
+                borders.append(((cx, cy), (cx, cy + 1)))
+        return borders
+
+    def _borders_of(self, cluster):
+        cx, cy = cluster
+        borders = []
+        if cx > 0:
+            borders.append(((cx - 1, cy), cluster))
+        if cy > 0:
+            borders.append(((cx, cy - 1), cluster))
+        if cx + 1 < self.clusters_x:
+            borders.append((cluster, (cx + 1, cy)))
+        if cy + 1 < self.clusters_y:
+            borders.append((cluster, (cx, cy + 1)))
+        return borders
+
+    def _cluster_nodes(self, cluster):
+        nodes = set()
+        for border in self._borders_of(cluster):
+            side = 0 if border[0] == cluster else 1
+            nodes.update(pair[side] for pair in self.transitions.get(border, ()))
+        return nodes
+
+    def _build_border(self, border) -> None:
+        """Places transitions along the border between two clusters."""
+        for a, b in self.transitions.pop(border, ()):
+            self.inter_edges[a].discard(b)
+            self.inter_edges[b].discard(a)
+
+        first, second = border
+        min_x, min_y, max_x, max_y = self._bounds(first)
+        width = self.width
+        if second[0] != first[0]:
+            # vertical border: first's right column faces second's left column
+            pairs = [(y * width + max_x - 1, y * width + max_x) for y in range(min_y, max_y)]
+        else:
+            pairs = [((max_y - 1) * width + x, max_y * width + x) for x in range(min_x, max_x)]
+
+        transitions = []
+        run = []
+        for a, b in pairs + [(None, None)]:
+            if a is not None and self.passable[a] and self.passable[b]:
+                run.append((a, b))
+                continue
+            if run:
+                if len(run) > self.WIDE_ENTRANCE:
+                    transitions += [run[0], run[-1]]
+                else:
+                    transitions.append(run[len(run) // 2])
+                run = []
+
+        self.transitions[border] = transitions
+        for a, b in transitions:
+            self.inter_edges.setdefault(a, set()).add(b)
+            self.inter_edges.setdefault(b, set()).add(a)
+
+    def _build_cluster(self, cluster) -> None:
+        """Links every pair of nodes inside a cluster by their walking distance."""
+        for node in self.intra_edges.get(cluster, ()):
+            self.graph.pop(node, None)
+
+        nodes = self._cluster_nodes(cluster)
+        bounds = self._bounds(cluster)
+        edges = {}
+        for node in nodes:
+            distances = self._distances(node, bounds, nodes)
+            edges[node] = {other: cost for other, cost in distances.items() if other != node}
+            self.graph[node] = list(edges[node].items()) + [(other, 1) for other in self.inter_edges[node]]
+
+        self.intra_edges[cluster] = edges
+        self.refined[cluster] = {}
+
+    def update_cells(self, cells) -> None:
+        """ Rebuilds the clusters holding the given tiles after their costs changed
+
+        Args:
+            cells: An iterable of (x, y) tiles whose costs were changed
+        """
+        cells = list(cells)
+        for x, y in cells:
+            for nx, ny in ((x, y), (x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+                if self.grid.in_bounds(nx, ny):
+                    self.passable[ny * self.width + nx] = bool(self.grid.passable[ny, nx])
+                    self.neighbours[ny * self.width + nx] = int(self.grid.neighbours[ny, nx])
+
+        dirty = {self.cluster_of(y * self.width + x) for x, y in cells}
+        borders = {border for cluster in dirty for border in self._borders_of(cluster)}
+        for border in borders:
+            self._build_border(border)
+
+        # clusters across a rebuilt border may have gained or lost nodes too
+        for cluster in {cluster for border in borders for cluster in border} | dirty:
+            self._build_cluster(cluster)
+
+    # -- cluster local searches ----------------------------------------------
+
+    def _distances(self, source: int, bounds, targets) -> dict:
+        """Breadth first distances from source to the targets reachable inside bounds."""
+        min_x, min_y, max_x, max_y = bounds
+        width = self.width
+        neighbours = self.neighbours
+        steps = self.steps
+        remaining = len(targets) - (source in targets)
+        found = {source: 0}
+        seen = {source: 0}
+        frontier = deque([source])
+        while frontier and remaining:
+            index = frontier.popleft()
+            cost = seen[index] + 1
+            mask = neighbours[index]
+            for bit, offset in steps:
+                if not mask & bit:
+                    continue
+                neighbour = index + offset
+                if neighbour in seen:
+                    continue
+                x = neighbour % width
+                y = neighbour // width
+                if not (min_x <= x < max_x and min_y <= y < max_y):
+                    continue
+                seen[neighbour] = cost
+                frontier.append(neighbour)
+                if neighbour in targets:
+                    found[neighbour] = cost
+                    remaining -= 1
+        return found
+
+    def _local_path(self, source: int, target: int, bounds):
+        """Breadth first path from source to target that stays inside bounds."""
+        if source == target:
+            return (source,)
+
+        min_x, min_y, max_x, max_y = bounds
+        width = self.width
+        neighbours = self.neighbours
+        steps = self.steps
+        parents = {source: -1}
+        frontier = deque([source])
+        while frontier:
+            index = frontier.popleft()
+            mask = neighbours[index]
+            for bit, offset in steps:
+                if not mask & bit:
+                    continue
+                neighbour = index + offset
+                if neighbour in parents:
+                    continue
+                x = neighbour % width
+                y = neighbour // width
+                if not (min_x <= x < max_x and min_y <= y < max_y):
+                    continue
+                parents[neighbour] = index
+                if neighbour == target:
+                    path = []
+                    while neighbour != -1:
+                        path.append(neighbour)
+                        neighbour = parents[neighbour]
+                    path.reverse()
+                    return tuple(path)
+                frontier.append(neighbour)
+        return None
+
+    # -- queries ---------------------------------------------------------------
+
+    def search(self, start, goal) -> np.ndarray:
+        """ Finds a near optimal path between two tiles
+
+        Args:
+            start (Tuple[int,int]): The tile to start from
+            goal (Tuple[int,int]): The tile to reach
+
+        Returns:
+            A read-only ``(N, 2)`` int32 array of (x, y) tiles from start
+            to goal inclusive, empty when the goal can not be reached.
+        """
+        self.nodes_expanded = 0
+        if start == goal:
+            return compact_path([start])
+
+        width = self.width
+        sx, sy = start
+        gx, gy = goal
+        if not self.grid.in_bounds(sx, sy) or not self.grid.is_passable(gx, gy):
+            return EMPTY_PATH
+        if not self.grid.connected(start, goal):
+            return EMPTY_PATH
+
+        start_index = sy * width + sx
+        goal_index = gy * width + gx
+        if not self.passable[start_index]:
+            # agents can start inside a wall; plan from each way out of it
+            # instead, as the start's own cluster may not hold any of them
+            options = [self.search((sx + dx, sy + dy), goal) for bit, dx, dy in self.grid.DIRECTIONS
+                       if self.neighbours[start_index] & bit]
+            options = [path for path in options if len(path)]
+            if not options:
+                return EMPTY_PATH
+            return compact_path([start] + min(options, key=len).tolist())
+
+        start_cluster = self.cluster_of(start_index)
+        goal_cluster = self.cluster_of(goal_index)
+
+        if start_cluster == goal_cluster:
+            local = self._local_path(start_index, goal_index, self._bounds(start_cluster))
+            if local is not None:
+                return path_from_indices(local, width)
+
+        # temporary edges from the start and in to the goal, unless they
+        # already are nodes of the abstract graph
+        start_edges = self._entry_edges(start_index, start_cluster)
+        goal_edges = self._entry_edges(goal_index, goal_cluster)
+        if start_edges is not None and not start_edges or goal_edges is not None and not goal_edges:
+            return EMPTY_PATH
+
+        abstract = self._abstract_search(start_index, goal_index, start_edges, goal_edges)
+        if not abstract:
+            return EMPTY_PATH
+
+        tiles = [start_index]
+        for a, b in zip(abstract, abstract[1:]):
+            tiles.extend(self._refine(a, b)[1:])
+        return path_from_indices(tiles, width)
+
+    def _entry_edges(self, index: int, cluster):
+        nodes = self._cluster_nodes(cluster)
+        if index in nodes:
+            return None
+        distances = self._distances(index, self._bounds(cluster), nodes)
+        del distances[index]
+        return distances
+
+    def _abstract_search(self, start: int, goal: int, start_edges: dict, goal_edges: dict):
+        width = self.width
+        gx = goal % width
+        gy = goal // width
+        graph = self.graph
+        best_g = {start: 0}
+        parents = {start: -1}
+        closed = set()
+        frontier = [(0, 0, 0, start)]
+        sequence = 1
+        expanded = 0
+
+        while frontier:
+            _, _, _, node = heappop(frontier)
+            if node in closed:
+                continue
+            if node == goal:
+                self.nodes_expanded = expanded
+                path = []
+                while node != -1:
+                    path.append(node)
+                    node = parents[node]
+                path.reverse()
+                return path
+
+            closed.add(node)
+            expanded += 1
+            g = best_g[node]
+
+            if node == start and start_edges is not None:
+                edges = start_edges.items()
+            else:
+                edges = graph[node]
+            if goal_edges is not None and node in goal_edges:
+                edges = list(edges) + [(goal, goal_edges[node])]
+
+            for other, cost in edges:
+                if other in closed:
+                    continue
+                cost += g
+                if cost < best_g.get(other, cost + 1):
+                    best_g[other] = cost
+                    parents[other] = node
+                    h = abs(other % width - gx) + abs(other // width - gy)
+                    heappush(frontier, (cost + h, h, sequence, other))
+                    sequence += 1
+
+        self.nodes_expanded = expanded
+        return None
+
+    def _refine(self, a: int, b: int):
+        """Tiles walked between two consecutive abstract nodes."""
+        if b in self.inter_edges.get(a, ()):
+            return a, b
+
+        cluster = self.cluster_of(a)
+        edges = self.intra_edges[cluster]
+        if a not in edges or b not in edges:
+            # one end is the query's own start or goal, not worth caching
+            return self._local_path(a, b, self._bounds(cluster))
+
+        refined = self.refined[cluster]
+        path = refined.get((a, b))
+        if path is None:
+            path = self._local_path(a, b, self._bounds(cluster))
+            refined[(a, b)] = path
+        return path
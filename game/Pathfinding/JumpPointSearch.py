@@ -0,0 +1,249 @@
+from heapq import heappop, heappush
+
+import numpy as np
+
+from game.Pathfinding.CompactPath import EMPTY_PATH, compact_path
+
+
+class GridJPS:
+    """
+    Jump Point Search for uniform-cost, 4-connected tile grids.
+
+    Among equally short routes the search only follows "canonical"
+    ones, where vertical moves are taken as early as possible. With
+    that ordering a horizontal run only needs to stop (become a jump
+    point) at the goal or where an opening appears above or below it
+    that could not have been entered from the previous column. A
+    vertical run stops wherever a horizontal run started from it would
+    find a jump point, the same way diagonal moves work in 8-connected
+    JPS. Every other tile is skipped over instead of being pushed on to
+    the open list, which cuts node expansions drastically in open
+    areas while returning paths of the same length as A*.
+
+    Jumps are answered from tables built once per grid with NumPy (the
+    same idea as JPS+): for every tile, the nearest jump point along its
+    horizontal or vertical run of open tiles in each direction. Only the
+    goal, which changes per query, is checked at search time, so a jump
+    costs O(1) however long the run is.
+
+    Search states are (tile, arrival direction) pairs, so a tile
+    reached from two directions at the same cost keeps the successors
+    of both. The interface mirrors `GridAStar`, compact paths included.
+    """
+
+    # arrival directions, indexes into the parent/step bookkeeping
+    START = 4
+    STEPS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+    def __init__(self, grid) -> None:
+        self.grid = grid
+        self.width = grid.width
+        self.height = grid.height
+        self.passable = grid.passable.ravel().tolist()
+        self.nodes_expanded = 0
+        self._goal = None
+        self._build_tables()
+
+    def _build_tables(self) -> None:
+        passable = self.grid.passable
+        height, width = passable.shape
+        far = width + height + 1
+
+        def shifted(array, dx, dy):
+            """array[y + dy, x + dx], False outside of the grid"""
+            result = np.zeros_like(array)
+            result[max(0, -dy):height - max(0, dy), max(0, -dx):width - max(0, dx)] = \
+                array[max(0, dy):height + min(0, dy), max(0, dx):width + min(0, dx)]
+            return result
+
+        def run_ids(starts, order):
+            ids = np.cumsum(starts.ravel(order=order)).reshape(starts.shape, order=order) - 1
+            return np.where(passable, ids, -1)
+
+        # runs of open tiles; two tiles in the same run can see each other
+        run_h = run_ids(passable & ~shifted(passable, -1, 0), "C")
+        run_v = run_ids(passable & ~shifted(passable, 0, -1), "F")
+
+        xs = np.broadcast_to(np.arange(width), (height, width))
+        ys = np.broadcast_to(np.arange(height)[:, None], (height, width))
+        rows = ys
+        columns = xs
+
+        def nearest(flags, positions, axis, step):
+            """For each tile, the position of the first flagged tile at or beyond it in its run, or -1."""
+            if step > 0:
+                marked = np.where(flags, positions, far)
+                flipped = np.flip(marked, axis=axis)
+                found = np.flip(np.minimum.accumulate(flipped, axis=axis), axis=axis)
+                exists = found < far
+            else:
+                marked = np.where(flags, positions, -1)
+                found = np.maximum.accumulate(marked, axis=axis)
+                exists = found >= 0
+            clipped = np.clip(found, 0, (width if axis == 1 else height) - 1)
+            if axis == 1:
+                same_run = run_h[rows, clipped] == run_h
+            else:
+                same_run = run_v[clipped, columns] == run_v
+            return np.where(exists & same_run & passable, found, -1)
+
+        # a horizontal run stops where a vertical opening appears that the
+        # previous column could not have turned in to
+        up = shifted(passable, 0, -1)
+        down = shifted(passable, 0, 1)
+        forced_right = passable & ((up & ~shifted(passable, -1, -1)) | (down & ~shifted(passable, -1, 1)))
+        forced_left = passable & ((up & ~shifted(passable, 1, -1)) | (down & ~shifted(passable, 1, 1)))
+        next_right = nearest(forced_right, xs, 1, 1)
+        next_left = nearest(forced_left, xs, 1, -1)
+
+        # a vertical run stops where either horizontal run finds a jump point
+        sees_jump = passable & ((shifted(next_right, 1, 0) >= 0) & shifted(passable, 1, 0) |
+                                (shifted(next_left, -1, 0) >= 0) & shifted(passable, -1, 0))
+        next_down = nearest(sees_jump, ys, 0, 1)
+        next_up = nearest(sees_jump, ys, 0, -1)
+
+        self.run_h = run_h.ravel().tolist()
+        self.run_v = run_v.ravel().tolist()
+        self.next_h = {1: next_right.ravel().tolist(), -1: next_left.ravel().tolist()}
+        self.next_v = {1: next_down.ravel().tolist(), -1: next_up.ravel().tolist()}
+
+    def _open(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height and self.passable[y * self.width + x]
+
+    def _jump_horizontal(self, x: int, y: int, dx: int):
+        x += dx
+        if not self._open(x, y):
+            return None
+
+        width = self.width
+        index = y * width + x
+        stop = self.next_h[dx][index]
+
+        gx, gy = self._goal
+        if gy == y and (gx - x) * dx >= 0 and self.run_h[y * width + gx] == self.run_h[index]:
+            if stop < 0 or (stop - gx) * dx > 0:
+                stop = gx
+        return None if stop < 0 else (stop, y)
+
+    def _jump_vertical(self, x: int, y: int, dy: int):
+        y += dy
+        if not self._open(x, y):
+            return None
+
+        width = self.width
+        index = y * width + x
+        stop = self.next_v[dy][index]
+
+        # the goal's row, if the goal can be seen along it
+        gx, gy = self._goal
+        if (gy - y) * dy >= 0 and self.run_v[gy * width + x] == self.run_v[index] \
+                and self.run_h[gy * width + x] == self.run_h[gy * width + gx]:
+            if stop < 0 or (stop - gy) * dy > 0:
+                stop = gy
+        return None if stop < 0 else (x, stop)
+
+    def _successors(self, x: int, y: int, arrival: int):
+        """Yields (direction, jump point) pairs for a node reached by moving in arrival."""
+        is_open = self._open
+        if arrival == self.START:
+            directions = (0, 1, 2, 3)
+        elif arrival in (0, 2):
+            # moving vertically: carry on, or turn either way
+            directions = (arrival, 1, 3)
+        else:
+            # moving horizontally: carry on, or turn only where forced
+            dx = self.STEPS[arrival][0]
+            directions = [arrival]
+            if is_open(x, y - 1) and not is_open(x - dx, y - 1):
+                directions.append(0)
+            if is_open(x, y + 1) and not is_open(x - dx, y + 1):
+                directions.append(2)
+
+        for direction in directions:
+            dx, dy = self.STEPS[direction]
+            if dy:
+                point = self._jump_vertical(x, y, dy)
+            else:
+                point = self._jump_horizontal(x, y, dx)
+            if point is not None:
+                yield direction, point
+
+    def search(self, start, goal) -> np.ndarray:
+        """ Finds the shortest path between two tiles
+
+        Args:
+            start (Tuple[int,int]): The tile to start from
+            goal (Tuple[int,int]): The tile to reach
+
+        Returns:
+            A read-only ``(N, 2)`` int32 array of (x, y) tiles from start
+            to goal inclusive, empty when the goal can not be reached.
+        """
+        self.nodes_expanded = 0
+        if start == goal:
+            return compact_path([start])
+
+        sx, sy = start
+        gx, gy = goal
+        if not (0 <= sx < self.width and 0 <= sy < self.height) or not self._open(gx, gy):
+            return EMPTY_PATH
+        if not self.grid.connected(start, goal):
+            return EMPTY_PATH
+
+        self._goal = goal
+        start_state = (start, self.START)
+        h = abs(sx - gx) + abs(sy - gy)
+        frontier = [(h, h, 0, start_state)]
+        best_g = {start_state: 0}
+        parents = {start_state: None}
+        closed = set()
+        sequence = 1
+        expanded = 0
+
+        while frontier:
+            _, _, _, state = heappop(frontier)
+            if state in closed:
+                continue
+            tile, arrival = state
+            if tile == goal:
+                self.nodes_expanded = expanded
+                return self._retrace(parents, state)
+
+            closed.add(state)
+            expanded += 1
+            g = best_g[state]
+
+            for direction, point in self._successors(tile[0], tile[1], arrival):
+                successor = (point, direction)
+                if successor in closed:
+                    continue
+                cost = g + abs(point[0] - tile[0]) + abs(point[1] - tile[1])
+                if cost < best_g.get(successor, cost + 1):
+                    best_g[successor] = cost
+                    parents[successor] = state
+                    h = abs(point[0] - gx) + abs(point[1] - gy)
+                    heappush(frontier, (cost + h, h, sequence, successor))
+                    sequence += 1
+
+        self.nodes_expanded = expanded
+        return EMPTY_PATH
+
+    @staticmethod
+    def _retrace(parents, state) -> np.ndarray:
+        """Expands the chain of jump points back in to every tile walked over."""
+        jump_points = []
+        while state is not None:
+            jump_points.append(state[0])
+            state = parents[state]
+        jump_points.reverse()
+
+        path = [jump_points[0]]
+        for x, y in jump_points[1:]:
+            px, py = path[-1]
+            dx = (x > px) - (x < px)
+            dy = (y > py) - (y < py)
+            while (px, py) != (x, y):
+                px += dx
+                py += dy
+                path.append((px, py))
+        return compact_path(path)
@@ -0,0 +1,100 @@
+from collections import OrderedDict
+
+from game.Pathfinding.CompactPath import compact_path
+
+
+class PathCache:
+    """
+    A bounded LRU cache of tile paths keyed by (start, goal).
+
+    Every suffix of an optimal path is itself an optimal path to the
+    same goal, so each stored path is also indexed by the tiles it
+    passes through. A query starting anywhere along a cached route to
+    the same goal is answered by slicing the stored path instead of
+    searching again.
+
+    Paths are stored compact (read-only int32 arrays of (x, y) tiles,
+    see `compact_path`), so they are handed out without copying and a
+    suffix is a view of the stored path. The cache knows nothing
+    about the map; its owner must call `clear` whenever the costs the
+    paths were computed from change.
+    """
+
+    def __init__(self, max_paths: int = 256) -> None:
+        self.max_paths = max_paths
+        self._paths = OrderedDict()  # (start, goal) -> (tiles, nodes expanded)
+        self._suffixes = {}  # (tile, goal) -> ((start, goal), offset into the path)
+        self.reset_stats()
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.suffix_hits = 0
+        self.misses = 0
+        self.nodes_expanded = 0
+        self.nodes_saved = 0
+
+    def clear(self) -> None:
+        """ Drops every cached path, keeping the hit/miss counters """
+        self._paths.clear()
+        self._suffixes.clear()
+
+    def get(self, start, goal):
+        """ Looks up a path from start to goal
+
+        Returns:
+            A compact path (empty if the goal was found to be
+            unreachable) or None when nothing is cached for the query.
+        """
+        key = (start, goal)
+        entry = self._paths.get(key)
+        if entry is not None:
+            self._paths.move_to_end(key)
+            self.hits += 1
+            self.nodes_saved += entry[1]
+            return entry[0]
+
+        suffix = self._suffixes.get(key)
+        if suffix is not None:
+            owner, offset = suffix
+            self._paths.move_to_end(owner)
+            self.suffix_hits += 1
+            return self._paths[owner][0][offset:]
+
+        self.misses += 1
+        return None
+
+    def put(self, start, goal, tiles, nodes_expanded: int = 0):
+        """ Stores the result of a search and returns it as a compact path """
+        key = (start, goal)
+        tiles = compact_path(tiles)
+        self.nodes_expanded += nodes_expanded
+        if key in self._paths:
+            self._discard(key, self._paths.pop(key)[0])
+        self._paths[key] = (tiles, nodes_expanded)
+        self._paths.move_to_end(key)
+
+        # the first tile is the key itself and the last is the goal
+        for offset, tile in enumerate(map(tuple, tiles[1:-1].tolist()), 1):
+            self._suffixes[(tile, goal)] = (key, offset)
+
+        while len(self._paths) > self.max_paths:
+            oldest, (oldest_tiles, _) = self._paths.popitem(last=False)
+            self._discard(oldest, oldest_tiles)
+        return tiles
+
+    def summary(self) -> str:
+        lookups = self.hits + self.suffix_hits + self.misses
+        hit_rate = 100 * (self.hits + self.suffix_hits) / lookups if lookups else 0
+        return (f"{lookups} lookups, {self.hits} hits, {self.suffix_hits} suffix hits, {self.misses} misses "
+                f"({hit_rate:.0f}% hit rate), {self.nodes_expanded} nodes expanded, "
+                f"{self.nodes_saved} nodes saved by exact hits")
+
+    def _discard(self, key, tiles) -> None:
+        goal = key[1]
+        for tile in map(tuple, tiles[1:-1].tolist()):
+            suffix_key = (tile, goal)
+            if self._suffixes.get(suffix_key, (None,))[0] == key:
+                del self._suffixes[suffix_key]
@@ -0,0 +1,151 @@
+import atexit
+import multiprocessing
+import queue
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from game.Pathfinding.Algorithms import ALGORITHMS
+from game.gameobjects.costgrid import CostGrid
+
+# per worker process: the shared block and search core of the last grid used
+_worker = {"key": None, "block": None, "core": None}
+
+
+def _worker_search(name: str, shape, version: int, algorithm: str, start, goal):
+    """Runs one search in a worker, rebuilding its core only when the grid changed."""
+    key = (name, version, algorithm)
+    if _worker["key"] != key:
+        if _worker["block"] is not None:
+            _worker["core"] = None
+            _worker["block"].close()
+        # spawned workers share the service's resource tracker, so
+        # attaching here does not make the block theirs to unlink
+        block = shared_memory.SharedMemory(name=name)
+        costs = np.ndarray(shape, dtype=np.int32, buffer=block.buf)
+        _worker.update(key=key, block=block, core=ALGORITHMS[algorithm](CostGrid(costs)))
+
+    core = _worker["core"]
+    return core.search(start, goal), core.nodes_expanded
+
+
+class PathService:
+    """
+    Runs path searches in a pool of worker processes.
+
+    The search cores are pure Python, so they hold the GIL and a thread
+    pool would not run them in parallel; separate processes are used
+    instead. The cost grid is copied once in to a block of shared memory
+    that every worker maps, so a request only sends its two tiles and
+    the block's name rather than pickling the map. Workers build their
+    own search tables the first time they see a grid and reuse them
+    until it is republished.
+
+    Requests return a `concurrent.futures.Future` that resolves to
+    ``(tiles, nodes_expanded)``. Optional callbacks are never called
+    from the pool's threads; they are queued and run by `poll`, which
+    the game calls from its update so results are applied on the main
+    thread at a known point in the frame.
+
+    With ``workers=0`` no processes are started and every search runs
+    synchronously inside `submit`, with callbacks still deferred to the
+    next `poll`.
+
+    Worker processes only import this module, the search cores and
+    `CostGrid`, none of which need pyasge or a window.
+    """
+
+    def __init__(self, grid, workers: int = 0, algorithm: str = "astar") -> None:
+        self.workers = workers
+        self.algorithm = algorithm
+        self.pending = 0
+        self._done = queue.SimpleQueue()
+        self._pool = None
+        if workers > 0:
+            # spawn rather than fork, a forked copy of the game process
+            # would inherit its window, audio and GL state
+            self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(self.close)
+        self._block = None
+        self._retired = []
+        self._version = 0
+        self._core = None
+        self.publish(grid)
+
+    def publish(self, grid) -> None:
+        """ Shares a new or changed cost grid with the workers
+
+        Requests already submitted keep using the grid they were
+        submitted against.
+        """
+        self._version += 1
+        self._shape = grid.costs.shape
+        if self._pool is None:
+            self._core = ALGORITHMS[self.algorithm](grid)
+            return
+
+        if self._block is not None:
+            # in-flight requests may still be reading the old block
+            self._retired.append(self._block)
+        self._block = shared_memory.SharedMemory(create=True, size=max(1, grid.costs.nbytes))
+        shared = np.ndarray(self._shape, dtype=np.int32, buffer=self._block.buf)
+        shared[:] = grid.costs
+
+    def submit(self, start, goal, callback=None) -> Future:
+        """ Queues a search between two tiles
+
+        Args:
+            start (Tuple[int,int]): The tile to start from
+            goal (Tuple[int,int]): The tile to reach
+            callback: Optional; called by `poll` with the finished future
+
+        Returns:
+            A future resolving to ``(tiles, nodes_expanded)``, where tiles
+            is a compact path and empty if there is no path
+        """
+        if self._pool is None:
+            future = Future()
+            future.set_result((self._core.search(start, goal), self._core.nodes_expanded))
+        else:
+            future = self._pool.submit(_worker_search, self._block.name, self._shape, self._version,
+                                       self.algorithm, start, goal)
+
+        self.pending += 1
+        future.add_done_callback(lambda done: self._done.put((done, callback)))
+        return future
+
+    def poll(self) -> int:
+        """ Runs the callbacks of every request finished since the last poll
+
+        Returns:
+            The number of requests that were finished
+        """
+        finished = 0
+        while True:
+            try:
+                future, callback = self._done.get_nowait()
+            except queue.Empty:
+                break
+            finished += 1
+            self.pending -= 1
+            if callback is not None and not future.cancelled():
+                callback(future)
+
+        if self._retired and not self.pending:
+            for block in self._retired:
+                block.close()
+                block.unlink()
+            self._retired.clear()
+        return finished
+
+    def close(self) -> None:
+        """Stops the workers and frees the shared memory."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        for block in self._retired + ([self._block] if self._block is not None else []):
+            block.close()
+            block.unlink()
+        self._retired.clear()
+        self._block = None
@@ -0,0 +1,264 @@
+from collections import deque
+
+from game.Pathfinding.Algorithms import ALGORITHMS
+from game.Pathfinding.CompactPath import EMPTY_PATH
+from game.Pathfinding.GridAStar import SearchStatus
+from game.Pathfinding.PathCache import PathCache
+from game.Pathfinding.PathService import PathService
+from game.profiler import profiler
+
+
+class PathRequest:
+    """
+    A path asked for with `TilePathing.request_tiles`.
+
+    The callback is given the finished path (empty if there is no way
+    through) once enough frames have been spent on the search.
+    Cancelled requests never call back.
+    """
+
+    def __init__(self, start, goal, callback) -> None:
+        self.start = start
+        self.goal = goal
+        self.callback = callback
+        self.search = None
+        self.done = False
+        self.cancelled = False
+
+    @property
+    def pending(self) -> bool:
+        return not self.done and not self.cancelled
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class TilePathing:
+    """
+    Path finding between (x, y) tiles, with no dependency on pyasge.
+
+    Owns the search core for the current grid, the path cache, the
+    queue of time-sliced requests and, when workers are asked for, the
+    `PathService` pool. The core, cache and pool are rebuilt whenever
+    the grid or the algorithm changes. When only a few tiles changed
+    (see `CostGrid.set_cost`) a core that has ``update_cells`` is
+    patched instead; the cache is emptied and queued requests dropped
+    either way.
+    """
+
+    # expansions spent per frame on queued requests, shared between them
+    FRAME_BUDGET = 400
+    # a single request is abandoned after this many expansions in total
+    MAX_EXPANSIONS = 20000
+
+    def __init__(self, grid=None, algorithm: str = "astar", path_workers: int = 0) -> None:
+        self.grid = grid
+        self.algorithm = algorithm
+        self.path_workers = path_workers
+        self.nodes_expanded = 0
+        self.cache = PathCache()
+        self.requests = deque()
+        self.service = None
+        self._in_flight = set()
+        self.frame_budget = self.FRAME_BUDGET
+        self.max_expansions = self.MAX_EXPANSIONS
+        self._search = None
+        self._search_grid = None
+        self._search_version = 0
+        self._search_algorithm = None
+
+    def current_grid(self):
+        """The `CostGrid` searches run on."""
+        return self.grid
+
+    def worker_count(self) -> int:
+        """How many worker processes to search in, 0 for none."""
+        return self.path_workers
+
+    def find_tiles(self, start, goal) -> tuple:
+        """ Finds a path straight away, on the calling thread
+
+        Args:
+            start (Tuple[int,int]): The tile to start from
+            goal (Tuple[int,int]): The tile to reach
+
+        Returns:
+            A compact path (a read-only ``(N, 2)`` int32 array of (x, y)
+            tiles) from start to goal inclusive, empty if the goal can
+            not be reached; it is shared with the cache, never copy it
+        """
+        with profiler.scope("path.find"):
+            search = self.get_search()
+            tiles = self.cache.get(start, goal)
+            if tiles is None:
+                tiles = self.cache.put(start, goal, search.search(start, goal), search.nodes_expanded)
+                self.nodes_expanded = search.nodes_expanded
+                profiler.count("path.expansions", search.nodes_expanded)
+            else:
+                self.nodes_expanded = 0
+        profiler.count("path.completed")
+        profiler.count("path.length", len(tiles))
+        return tiles
+
+    def request_tiles(self, start, goal, callback) -> PathRequest:
+        """ Queues a path to be searched for over the next few frames
+
+        Cached routes and queries that need no searching (such as an
+        unreachable goal) are answered straight away, before this
+        returns. Otherwise the search is advanced by `advance`, which
+        the game calls once per update with a fixed node budget, so a
+        long or hopeless query can never stall a single frame. When
+        workers are enabled the search runs in a worker process instead
+        and calls back from the first `advance` after it finishes.
+
+        Args:
+            start (Tuple[int,int]): The tile to start from
+            goal (Tuple[int,int]): The tile to reach
+            callback: Called with the path, a compact path as `find_tiles` returns
+
+        Returns:
+            The request, which can be cancelled while pending
+        """
+        search = self.get_search()
+        request = PathRequest(start, goal, callback)
+
+        tiles = self.cache.get(start, goal)
+        if tiles is not None:
+            self._complete(request, tiles)
+        elif self.service is not None:
+            self._in_flight.add(request)
+            self.service.submit(start, goal, lambda future, request=request: self._resolve_remote(request, future))
+        elif hasattr(search, "begin"):
+            request.search = search.begin(start, goal, self.max_expansions)
+            if request.search.pending:
+                self.requests.append(request)
+            else:
+                self._resolve(request)
+        else:
+            # cores without a resumable search are quick enough to run now
+            path = search.search(start, goal)
+            profiler.count("path.expansions", search.nodes_expanded)
+            self._complete(request, self.cache.put(start, goal, path, search.nodes_expanded))
+        return request
+
+    def advance(self, budget: int = None) -> int:
+        """ Spends up to budget node expansions on the queued requests
+
+        Requests are served oldest first; each finished one calls back
+        before the next is started.
+
+        Args:
+            budget: Expansions to spend, `frame_budget` if not given
+
+        Returns:
+            The number of expansions actually spent
+        """
+        if self.service is not None:
+            self.service.poll()
+
+        budget = self.frame_budget if budget is None else budget
+        spent = 0
+        while self.requests and spent < budget:
+            request = self.requests[0]
+            if request.cancelled:
+                self.requests.popleft()
+                continue
+
+            before = request.search.nodes_expanded
+            request.search.step(budget - spent)
+            spent += request.search.nodes_expanded - before
+            if not request.search.pending:
+                self.requests.popleft()
+                self._resolve(request)
+        profiler.count("path.expansions", spent)
+        return spent
+
+    def _resolve(self, request: PathRequest) -> None:
+        search = request.search
+        if search.status is SearchStatus.ABANDONED:
+            # ran out of budget rather than proving there is no path, so
+            # it isn't cached and may be asked for again later
+            tiles = EMPTY_PATH
+        else:
+            tiles = self.cache.put(request.start, request.goal, search.path, search.nodes_expanded)
+        self.nodes_expanded = search.nodes_expanded
+        self._complete(request, tiles)
+
+    def _resolve_remote(self, request: PathRequest, future) -> None:
+        self._in_flight.discard(request)
+        if request.cancelled:
+            # searched on a grid that may since have changed, don't cache it
+            request.done = True
+            return
+
+        tiles, nodes_expanded = future.result()
+        self.nodes_expanded = nodes_expanded
+        profiler.count("path.expansions", nodes_expanded)
+        self._complete(request, self.cache.put(request.start, request.goal, tiles, nodes_expanded))
+
+    def _complete(self, request: PathRequest, tiles) -> None:
+        request.done = True
+        if not request.cancelled:
+            profiler.count("path.completed")
+            profiler.count("path.length", len(tiles))
+            request.callback(tiles)
+
+    def cancel_requests(self) -> None:
+        """Drops every queued or in-flight request without calling back."""
+        for request in list(self.requests) + list(self._in_flight):
+            request.cancel()
+        self.requests.clear()
+        self._in_flight.clear()
+
+    def get_search(self):
+        """ Returns the search core for the current grid and algorithm
+
+        The core and the path cache are both derived from the grid's
+        costs, so they are rebuilt and emptied whenever the grid is
+        swapped, its costs change or another algorithm is chosen; after
+        a few `CostGrid.set_cost` edits the core is patched rather than
+        rebuilt, if it can be. The worker pool, if there is one, is handed the new grid too.
+        """
+        grid = self.current_grid()
+        if self._search is None or self._search_grid is not grid or self._search_version != grid.version \
+                or self._search_algorithm != self.algorithm:
+            changed = None
+            if self._search is not None and self._search_grid is grid and self._search_algorithm == self.algorithm \
+                    and hasattr(self._search, "update_cells"):
+                changed = grid.changed_cells(self._search_version)
+            if changed is None:
+                self._search = ALGORITHMS[self.algorithm](grid)
+            else:
+                self._search.update_cells(changed)
+            self._search_grid = grid
+            self._search_version = grid.version
+            self._search_algorithm = self.algorithm
+            self.cache.clear()
+            self.cancel_requests()
+            self._publish(grid)
+        return self._search
+
+    def _publish(self, grid) -> None:
+        workers = self.worker_count()
+        if self.service is not None and (self.service.workers != workers or
+                                         self.service.algorithm != self.algorithm):
+            self.close()
+        if workers <= 0:
+            return
+
+        if self.service is None:
+            self.service = PathService(grid, workers, self.algorithm)
+        else:
+            self.service.publish(grid)
+
+    def invalidate(self) -> None:
+        """Forgets the search tables, every cached path and any queued request."""
+        self._search = None
+        self.cache.clear()
+        self.cancel_requests()
+
+    def close(self) -> None:
+        """Stops the pathfinding workers, if any were started."""
+        if self.service is not None:
+            self.service.close()
+            self.service = None
@@ -5,6 +5,9 @@ from game.Pathfinding.AStar import AStarPathing
 from game.gamedata import GameData
 from game.gameobjects.gamemap import GameMap
 from game.gamestates.gameplay import GamePlay
+from game.leaderboard import Leaderboard
+from game.profiler import profiler
+from game.resources import ResourceManager
 
 class MyASGEGame(pyasge.ASGEGame):
     """The ASGE Game in Python."""
@@ -25,13 +28,19 @@ class MyASGEGame(pyasge.ASGEGame):
         self.renderer.setBaseResolution(self.data.game_res[0], self.data.game_res[1], pyasge.ResolutionPolicy.MAINTAIN)
         random.seed(a=None, version=2)
 
+        self.data.resources = ResourceManager(self.renderer)
+        self.data.resources.preload("./data/manifest.json")
+
         self.data.map_choice = random.choice(["./data/map/Maze.tmx", "./data/map/Maze2.tmx", "./data/map/Maze3.tmx"])
-        self.data.game_map = GameMap(self.renderer, self.data.map_choice)
+        self.data.game_map = GameMap(self.renderer, self.data.map_choice, self.data.resources)
         self.astar = AStarPathing(self.data)
         self.data.inputs = self.inputs
         self.data.renderer = self.renderer
-        self.data.shaders["example"] = self.data.renderer.loadPixelShader("/data/shaders/example_rgb.frag")
+        self.data.shaders["example"] = self.data.resources.shader("/data/shaders/example_rgb.frag")
+        if self.data.debug:
+            print(f"Resources at startup: {self.data.resources.summary()}")
         self.data.prev_gamepad = self.data.gamepad = self.inputs.getGamePad()
+        self.data.leaderboard = Leaderboard("./data/leaderboard.db")
 
         # setup the background and load the fonts for the game
         self.init_audio()
@@ -49,7 +58,7 @@ class MyASGEGame(pyasge.ASGEGame):
     def init_cursor(self):
         """Initialises the mouse cursor and hides the OS cursor."""
         self.data.cursor = pyasge.Sprite()
-        self.data.cursor.loadTexture("/data/textures/cursors.png")
+        self.data.cursor.attach(self.data.resources.texture("/data/textures/cursors.png"))
         self.data.cursor.width = 11
         self.data.cursor.height = 11
         self.data.cursor.src_rect = [0, 0, 11, 11]
@@ -84,18 +93,21 @@ class MyASGEGame(pyasge.ASGEGame):
 
     def fixed_update(self, game_time: pyasge.GameTime) -> None:
         """Processes fixed updates."""
-        self.current_state.fixed_update(game_time)
+        with profiler.scope("frame.fixed_update"):
+            self.current_state.fixed_update(game_time)
 
         if self.data.gamepad.connected and self.data.gamepad.START:
             self.signalExit()
 
     def update(self, game_time: pyasge.GameTime) -> None:
         self.data.gamepad = self.inputs.getGamePad()
-        self.current_state.update(game_time)
+        with profiler.scope("frame.update"):
+            self.current_state.update(game_time)
         self.data.prev_gamepad = self.data.gamepad
 
-
     def render(self, game_time: pyasge.GameTime) -> None:
-        """Renders the game state and mouse cursor"""
-        self.current_state.render(game_time)
-        self.renderer.render(self.data.cursor)
\ No newline at end of file
+        """Renders the game state and mouse cursor, then closes the profiler's frame"""
+        with profiler.scope("frame.render"):
+            self.current_state.render(game_time)
+            self.renderer.render(self.data.cursor)
+        profiler.end_frame()
@@ -13,11 +13,15 @@ class GameData:
 
     def __init__(self) -> None:
         self.cursor = None
+        self.debug = False  # print resource and path cache stats to the console
         self.fonts = {}
         self.game_map = None
         self.game_res = [1920, 1080]
         self.inputs = None
+        self.leaderboard = None  # the Leaderboard every game's score is posted to
+        self.path_workers = 0  # pathfinding processes, 0 searches on the main thread
         self.gamepad = None
         self.prev_gamepad = None
         self.renderer = None
+        self.resources = None  # the shared ResourceManager for textures and shaders
         self.shaders: dict[str, pyasge.Shader] = {}
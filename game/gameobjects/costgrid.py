@@ -0,0 +1,325 @@
+from collections import deque
+from typing import Tuple
+
+import numpy as np
+from pytmx import TiledTileLayer
+
+
+class CostGrid:
+    """
+    The pathfinding cost map stored as a flat NumPy array.
+
+    Costs live in a single C-contiguous ``int32`` array of shape
+    ``(height, width)`` so it can be indexed as ``costs[y][x]`` or
+    ``costs[y, x]``, or flattened with ``y * width + x``. A passable
+    mask and a per-cell bitmask of passable neighbours are precomputed
+    so that pathfinding and spawning never have to bounds check or
+    index the costs one cell at a time.
+
+    ``version`` is bumped every time the masks are rebuilt, so anything
+    derived from the costs (search tables, cached paths) can tell when
+    it has gone stale. Single tiles changed with `set_cost` are patched
+    in place and logged, so such tables can ask `changed_cells` what to
+    repair instead of being rebuilt from scratch.
+    """
+
+    # neighbour bits, in the order the pathfinder visits them
+    UP = 1
+    RIGHT = 2
+    DOWN = 4
+    LEFT = 8
+    DIRECTIONS = ((UP, 0, -1), (RIGHT, 1, 0), (DOWN, 0, 1), (LEFT, -1, 0))
+    # the bit a neighbour uses for a tile, by the bit the tile uses for it
+    OPPOSITE = {UP: DOWN, RIGHT: LEFT, DOWN: UP, LEFT: RIGHT}
+    # how many `set_cost` edits are remembered for `changed_cells`
+    CHANGE_LOG = 4096
+
+    def __init__(self, costs, components: np.ndarray = None) -> None:
+        """
+        Args:
+            costs: A ``(height, width)`` array-like of tile costs, copied
+                if it is read-only
+            components: Optionally, region labels already worked out
+                for these costs (see `components`), e.g. from a map cache
+        """
+        self.costs = np.ascontiguousarray(costs, dtype=np.int32)
+        if not self.costs.flags.writeable:
+            self.costs = self.costs.copy()
+        self.height, self.width = self.costs.shape
+        self.version = 0
+        self._changes = deque(maxlen=self.CHANGE_LOG)  # (version, (x, y)) of every set_cost
+        self.refresh()
+        self._components = components
+
+    def refresh(self) -> None:
+        """ Rebuilds the passable and neighbour masks from the costs """
+        self.passable = self.costs == 0
+
+        neighbours = np.zeros(self.costs.shape, dtype=np.uint8)
+        neighbours[1:, :][self.passable[:-1, :]] |= self.UP
+        neighbours[:, :-1][self.passable[:, 1:]] |= self.RIGHT
+        neighbours[:-1, :][self.passable[1:, :]] |= self.DOWN
+        neighbours[:, 1:][self.passable[:, :-1]] |= self.LEFT
+        self.neighbours = neighbours
+
+        self._passable_cells = None
+        self._components = None
+        self._reachable_cells = {}
+        self._changes.clear()
+        self.version += 1
+
+    def set_cost(self, x: int, y: int, cost: int) -> None:
+        """ Changes the cost of one tile, patching the masks around it
+
+        Only the tile and its four neighbours' masks are touched. When
+        the tile is opened up the region labels are merged in place;
+        when it is closed off a region may have split, so they are
+        worked out again the next time they are asked for.
+
+        Raises:
+            IndexError: If (x, y) is off the grid; negative coordinates
+                are not counted from the far edge
+        """
+        if not self.in_bounds(x, y):
+            raise IndexError(f"tile ({x}, {y}) is outside the {self.width}x{self.height} grid")
+        self.costs[y, x] = cost
+        passable = cost == 0
+        if passable != self.passable[y, x]:
+            self.passable[y, x] = passable
+            for bit, dx, dy in self.DIRECTIONS:
+                if self.in_bounds(x + dx, y + dy):
+                    if passable:
+                        self.neighbours[y + dy, x + dx] |= self.OPPOSITE[bit]
+                    else:
+                        self.neighbours[y + dy, x + dx] &= ~self.OPPOSITE[bit] & 0xFF
+
+            self._passable_cells = None
+            self._reachable_cells = {}
+            if passable and self._components is not None:
+                self._join_components(x, y)
+            else:
+                self._components = None
+
+        self.version += 1
+        self._changes.append((self.version, (x, y)))
+
+    def changed_cells(self, since: int):
+        """ The tiles `set_cost` changed after a version
+
+        Returns:
+            A list of (x, y) tiles, or None if the grid was refreshed
+            since then or the log doesn't reach back that far, in which
+            case anything derived from the grid must be rebuilt
+        """
+        if since == self.version:
+            return []
+        if not self._changes or self._changes[0][0] > since + 1:
+            return None
+        return [cell for version, cell in self._changes if version > since]
+
+    def _join_components(self, x: int, y: int) -> None:
+        labels = self._components
+        if not labels.flags.writeable:
+            labels = self._components = labels.copy()  # e.g. mapped from the map cache
+        around = sorted({int(labels[y + dy, x + dx]) for bit, dx, dy in self.DIRECTIONS
+                         if self.neighbours[y, x] & bit})
+        if not around:
+            labels[y, x] = labels.max() + 1
+            return
+        for other in around[1:]:
+            labels[labels == other] = around[0]
+        labels[y, x] = around[0]
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_passable(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height and bool(self.passable[y, x])
+
+    def passable_cells(self) -> np.ndarray:
+        """ All passable cells
+
+        Returns:
+            An ``(N, 2)`` array of (x, y) tile coordinates in row-major
+            order. The array is cached until the costs change and must
+            not be modified.
+        """
+        if self._passable_cells is None:
+            cells = np.argwhere(self.passable)[:, ::-1].astype(np.int32)
+            cells.flags.writeable = False
+            self._passable_cells = cells
+        return self._passable_cells
+
+    def components(self) -> np.ndarray:
+        """ Labels every passable cell with the id of its connected region
+
+        Two cells can only reach each other if they share a label, so an
+        unreachable goal can be rejected before any search is started.
+        Labels are found with a vectorised union-find (hook every edge's
+        larger root on to its smaller one, then pointer-jump until every
+        cell points at its root) and cached until the costs change.
+
+        Returns:
+            An ``(height, width)`` int32 array, -1 on blocked cells
+        """
+        if self._components is None:
+            self._components = self._label_components()
+        return self._components
+
+    def component_of(self, x: int, y: int) -> int:
+        """The region label of (x, y), or -1 if it is blocked or off the map."""
+        if not self.in_bounds(x, y):
+            return -1
+        return int(self.components()[y, x])
+
+    def regions_from(self, x: int, y: int) -> frozenset:
+        """ The region labels an agent standing on (x, y) can walk in to
+
+        That is the tile's own region, or for an agent stuck inside a
+        wall, the regions of its open neighbours.
+        """
+        if not self.in_bounds(x, y):
+            return frozenset()
+
+        components = self.components()
+        if self.passable[y, x]:
+            return frozenset((int(components[y, x]),))
+
+        mask = self.neighbours[y, x]
+        return frozenset(int(components[y + dy, x + dx]) for bit, dx, dy in self.DIRECTIONS if mask & bit)
+
+    def connected(self, start, goal) -> bool:
+        """ Whether any path at all leads from the start tile to the goal tile
+
+        Args:
+            start (Tuple[int,int]): The tile to start from
+            goal (Tuple[int,int]): The tile to reach
+        """
+        if start == goal:
+            return True
+        return self.component_of(*goal) in self.regions_from(*start)
+
+    def reachable_cells(self, x: int, y: int) -> np.ndarray:
+        """ The passable cells that can be walked to from (x, y)
+
+        Returns:
+            An ``(N, 2)`` array of (x, y) tile coordinates in row-major
+            order, cached until the costs change; must not be modified.
+        """
+        regions = self.regions_from(x, y)
+        cells = self._reachable_cells.get(regions)
+        if cells is None:
+            labels = self.components()
+            mask = np.isin(labels, list(regions)) if regions else np.zeros(labels.shape, dtype=bool)
+            cells = np.argwhere(mask)[:, ::-1].astype(np.int32)
+            cells.flags.writeable = False
+            self._reachable_cells[regions] = cells
+        return cells
+
+    def _label_components(self) -> np.ndarray:
+        passable = self.passable.ravel()
+        neighbours = self.neighbours.ravel()
+        right = np.flatnonzero(passable & ((neighbours & self.RIGHT) != 0))
+        down = np.flatnonzero(passable & ((neighbours & self.DOWN) != 0))
+        first = np.concatenate([right, down])
+        second = np.concatenate([right + 1, down + self.width])
+
+        parent = np.arange(passable.size)
+        while True:
+            first_root = parent[first]
+            second_root = parent[second]
+            split = first_root != second_root
+            if not split.any():
+                break
+
+            np.minimum.at(parent,
+                          np.maximum(first_root[split], second_root[split]),
+                          np.minimum(first_root[split], second_root[split]))
+            while True:
+                grandparent = parent[parent]
+                if np.array_equal(grandparent, parent):
+                    break
+                parent = grandparent
+
+        labels = np.full(passable.size, -1, dtype=np.int32)
+        labels[passable] = np.unique(parent[passable], return_inverse=True)[1]
+        return labels.reshape(self.costs.shape)
+
+    def is_passable_many(self, coords) -> np.ndarray:
+        """ Vectorised `is_passable`
+
+        Args:
+            coords: An ``(N, 2)`` array-like of (x, y) tile coordinates.
+                Coordinates outside of the map are reported as blocked.
+
+        Returns:
+            A boolean array of length N
+        """
+        coords = np.asarray(coords, dtype=np.intp).reshape(-1, 2)
+        x, y = coords[:, 0], coords[:, 1]
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        result = np.zeros(len(coords), dtype=bool)
+        result[inside] = self.passable[y[inside], x[inside]]
+        return result
+
+    def line_of_sight_many(self, starts, goal) -> np.ndarray:
+        """ Whether straight lines from many tiles to one tile stay off walls
+
+        Each line runs between tile centres and is sampled every half a
+        tile along its longer axis, so it can only slip past a wall by
+        clipping the very corner of it. Lines that leave the map are
+        blocked.
+
+        Args:
+            starts: An ``(N, 2)`` array-like of (x, y) tiles to look from
+            goal (Tuple[int,int]): The tile they look at
+
+        Returns:
+            A boolean array of length N, True where the goal can be seen
+        """
+        starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+        if not len(starts):
+            return np.zeros(0, dtype=bool)
+
+        delta = np.asarray(goal, dtype=np.float64)[None, :] - starts
+        steps = 2 * np.abs(delta).max(axis=1)
+        # t of every sample, padded with the end of the line for short ones
+        t = np.minimum(np.arange(int(steps.max()) + 1)[None, :] / np.maximum(steps, 1)[:, None], 1.0)
+        points = starts[:, None, :] + 0.5 + t[:, :, None] * delta[:, None, :]
+        tiles = np.floor(points).astype(np.intp)
+        return self.is_passable_many(tiles.reshape(-1, 2)).reshape(t.shape).all(axis=1)
+
+    def passable_neighbours(self, coords) -> Tuple[np.ndarray, np.ndarray]:
+        """ Looks up the 4-connected neighbours of many cells at once
+
+        Args:
+            coords: An ``(N, 2)`` array-like of in-bounds (x, y) tiles
+
+        Returns:
+            (neighbours, valid) where neighbours is an ``(N, 4, 2)``
+            array of the up, right, down and left tiles and valid is an
+            ``(N, 4)`` boolean array marking which of them are passable.
+        """
+        coords = np.asarray(coords, dtype=np.intp).reshape(-1, 2)
+        masks = self.neighbours[coords[:, 1], coords[:, 0]]
+        offsets = np.array([(dx, dy) for _, dx, dy in self.DIRECTIONS], dtype=np.intp)
+        bits = np.array([bit for bit, _, _ in self.DIRECTIONS], dtype=np.uint8)
+        neighbours = coords[:, None, :] + offsets[None, :, :]
+        valid = (masks[:, None] & bits[None, :]) != 0
+        return neighbours, valid
+
+
+def tmx_costs(tmxdata) -> np.ndarray:
+    """ Sums the ``cost`` property of every visible tile layer of a TMX map
+
+    Args:
+        tmxdata (pytmx.TiledMap): The loaded map; its images are not used
+
+    Returns:
+        An ``(height, width)`` int32 array of pathfinding costs
+    """
+    costs = np.zeros((tmxdata.height, tmxdata.width), dtype=np.int32)
+    for layer in tmxdata.visible_layers:
+        if isinstance(layer, TiledTileLayer):
+            costs += (np.asarray(layer.data) != 0) * int(layer.properties["cost"])
+    return costs
@@ -1,20 +1,23 @@
 import copy
-from functools import partial
 from typing import Tuple
 
 import numpy
 import numpy as np
 import pyasge
-import pytmx
-from pytmx import TiledTileLayer
 
+from game.gameobjects.costgrid import CostGrid
+from game.gameobjects.mapchunks import MapChunks
+from game.gameobjects.mapcache import load_map
+from game.profiler import profiler
+from game.resources import ResourceManager
 
-def other_library_loader(renderer: pyasge.Renderer, filename, colorkey, **kwargs):
-    """Converts a tmx tile into a `pyasge.Tile`"""
+
+def other_library_loader(resources: ResourceManager, filename, colorkey, **kwargs):
+    """Converts a tmx tile into a `pyasge.Tile`, sharing one texture per tileset image"""
 
     def extract_image(rect, flags):
         pyasge_tile = pyasge.Tile()
-        pyasge_tile.texture = renderer.loadTexture(filename)
+        pyasge_tile.texture = resources.texture(filename)
         pyasge_tile.texture.setMagFilter(pyasge.MagFilter.NEAREST)
         pyasge_tile.width = rect[2]
         pyasge_tile.height = rect[3]
@@ -49,45 +52,97 @@ class GameMap:
 
     It's made up from tiles that are stored in 2D dimensional arrays.
     To improve performance when rendering the game, these tiles are
-    pre-rendered on to a large texture and rendered in a single pass
+    pre-rendered in chunks (see `MapChunks`), each on to its own
+    texture. Only the chunks in the camera's view are drawn, and a
+    chunk is only rendered again after `mark_dirty` flags one of its
+    tiles, so big maps never need one huge texture or a full redraw.
     """
 
-    def __init__(self, renderer: pyasge.Renderer, tmx_file: str) -> None:
-        tmxdata = pytmx.TiledMap(tmx_file, partial(other_library_loader, renderer))
+    # the width and height of a chunk, in tiles
+    CHUNK_TILES = 16
 
-        # set the map's dimensions and tile sizes
-        self.width = tmxdata.width
-        self.height = tmxdata.height
-        self.tile_size = [int(tmxdata.tilewidth * 2), int(tmxdata.tileheight * 2)]
+    def __init__(self, renderer: pyasge.Renderer, tmx_file: str, resources: ResourceManager = None) -> None:
+        if resources is None:
+            resources = ResourceManager(renderer)
+        # the map's arrays come from the map cache, so no XML is parsed
+        # unless the TMX file changed since it was last compiled
+        compiled = load_map(tmx_file)
 
-        """create a new render target and sprite to store the render texture"""
-        self.rt = pyasge.RenderTarget(
-            renderer,
-            self.width * self.tile_size[0], self.height * self.tile_size[1],
-            pyasge.Texture.Format.RGBA, 1)
+        # set the map's dimensions and tile sizes
+        self.width = compiled.width
+        self.height = compiled.height
+        self.tile_size = [int(compiled.tilewidth * 2), int(compiled.tileheight * 2)]
+
+        # a render target per chunk, created the first time it's seen
+        self.chunks = MapChunks(self.width, self.height, self.tile_size, self.CHUNK_TILES)
+        self.targets = {}
+
+        # one tile per tile id, which every cell using that id copies
+        loaders = [other_library_loader(resources, image, None) for image in compiled.images]
+        prototypes = {}
+        for gid in np.unique(compiled.gids).tolist():
+            if gid:
+                rect = compiled.tile_rects[gid].tolist()
+                prototypes[gid] = loaders[compiled.tile_images[gid]](rect, compiled.tile_flags_of(gid))
 
         self.map = []  # the tiled map
-        self.costs = [[0 for i in range(tmxdata.width)] for j in range(tmxdata.height)]  # pathfinding costs
-        for layer in tmxdata.visible_layers:
-            if isinstance(layer, TiledTileLayer):
+        for name, layer in zip(compiled.layer_names, compiled.gids):
+            tiles = [[None for i in range(self.width)] for j in range(self.height)]
+            rows, cols = np.nonzero(layer)
+            for y, x, gid in zip(rows.tolist(), cols.tolist(), layer[rows, cols].tolist()):
+                # use the tile image to create and position the map
+                tiles[y][x] = pyasge.Tile(prototypes[gid])
+                tiles[y][x].width = self.tile_size[0]
+                tiles[y][x].height = self.tile_size[1]
+
+            self.map.append((name, tiles))
+
+        self.grid = CostGrid(compiled.costs, compiled.components)  # pathfinding costs
+        self.costs = self.grid.costs
 
-                tiles = [[None for i in range(layer.width)] for j in range(layer.height)]
-                for x, y, tile in layer.tiles():
-                    # use the tile image to create and position the map
-                    tiles[y][x] = pyasge.Tile(tile)
-                    tiles[y][x].width = self.tile_size[0]
-                    tiles[y][x].height = self.tile_size[1]
+    @property
+    def components(self) -> np.ndarray:
+        """The connected region of every tile, for reachability checks (see `CostGrid.components`)."""
+        return self.grid.components()
 
-                    # update the cost map with using the layer cost
-                    self.costs[y][x] += int(layer.properties["cost"])
+    def set_cost(self, x: int, y: int, value: int) -> None:
+        """ Changes the cost of a tile at runtime, e.g. to open a door or knock down a wall
 
-                self.map.append((layer.name, tiles))
+        The pathfinding tables pick the change up from the grid (see
+        `CostGrid.set_cost`), so searches already running on them repair
+        their routes rather than starting again. The tile's chunk is
+        rendered again next frame.
+
+        Args:
+            x (int): The tile's column
+            y (int): The tile's row
+            value (int): The new cost, 0 for passable
+
+        Raises:
+            IndexError: If the tile is off the map
+        """
+        self.grid.set_cost(x, y, value)
+        self.mark_dirty((x, y))
 
-        self.redraw = True
-        self.blit(renderer, self.height * self.tile_size[0], self.width * self.tile_size[1])
     def is_passable(self, x, y):
-        # Example check for passability, adjust as needed based on your game's logic
-        return self.costs[y][x] == 0
+        """ Checks whether the tile at (x, y) can be walked on
+
+        See `CostGrid` for the vectorised versions of this check.
+        """
+        return self.grid.is_passable(x, y)
+
+    def reachable_tiles(self, tile_xy: Tuple[int, int]) -> np.ndarray:
+        """ Every passable tile that can be walked to from a tile
+
+        Args:
+            tile_xy (Tuple[int,int]): The tile to walk from
+
+        Returns:
+            An ``(N, 2)`` read-only array of (x, y) tiles, empty if
+            tile_xy is boxed in or off the map
+        """
+        return self.grid.reachable_cells(*tile_xy)
+
     def tile(self, world_space: pyasge.Point2D) -> Tuple[int, int]:
         """ Translate world space co-ordinates to tile location
 
@@ -115,36 +170,59 @@ class GameMap:
             ((tile_xy[0] + 1) * self.tile_size[0]) - (self.tile_size[0] * 0.5),
             ((tile_xy[1] + 1) * self.tile_size[1]) - (self.tile_size[1] * 0.5))
 
-    def render(self, renderer: pyasge.Renderer, game_time: pyasge.GameTime) -> None:
-        """ Renders the map and redraws it if needed """
-        px_wide = self.width * self.tile_size[0]
-        px_high = self.height * self.tile_size[1]
-
-        if self.redraw:
-            self.blit(renderer, px_high, px_wide)
+    def mark_dirty(self, tile_xy: Tuple[int, int]) -> None:
+        """ Flags a tile as changed, so its chunk is rendered again next frame """
+        self.chunks.mark_dirty(*tile_xy)
 
-        renderer.render(self.rt.buffers[0], [0, 0, px_wide, px_high], 0, 0, px_wide, px_high, 0)
+    def render(self, renderer: pyasge.Renderer, game_time: pyasge.GameTime, view=None) -> None:
+        """ Renders the chunks of the map in view, redrawing them if needed
 
-    def blit(self, renderer, px_high, px_wide):
-        """ Renders the game world in to a large single MSAA texture """
+        Args:
+            renderer: The renderer to draw with
+            game_time: The frame's timing
+            view (pyasge.CameraView): The camera's view; the whole map
+                is drawn if this is not given
+        """
+        if view is not None:
+            view = (view.min_x, view.min_y, view.max_x, view.max_y)
+        with profiler.scope("render.map"):
+            self.chunks.draw(view,
+                             lambda chunk: self.blit(renderer, chunk),
+                             lambda chunk: self.render_chunk(renderer, chunk))
+
+    def render_chunk(self, renderer: pyasge.Renderer, chunk) -> None:
+        x, y, px_wide, px_high = self.chunks.bounds(chunk)
+        renderer.render(self.targets[chunk].buffers[0], [0, 0, px_wide, px_high], x, y, px_wide, px_high, 0)
+
+    def blit(self, renderer: pyasge.Renderer, chunk) -> None:
+        """ Renders the tiles of one chunk in to its own MSAA texture """
+        profiler.count("map.chunk_blits")
+        px_wide, px_high = self.chunks.bounds(chunk)[2:]
+        first_x, first_y, end_x, end_y = self.chunks.tiles(chunk)
+        target = self.targets.get(chunk)
+        if target is None:
+            target = self.targets[chunk] = pyasge.RenderTarget(
+                renderer, int(px_wide), int(px_high), pyasge.Texture.Format.RGBA, 1)
 
         # backup the current viewport and camera settings
         camera_view = np.array(renderer.resolution_info.view, copy=True)
         screen_viewport = pyasge.Viewport(renderer.resolution_info.viewport)
 
-        # attach the offscreen texture and ensure whole map is framed
-        renderer.setRenderTarget(self.rt)
+        # attach the offscreen texture and ensure the whole chunk is framed
+        renderer.setRenderTarget(target)
         renderer.setProjectionMatrix(0, 0, px_wide, px_high)
-        renderer.setViewport(pyasge.Viewport(0, 0, px_wide, px_high))
+        renderer.setViewport(pyasge.Viewport(0, 0, int(px_wide), int(px_high)))
 
-        # render the map
+        # render the chunk's tiles, relative to its top left corner
         for layer in self.map:
-            for row_index, row in enumerate(layer[1]):
-                for col_index, tile in enumerate(row):
+            for row_index in range(first_y, end_y):
+                row = layer[1][row_index]
+                for col_index in range(first_x, end_x):
+                    tile = row[col_index]
                     if tile:
                         renderer.render(tile,
-                                        col_index * self.tile_size[0],
-                                        row_index * self.tile_size[1])
+                                        (col_index - first_x) * self.tile_size[0],
+                                        (row_index - first_y) * self.tile_size[1])
 
         # detach the offscreen texture and reset viewport and camera
         renderer.setRenderTarget(None)
@@ -152,5 +230,4 @@ class GameMap:
         renderer.setProjectionMatrix(camera_view)
 
         # resolves the MSAA texture, ready for rendering
-        self.rt.resolve()
-        self.redraw = False
+        target.resolve()
@@ -0,0 +1,215 @@
+"""
+Compiles TMX maps in to NumPy arrays so the game can skip XML parsing.
+
+The first time a map is loaded (or whenever its TMX or tileset files
+change) it is parsed once with pytmx and written to a cache directory
+next to it as a handful of ``.npy`` files plus a ``meta.json``. Later
+loads memory-map the arrays straight back in. A cache entry is trusted
+while every source file has the size and modification time recorded in
+its meta; if a timestamp moved but the file's contents hash the same,
+the entry is kept and only its timestamps are updated.
+
+Maps can be compiled ahead of time from the repository root::
+
+    python -m game.gameobjects.mapcache data/map/*.tmx
+"""
+import hashlib
+import json
+import os
+import sys
+import xml.etree.ElementTree as ElementTree
+
+import numpy as np
+import pytmx
+from pytmx import TiledTileLayer
+
+from game.gameobjects.costgrid import CostGrid, tmx_costs
+
+# bump whenever the layout of the cached files changes
+FORMAT = 1
+
+ARRAYS = ("gids", "tile_images", "tile_rects", "tile_flags", "costs", "components")
+
+
+class CompiledMap:
+    """
+    Everything `GameMap` needs from a TMX map, as plain arrays.
+
+    ``gids`` holds the tile id of every cell of every visible tile layer,
+    shaped ``(layers, height, width)``, 0 where a layer is empty. The
+    ``tile_*`` tables are indexed by that id: the index in to ``images``
+    of the tile's tileset image, its (x, y, width, height) source rect
+    in that image and its horizontal, vertical and diagonal flip flags.
+    ``costs`` and ``components`` are the `CostGrid` costs and region
+    labels of the map. Arrays loaded from the cache are read-only
+    memory maps.
+    """
+
+    def __init__(self, meta: dict, arrays: dict) -> None:
+        self.width = meta["width"]
+        self.height = meta["height"]
+        self.tilewidth = meta["tilewidth"]
+        self.tileheight = meta["tileheight"]
+        self.layer_names = meta["layer_names"]
+        self.images = meta["images"]
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+
+    def tile_flags_of(self, gid: int) -> pytmx.TileFlags:
+        return pytmx.TileFlags(*(int(flag) for flag in self.tile_flags[gid]))
+
+
+def cache_dir_for(tmx_file: str) -> str:
+    """Where the compiled arrays of a map are kept: ``.mapcache/<map name>`` beside it."""
+    folder, name = os.path.split(os.path.abspath(tmx_file))
+    return os.path.join(folder, ".mapcache", os.path.splitext(name)[0])
+
+
+def _sources(tmx_file: str) -> list:
+    """The TMX file and every external tileset it uses."""
+    tmx_file = os.path.abspath(tmx_file)
+    folder = os.path.dirname(tmx_file)
+    sources = [tmx_file]
+    for tileset in ElementTree.parse(tmx_file).getroot().iter("tileset"):
+        if "source" in tileset.attrib:
+            sources.append(os.path.join(folder, tileset.attrib["source"]))
+    return sources
+
+
+def _digest(path: str) -> str:
+    with open(path, "rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+def _stamp(path: str) -> dict:
+    stat = os.stat(path)
+    return {"path": path, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha1": _digest(path)}
+
+
+def compile_map(tmx_file: str, cache_dir: str = None) -> CompiledMap:
+    """ Parses a TMX map with pytmx and writes its arrays to the cache
+
+    Args:
+        tmx_file: The map to compile
+        cache_dir: Where to write it, `cache_dir_for` the map by default
+
+    Returns:
+        The compiled map, backed by in-memory arrays
+    """
+    cache_dir = cache_dir or cache_dir_for(tmx_file)
+
+    # record where every tile comes from instead of loading any images
+    tmxdata = pytmx.TiledMap(tmx_file, image_loader=lambda filename, colorkey, **kwargs:
+                             lambda rect, flags: (filename, rect, flags))
+
+    images = []
+    tile_images = np.full(len(tmxdata.images), -1, dtype=np.int16)
+    tile_rects = np.zeros((len(tmxdata.images), 4), dtype=np.int32)
+    tile_flags = np.zeros((len(tmxdata.images), 3), dtype=bool)
+    for gid, image in enumerate(tmxdata.images):
+        if image is None:
+            continue
+        filename, rect, flags = image
+        if filename not in images:
+            images.append(filename)
+        tile_images[gid] = images.index(filename)
+        tile_rects[gid] = rect
+        tile_flags[gid] = (flags.flipped_horizontally, flags.flipped_vertically, flags.flipped_diagonally)
+
+    layers = [layer for layer in tmxdata.visible_layers if isinstance(layer, TiledTileLayer)]
+    gids = np.zeros((len(layers), tmxdata.height, tmxdata.width), dtype=np.uint32)
+    for index, layer in enumerate(layers):
+        gids[index] = np.asarray(layer.data, dtype=np.uint32)
+
+    grid = CostGrid(tmx_costs(tmxdata))
+    arrays = {"gids": gids, "tile_images": tile_images, "tile_rects": tile_rects, "tile_flags": tile_flags,
+              "costs": grid.costs, "components": grid.components()}
+    meta = {
+        "format": FORMAT,
+        "sources": [_stamp(path) for path in _sources(tmx_file)],
+        "width": tmxdata.width,
+        "height": tmxdata.height,
+        "tilewidth": tmxdata.tilewidth,
+        "tileheight": tmxdata.tileheight,
+        "layer_names": [layer.name for layer in layers],
+        "images": images,
+    }
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(cache_dir, f"{name}.npy"), array)
+        # the meta goes last, so a half written cache is never trusted
+        _write_meta(cache_dir, meta)
+    except OSError as error:
+        # a read-only install still runs, it just parses the TMX every time
+        print(f"Could not cache {tmx_file}: {error}")
+    return CompiledMap(meta, arrays)
+
+
+def _write_meta(cache_dir: str, meta: dict) -> None:
+    path = os.path.join(cache_dir, "meta.json")
+    with open(path + ".tmp", "w") as file:
+        json.dump(meta, file, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def _read_fresh_meta(cache_dir: str):
+    """The cache's meta if it is complete and matches its sources, otherwise None."""
+    try:
+        with open(os.path.join(cache_dir, "meta.json")) as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if meta.get("format") != FORMAT:
+        return None
+
+    touched = False
+    for source in meta["sources"]:
+        try:
+            stat = os.stat(source["path"])
+        except OSError:
+            return None
+        if stat.st_mtime_ns == source["mtime_ns"] and stat.st_size == source["size"]:
+            continue
+        if stat.st_size != source["size"] or _digest(source["path"]) != source["sha1"]:
+            return None
+        source["mtime_ns"] = stat.st_mtime_ns
+        touched = True
+
+    if touched:
+        try:
+            _write_meta(cache_dir, meta)
+        except OSError:
+            pass  # checked by hash again next time
+    return meta
+
+
+def load_map(tmx_file: str, cache_dir: str = None) -> CompiledMap:
+    """ Loads a map from the cache, compiling it first if needed
+
+    Args:
+        tmx_file: The map to load
+        cache_dir: Where its cache lives, `cache_dir_for` the map by default
+    """
+    cache_dir = cache_dir or cache_dir_for(tmx_file)
+    meta = _read_fresh_meta(cache_dir)
+    if meta is None:
+        return compile_map(tmx_file, cache_dir)
+
+    try:
+        arrays = {name: np.load(os.path.join(cache_dir, f"{name}.npy"), mmap_mode="r") for name in ARRAYS}
+    except (OSError, ValueError):
+        return compile_map(tmx_file, cache_dir)
+    return CompiledMap(meta, arrays)
+
+
+def main() -> None:
+    for tmx_file in sys.argv[1:]:
+        compiled = compile_map(tmx_file)
+        print(f"{tmx_file}: {compiled.width}x{compiled.height}, {len(compiled.layer_names)} layers "
+              f"-> {cache_dir_for(tmx_file)}")
+
+
+if __name__ == "__main__":
+    main()
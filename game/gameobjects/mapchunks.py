@@ -0,0 +1,112 @@
+from typing import Tuple
+
+import numpy as np
+
+from game.profiler import profiler
+
+
+class MapChunks:
+    """
+    Splits a tile map in to square chunks that are drawn and redrawn separately.
+
+    Each chunk covers ``chunk_tiles`` x ``chunk_tiles`` tiles (the last
+    row and column may be smaller) and has a dirty flag. `draw` only
+    looks at the chunks that overlap the camera's view: dirty ones are
+    handed to a ``blit`` callback to be re-rendered first, then every
+    one of them is handed to a ``draw`` callback. Chunks that are never
+    seen are never blitted, so their render targets need not exist.
+
+    Nothing here touches the GPU; `GameMap` supplies callbacks that do,
+    and anything else (a stub renderer, a benchmark) can supply its own.
+    """
+
+    def __init__(self, width: int, height: int, tile_size, chunk_tiles: int = 16) -> None:
+        """
+        Args:
+            width: The map's width in tiles
+            height: The map's height in tiles
+            tile_size (Tuple[int,int]): The width and height of a tile in world units
+            chunk_tiles: The width and height of a chunk in tiles
+        """
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.chunk_tiles = chunk_tiles
+        self.columns = -(-width // chunk_tiles)
+        self.rows = -(-height // chunk_tiles)
+        self.dirty = np.ones((self.rows, self.columns), dtype=bool)
+        self.reset_stats()
+
+    def __len__(self) -> int:
+        return self.rows * self.columns
+
+    def reset_stats(self) -> None:
+        self.blits = 0
+        self.draws = 0
+        self.culled = 0
+
+    def chunk_of(self, x: int, y: int) -> Tuple[int, int]:
+        """The (column, row) of the chunk holding tile (x, y)."""
+        return x // self.chunk_tiles, y // self.chunk_tiles
+
+    def tiles(self, chunk) -> Tuple[int, int, int, int]:
+        """The (first x, first y, end x, end y) tiles a chunk covers, ends exclusive."""
+        column, row = chunk
+        x = column * self.chunk_tiles
+        y = row * self.chunk_tiles
+        return x, y, min(x + self.chunk_tiles, self.width), min(y + self.chunk_tiles, self.height)
+
+    def bounds(self, chunk) -> Tuple[float, float, float, float]:
+        """The (x, y, width, height) a chunk covers in world units."""
+        x, y, end_x, end_y = self.tiles(chunk)
+        return (x * self.tile_size[0], y * self.tile_size[1],
+                (end_x - x) * self.tile_size[0], (end_y - y) * self.tile_size[1])
+
+    def mark_dirty(self, x: int, y: int) -> None:
+        """Flags the chunk holding tile (x, y) to be blitted again."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            column, row = self.chunk_of(x, y)
+            self.dirty[row, column] = True
+
+    def mark_all_dirty(self) -> None:
+        self.dirty[:] = True
+
+    def visible(self, min_x: float, min_y: float, max_x: float, max_y: float) -> list:
+        """ The chunks that overlap a box in world units, in row-major order
+
+        Returns:
+            A list of (column, row) chunks
+        """
+        span_x = self.chunk_tiles * self.tile_size[0]
+        span_y = self.chunk_tiles * self.tile_size[1]
+        first_column = max(int(min_x // span_x), 0)
+        first_row = max(int(min_y // span_y), 0)
+        # a chunk touching the view's far edge exactly is not on screen
+        end_column = min(int(-(-max_x // span_x)), self.columns)
+        end_row = min(int(-(-max_y // span_y)), self.rows)
+        return [(column, row) for row in range(first_row, end_row) for column in range(first_column, end_column)]
+
+    def draw(self, view, blit, draw) -> None:
+        """ Draws the chunks in view, blitting the dirty ones first
+
+        Args:
+            view: The area to draw as (min x, min y, max x, max y) in
+                world units, or None for the whole map
+            blit: Called with every dirty chunk in view to re-render it
+            draw: Called with every chunk in view to put it on screen
+        """
+        if view is None:
+            chunks = [(column, row) for row in range(self.rows) for column in range(self.columns)]
+        else:
+            chunks = self.visible(*view)
+
+        for chunk in chunks:
+            column, row = chunk
+            if self.dirty[row, column]:
+                blit(chunk)
+                self.dirty[row, column] = False
+                self.blits += 1
+            draw(chunk)
+        self.draws += len(chunks)
+        self.culled += len(self) - len(chunks)
+        profiler.count("map.chunks_drawn", len(chunks))
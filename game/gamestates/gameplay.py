@@ -1,84 +1,64 @@
 import random
-from enum import Enum
-import time
 import numpy as np
 import pyasge
 
-from game.Pathfinding.AStar import AStarPathing
 from game.gamedata import GameData
 from game.gamestates.gamestate import GameState
 from game.gamestates.gamestate import GameStateID
+from game.leaderboard import Leaderboard
+from game.profiler import profiler
+from game.resources import ResourceManager
+from game.ui import BoundText, Screen
+from game.simulation.world import LARGEST_SIZE, POWERUP_TYPES, Outcome, PowerUpType, World
+
+def load_sprite(resources: ResourceManager, texture: str, scale: float) -> pyasge.Sprite:
+    """Creates a sprite drawing the shared texture of an image file."""
+    sprite = pyasge.Sprite()
+    sprite.attach(resources.texture(texture))
+    sprite.scale = scale
+    return sprite
+
+
+POWERUP_TEXTURES = {
+    PowerUpType.EXTRA_LIFE: "data/textures/powerup_life.png",
+    PowerUpType.SCORE_MULTIPLIER: "data/textures/powerup_multiplier.png",
+    PowerUpType.FREEZE: "data/textures/powerup_freeze.png"
+}
+
+POWERUP_SCALES = {
+    PowerUpType.EXTRA_LIFE: 0.1,
+    PowerUpType.SCORE_MULTIPLIER: 0.05,
+    PowerUpType.FREEZE: 0.01
+}
+
+# the profiler metrics shown on the F1 overlay, top to bottom
+OVERLAY_METRICS = ["frame.update", "frame.render", "world.enemies", "world.pathing", "world.player",
+                   "render.map", "path.expansions", "path.length", "collision.tests", "render.sprites"]
+# frames between recomputing the overlay's percentiles
+OVERLAY_REFRESH = 30
 
-class PowerUpType(Enum):
-    EXTRA_LIFE = 'extra_life'
-    SCORE_MULTIPLIER = 'score_multiplier'
-    FREEZE = 'freeze'
-
-class PowerUp:
-    def __init__(self, powerup_type: PowerUpType):
-        self.sprite = pyasge.Sprite()
-        self.active = False
-        self.type = powerup_type
-        self.duration = 5
-        self.collect_time = None
-
-        texture_paths = {
-            PowerUpType.EXTRA_LIFE: "data/textures/powerup_life.png",
-            PowerUpType.SCORE_MULTIPLIER: "data/textures/powerup_multiplier.png",
-            PowerUpType.FREEZE: "data/textures/powerup_freeze.png"
-        }
-
-        scale_values = {
-            PowerUpType.EXTRA_LIFE: 0.1,
-            PowerUpType.SCORE_MULTIPLIER: 0.05,
-            PowerUpType.FREEZE: 0.01
-        }
-
-        self.sprite.loadTexture(texture_paths[self.type])
-        self.sprite.scale = scale_values[self.type]
-
-class LeaderboardEntry:
-    def __init__(self, name, score):
-        self.name = name
-        self.score = score
-
-class Coin:
-    def __init__(self):
-        self.sprite = pyasge.Sprite()
-        self.collected = False
-        self.sprite.loadTexture("data/textures/Coin.png")
-        self.sprite.scale = 0.1
-
-class Player:
-    def __init__(self):
-        self.sprite = pyasge.Sprite()
-        self.tile_position = pyasge.Point2D(1, 1)
-        self.navigation_path = []
-        self.current_path_step = 0
-        self.movement_speed = 3
-        self.current_speed_tick = 0
-        self.sprite.loadTexture("data/textures/survivor-idle_knife_0.png")
-        self.sprite.scale = 0.3
-        self.sprite.x = 100
-        self.sprite.y = 100
-        self.lives = 3
-        self.score_multiplier_active = False
-        self.score_multiplier_time = 0
-
-class Enemy:
-    def __init__(self):
-        self.sprite = pyasge.Sprite()
-        self.tile_position = pyasge.Point2D(1, 1)
-        self.logic_state = 0
-        self.navigation_path = []
-        self.current_path_step = 0
-        self.detection_range = 5
-        self.movement_speed = 9
-        self.current_speed_tick = 0
-        self.frozen = False
-        self.freeze_time = 0
 
 class GamePlay(GameState):
+    """
+    Draws a `World` with pyasge and feeds it the player's input.
+
+    The rules all live in the world, which knows nothing of sprites;
+    this state owns one sprite per entity. After every tick the
+    camera's view is looked up in the world's spatial hashes to find
+    the entities on screen; only their sprites are updated (and only
+    if flagged as changed) and only they are submitted to the
+    renderer, so a level can hold thousands of entities without
+    touching every sprite. ``sprites_submitted`` and
+    ``sprites_culled`` count what the last frame drew and skipped.
+
+    F1 switches the shared `profiler` on and shows its percentiles over
+    the play field; F2 saves what it has recorded to profile.json and
+    profile.csv.
+
+    Sprites share their textures through the `ResourceManager` on
+    `GameData`, so building a level's sprites doesn't load anything the
+    previous level already had loaded.
+    """
 
     def __init__(self, data: GameData) -> None:
 
@@ -88,150 +68,176 @@ class GamePlay(GameState):
             self.data.game_map.width * self.data.game_map.tile_size[0] * 0.5,
             self.data.game_map.height * self.data.game_map.tile_size[1] * 0.5
         ]
-        self.astar = AStarPathing(self.data)
-        self.enemy = Enemy()
-        self.init_enemies(2)
-        self.player = Player()
-        self.enemies = []
-        self.coins = []
-        self.player_score = 0
-        self.init_coins(20)
-        map_choice = random.choice(["./data/map/Maze.tmx", "./data/map/Maze2.tmx", "./data/map/Maze3.tmx"])
-        self.level = 1
-        self.setup_level()
+        self.world = World(self.data.game_map.grid, self.data.game_map.tile_size,
+                           path_workers=self.data.path_workers)
+        self.player_sprite = load_sprite(self.data.resources, "data/textures/survivor-idle_knife_0.png", 0.3)
+        self.sprite_textures = []  # a texture path for every reference the entity sprites hold
+        self.enemy_sprites = []
+        self.coin_sprites = []
+        self.powerup_sprites = []
         self.id = GameStateID.START_MENU
         self.data.renderer.setClearColour(pyasge.COLOURS.CORAL)
         self.init_ui()
         self.camera = pyasge.Camera(map_mid, self.data.game_res[0], self.data.game_res[1])
         self.camera.zoom = .8
-        self.ui_label = pyasge.Text(self.data.renderer.getDefaultFont(), "UI Label", 10, 50)
-        self.ui_label.z_order = 120
-        self.leaderboard = []
-
-    def init_powerups(self, count=3):
-        self.powerups = []
-
-        for _ in range(count):
-            powerup_type = random.choice(list(PowerUpType))
-            powerup = PowerUp(powerup_type)
-            placed = False
-
-            while not placed:
-                tile_x = random.randint(0, self.data.game_map.width - 1)
-                tile_y = random.randint(0, self.data.game_map.height - 1)
-
-                if self.data.game_map.costs[tile_y][tile_x] == 0:
-                    world_pos = self.data.game_map.world((tile_x, tile_y))
-                    powerup.sprite.x, powerup.sprite.y = (world_pos.x - self.data.game_map.tile_size[0] / 2,
-                                                          world_pos.y - self.data.game_map.tile_size[1] / 2)
-                    placed = True
-
-            self.powerups.append(powerup)
-
-    def generate_unique_leaderboard_entry(self, base_name):
-        count = 1
-        new_name = base_name
-        while any(entry.name == new_name for entry in self.leaderboard):
-            count += 1
-            new_name = f"{base_name}{count}"
-        return new_name
+        self.build_sprites()
+        self.leaderboard = []  # the top entries shown on the game over screen
+        self.ticks_per_update = 1  # raise to run the game faster than real time
+        self.show_profile = False
+        self.profile_summary = {}
+        if self.data.leaderboard is None:
+            self.data.leaderboard = Leaderboard()
+
+    @property
+    def player_score(self) -> int:
+        return self.world.score
+
+    def build_sprites(self):
+        """Creates a sprite for every entity of a freshly set up level."""
+        resources = self.data.resources
+        for texture in self.sprite_textures:
+            resources.release(texture)
+        self.sprite_textures = []
+
+        self.enemy_sprites = []
+        for _ in range(len(self.world.enemies)):
+            sprite = self.load_entity_sprite("data/textures/survivor-idle_shotgun_0.png", .5)
+            sprite.width = sprite.texture.width * sprite.scale
+            sprite.height = sprite.texture.height * sprite.scale
+            self.enemy_sprites.append(sprite)
+
+        self.coin_sprites = [self.load_entity_sprite("data/textures/Coin.png", 0.1)
+                             for _ in range(len(self.world.coins))]
+        self.powerup_sprites = []
+        for kind in self.world.powerups.kind.tolist():
+            powerup_type = POWERUP_TYPES[kind]
+            self.powerup_sprites.append(
+                self.load_entity_sprite(POWERUP_TEXTURES[powerup_type], POWERUP_SCALES[powerup_type]))
+        self.sync_sprites()
+
+    def load_entity_sprite(self, texture: str, scale: float) -> pyasge.Sprite:
+        self.sprite_textures.append(texture)
+        return load_sprite(self.data.resources, texture, scale)
+
+    def on_screen(self, index, store) -> np.ndarray:
+        """ The entities filed in a spatial hash that overlap the camera's view
+
+        Returns:
+            The entities' indices in the store, in ascending order
+        """
+        view = self.camera.view
+        keys = np.array(index.query(view.min_x, view.min_y, view.max_x - view.min_x, view.max_y - view.min_y),
+                        dtype=np.intp)
+        x = store.x[keys]
+        y = store.y[keys]
+        inside = (x + LARGEST_SIZE[0] > view.min_x) & (x < view.max_x) & \
+            (y + LARGEST_SIZE[1] > view.min_y) & (y < view.max_y)
+        return np.sort(keys[inside])
+
+    def sync_sprites(self):
+        """ Copies the world's positions on to the sprites that need them
+
+        Entities off screen keep their changed flag, so their sprite is
+        brought up to date as soon as they come in to view.
+        """
+        world = self.world
+        self.player_sprite.x, self.player_sprite.y = world.player.x, world.player.y
+        view = self.camera.view
+        self.player_visible = world.player.x + world.player.size[0] > view.min_x and world.player.x < view.max_x \
+            and world.player.y + world.player.size[1] > view.min_y and world.player.y < view.max_y
+
+        # collected coins and used power-ups are no longer in the hashes
+        self.visible_enemies = self.sync_store(world.enemy_index, world.enemies, self.enemy_sprites)
+        self.visible_coins = self.sync_store(world.coin_index, world.coins, self.coin_sprites)
+        self.visible_powerups = self.sync_store(world.powerup_index, world.powerups, self.powerup_sprites)
+
+        self.sprites_submitted = int(self.player_visible) + len(self.visible_enemies) + \
+            len(self.visible_coins) + len(self.visible_powerups)
+        self.sprites_culled = 1 + len(world.enemy_index) + len(world.coin_index) + len(world.powerup_index) - \
+            self.sprites_submitted
+
+    def sync_store(self, index, store, sprites) -> np.ndarray:
+        visible = self.on_screen(index, store)
+        dirty = visible[store.changed[visible]]
+        for entity, x, y in zip(dirty.tolist(), store.x[dirty].tolist(), store.y[dirty].tolist()):
+            sprites[entity].x = x
+            sprites[entity].y = y
+        store.changed[dirty] = False
+        return visible
+
+    def report_level_stats(self):
+        if not self.data.debug:
+            return
+        cache = self.world.pathing.cache
+        if cache.hits or cache.suffix_hits or cache.misses:
+            print(f"Path cache last level: {cache.summary()}")
+        print(f"Resources: {self.data.resources.summary()}")
 
     def generate_random_leaderboard_entries(self):
         possible_names = ["Alice", "Bob", "Charlie", "David", "Eve", "Steve", "Quinn", "Richard", "Wojciech"]
         for _ in range(5):
-            name = random.choice(possible_names)
-            unique_name = self.generate_unique_leaderboard_entry(name)
-            score = random.randint(5, 20)
-            self.leaderboard.append(LeaderboardEntry(unique_name, score))
-
-    def bubble_sort_leaderboard(self):
-
-        n = len(self.leaderboard)
-        for i in range(n):
-            for j in range(0, n - i - 1):
-                if self.leaderboard[j].score < self.leaderboard[j + 1].score:
-                    self.leaderboard[j], self.leaderboard[j + 1] = self.leaderboard[j + 1], self.leaderboard[j]
-                elif self.leaderboard[j].score == self.leaderboard[j + 1].score:
-
-                    if self.leaderboard[j].name > self.leaderboard[j + 1].name:
-                        self.leaderboard[j], self.leaderboard[j + 1] = self.leaderboard[j + 1], self.leaderboard[j]
+            self.data.leaderboard.add(random.choice(possible_names), random.randint(5, 20))
 
     def end_game(self):
+        # a brand new leaderboard gets a few rivals to beat
+        if self.data.leaderboard.is_empty:
+            self.generate_random_leaderboard_entries()
 
-        self.leaderboard.clear()
-
-        self.leaderboard.append(LeaderboardEntry("YOU", self.player_score))
-
-        self.generate_random_leaderboard_entries()
-
-        self.bubble_sort_leaderboard()
-
-    def init_enemies(self, count=3):
-        self.enemies = []
-
-        for _ in range(count):
-            enemy = Enemy()
-            enemy.sprite.loadTexture("data/textures/survivor-idle_shotgun_0.png")
-            enemy.sprite.scale = .5
-            enemy.sprite.width = enemy.sprite.texture.width * enemy.sprite.scale
-            enemy.sprite.height = enemy.sprite.texture.height * enemy.sprite.scale
-
-            max_x = self.data.game_map.width * self.data.game_map.tile_size[0] - enemy.sprite.width
-            max_y = self.data.game_map.height * self.data.game_map.tile_size[1] - enemy.sprite.height
-
-            start_pos = pyasge.Point2D(
-                random.randint(0, int(max_x)),
-                random.randint(0, int(max_y))
-            )
-            enemy.sprite.x, enemy.sprite.y = start_pos.x, start_pos.y
-
-            self.enemies.append(enemy)
-
-    def setup_level(self):
-        self.new_level = True
-        self.enemies.clear()
-        self.coins.clear()
-        self.init_powerups(5)
-        self.player.lives = 3
-
-        num_enemies = 1 + self.level
-        num_coins = 10 + 10 * self.level
-
-        self.init_enemies(num_enemies)
-        self.init_coins(num_coins)
-
-        self.reset_player()
-
-    def reset_player(self):
-
-        self.player.sprite.x = 100
-        self.player.sprite.y = 100
-        self.player.navigation_path.clear()
-        self.player.current_path_step = 0
-        self.player.current_speed_tick = 0
-
-    def init_coins(self, count=20):
-        for _ in range(count):
-            coin = Coin()
-            placed = False
-
-            while not placed:
-
-                tile_x = random.randint(0, self.data.game_map.width - 1)
-                tile_y = random.randint(0, self.data.game_map.height - 1)
-
-                if self.data.game_map.costs[tile_y][tile_x] == 0:
-                    world_pos = self.data.game_map.world((tile_x, tile_y))
-
-                    coin.sprite.x, coin.sprite.y = world_pos.x - self.data.game_map.tile_size[0] / 2, world_pos.y - \
-                                                   self.data.game_map.tile_size[1] / 2
-                    placed = True
-
-            self.coins.append(coin)
+        self.data.leaderboard.add("YOU", self.player_score)
+        self.leaderboard = self.data.leaderboard.top(5)
 
     def init_ui(self):
-
-        pass
+        """ Lays out every screen's text once; the texts are made on first draw and then reused """
+        self.hud = Screen(self.make_text, BoundText(
+            "Score: {}  Lives: {}  Level: {}", 10, 10,
+            lambda: (self.player_score, self.world.player.lives, self.world.level)))
+
+        self.main_menu = Screen(self.make_text,
+                                BoundText("Press Enter to Start", 450, 450),
+                                BoundText("The Maze Raider", 550, 350))
+
+        self.winner_screen = Screen(self.make_text,
+                                    BoundText("You Win! Congratulations!", 400, 300,
+                                              colour=pyasge.COLOURS.GREENYELLOW),
+                                    BoundText("Press SPACE to continue", 450, 350, colour=pyasge.COLOURS.WHITE))
+
+        entries = [BoundText("{}. {}: {}", 400, 400 + 50 * place, colour=pyasge.COLOURS.WHITE,
+                             binding=lambda place=place: self.leaderboard_line(place))
+                   for place in range(5)]
+        self.loser_screen = Screen(self.make_text,
+                                   BoundText("You Lose! Your Score Was: {}", 400, 300,
+                                             lambda: (self.player_score,), pyasge.COLOURS.RED),
+                                   BoundText("Leaderboard", 400, 350, colour=pyasge.COLOURS.WHITE),
+                                   *entries,
+                                   BoundText("Press SPACE to restart", 450, 650, colour=pyasge.COLOURS.WHITE))
+
+        self.profile_overlay = Screen(self.make_text, *[
+            BoundText("{}: p50 {:.2f}  p95 {:.2f}  p99 {:.2f}", 10, 60 + 30 * row, colour=pyasge.COLOURS.WHITE,
+                      binding=lambda name=name: self.profile_line(name))
+            for row, name in enumerate(OVERLAY_METRICS)])
+
+    def make_text(self, string: str, x: float, y: float) -> pyasge.Text:
+        text = pyasge.Text(self.data.renderer.getDefaultFont(), string, x, y)
+        text.z_order = 120
+        return text
+
+    def leaderboard_line(self, place: int):
+        if place >= len(self.leaderboard):
+            return None
+        entry = self.leaderboard[place]
+        return place + 1, entry.name, entry.score
+
+    def profile_line(self, name: str):
+        stats = self.profile_summary.get(name)
+        if stats is None:
+            return None
+        return name, round(stats["p50"], 2), round(stats["p95"], 2), round(stats["p99"], 2)
+
+    def toggle_profiler(self) -> None:
+        self.show_profile = not self.show_profile
+        profiler.enabled = self.show_profile
+        if self.show_profile:
+            profiler.reset()
 
     def click_handler(self, event: pyasge.ClickEvent) -> None:
 
@@ -244,15 +250,7 @@ class GamePlay(GameState):
 
             target_tile_pos = self.data.game_map.tile(pyasge.Point2D(corrected_click_x, corrected_click_y))
 
-            start_tile_pos = self.data.game_map.tile(pyasge.Point2D(self.player.sprite.x, self.player.sprite.y))
-
-            start_tile = pyasge.Point2D(start_tile_pos[0], start_tile_pos[1])
-            target_tile = pyasge.Point2D(target_tile_pos[0], target_tile_pos[1])
-
-            self.astar.find_path(start_tile, target_tile)
-
-            self.player.navigation_path = self.astar.path
-            self.player.current_path_step = 0
+            self.world.move_player_to(target_tile_pos)
 
     def move_handler(self, event: pyasge.MoveEvent) -> None:
         pass
@@ -260,17 +258,24 @@ class GamePlay(GameState):
     def key_handler(self, event: pyasge.KeyEvent) -> None:
         super().key_handler(event)
 
+        if event.key == pyasge.KEYS.KEY_F1 and event.action == pyasge.KEYS.KEY_PRESSED:
+            self.toggle_profiler()
+        elif event.key == pyasge.KEYS.KEY_F2 and event.action == pyasge.KEYS.KEY_PRESSED and profiler.frames:
+            profiler.export_json("./profile.json")
+            profiler.export_csv("./profile.csv")
+            print(f"Saved {min(profiler.frames, profiler.window)} profiled frames to profile.json and profile.csv")
+
         if self.id == GameStateID.START_MENU and event.key == pyasge.KEYS.KEY_ENTER and event.action == pyasge.KEYS.KEY_PRESSED:
             self.id = GameStateID.GAMEPLAY
         elif self.id == GameStateID.WINNER_WINNER and event.key == pyasge.KEYS.KEY_SPACE and event.action == pyasge.KEYS.KEY_PRESSED:
-            self.level += 1
-            self.setup_level()
+            self.report_level_stats()
+            self.world.next_level()
+            self.build_sprites()
             self.id = GameStateID.GAMEPLAY
         elif self.id == GameStateID.GAME_OVER and event.key == pyasge.KEYS.KEY_SPACE and event.action == pyasge.KEYS.KEY_PRESSED:
-            self.level = 1
-            self.player_score = 0
-            self.player.lives = 3
-            self.setup_level()
+            self.report_level_stats()
+            self.world.restart()
+            self.build_sprites()
             self.id = GameStateID.GAMEPLAY
         pass
 
@@ -279,152 +284,21 @@ class GamePlay(GameState):
         pass
 
     def update(self, game_time: pyasge.GameTime) -> GameStateID:
-        self.update_enemies()
+        # the world runs on its own clock, so fast forwarding is just ticking it more often
+        for _ in range(self.ticks_per_update):
+            self.world.tick()
         self.update_camera()
         self.update_inputs()
-        self.update_player()
-        self.update_powerups()
-        if all(coin.collected for coin in self.coins):
+        self.sync_sprites()
+        outcome = self.world.outcome
+        if outcome == Outcome.WON:
             self.id = GameStateID.WINNER_WINNER
-        elif self.player.lives <= 0 and self.id != GameStateID.GAME_OVER:
+        elif outcome == Outcome.LOST and self.id != GameStateID.GAME_OVER:
             self.end_game()
             self.id = GameStateID.GAME_OVER
 
         return self.id
 
-    def check_collision(self, sprite1: pyasge.Sprite, sprite2: pyasge.Sprite) -> bool:
-
-        x1_min = sprite1.x
-        x1_max = sprite1.x + sprite1.width * sprite1.scale
-        y1_min = sprite1.y
-        y1_max = sprite1.y + sprite1.height * sprite1.scale
-
-        x2_min = sprite2.x
-        x2_max = sprite2.x + sprite2.width * sprite2.scale
-        y2_min = sprite2.y
-        y2_max = sprite2.y + sprite2.height * sprite2.scale
-
-        overlap_x = x1_min < x2_max and x1_max > x2_min
-        overlap_y = y1_min < y2_max and y1_max > y2_min
-
-        return overlap_x and overlap_y
-
-    def update_player(self):
-        if len(self.player.navigation_path) > 0:
-            self.player.current_speed_tick += 1
-            if self.player.current_speed_tick >= self.player.movement_speed:
-                if self.player.current_path_step < len(self.player.navigation_path):
-                    next_pos = self.player.navigation_path[self.player.current_path_step]
-                    self.player.sprite.x, self.player.sprite.y = next_pos.x * self.data.game_map.tile_size[
-                        0], next_pos.y * self.data.game_map.tile_size[1]
-                    self.player.current_path_step += 1
-                    self.player.current_speed_tick = 0
-
-                    for enemy in self.enemies:
-                        if self.check_collision(self.player.sprite, enemy.sprite) and not enemy.frozen:
-                            self.player.lives -= 1
-
-                            self.reset_player()
-                            if self.player.lives <= 0:
-                                return GameStateID.GAME_OVER
-
-                    for coin in self.coins:
-                        if not coin.collected and self.check_collision(self.player.sprite, coin.sprite):
-                            points = 1
-                            if self.player.score_multiplier_active:
-                                points *= 2
-                            self.player_score += points
-                            coin.collected = True
-                for powerup in self.powerups:
-                    if self.check_collision(self.player.sprite, powerup.sprite) and not powerup.active:
-                        self.apply_powerup(powerup)
-                        powerup.active = True
-
-    def apply_powerup(self, powerup: PowerUp):
-
-        current_time = time.time()
-
-        if powerup.type == PowerUpType.EXTRA_LIFE:
-            self.player.lives += 1
-
-        elif powerup.type == PowerUpType.SCORE_MULTIPLIER:
-            self.player.score_multiplier_active = True
-
-            self.player.score_multiplier_time = current_time + powerup.duration
-
-        elif powerup.type == PowerUpType.FREEZE:
-            for enemy in self.enemies:
-                enemy.frozen = True
-
-                enemy.freeze_time = current_time + powerup.duration
-
-    def update_powerups(self):
-        current_time = time.time()
-
-        if self.player.score_multiplier_active and current_time > self.player.score_multiplier_time:
-            self.player.score_multiplier_active = False
-            print("Score multiplier ended.")
-
-        for enemy in self.enemies:
-            if enemy.frozen and current_time > enemy.freeze_time:
-                enemy.frozen = False
-                print("Enemy unfrozen.")
-
-    def update_enemies(self):
-        current_time = time.time()
-
-        for enemy in self.enemies:
-
-            if enemy.frozen and current_time > enemy.freeze_time:
-                enemy.frozen = False
-                print("Enemy unfrozen.")
-
-            if enemy.frozen:
-                continue
-
-            distance_to_player = pyasge.Point2D.distance(
-                pyasge.Point2D(enemy.sprite.x, enemy.sprite.y),
-                pyasge.Point2D(self.player.sprite.x, self.player.sprite.y)
-            )
-
-            if distance_to_player <= enemy.detection_range * self.data.game_map.tile_size[0]:
-                enemy.logic_state = 0
-            else:
-                if random.randint(0, 100) > 98:
-                    enemy.logic_state = 0
-
-            if enemy.logic_state == 0:
-                if len(enemy.navigation_path) <= 0 or enemy.current_path_step >= len(enemy.navigation_path):
-                    target_pos = pyasge.Point2D(random.randint(1, self.data.game_map.width - 1),
-                                                random.randint(1, self.data.game_map.height - 1))
-                    start_pos = self.data.game_map.tile(pyasge.Point2D(enemy.sprite.x, enemy.sprite.y))
-                    self.astar.find_path(pyasge.Point2D(start_pos[0], start_pos[1]), target_pos)
-                    enemy.navigation_path = self.astar.path.copy()
-                    enemy.current_path_step = 0
-
-            elif enemy.logic_state == 1:
-                if len(enemy.navigation_path) <= 0 or enemy.current_path_step >= len(enemy.navigation_path):
-                    player_pos = self.data.game_map.tile(pyasge.Point2D(self.player.sprite.x, self.player.sprite.y))
-                    start_pos = self.data.game_map.tile(pyasge.Point2D(enemy.sprite.x, enemy.sprite.y))
-                    self.astar.find_path(pyasge.Point2D(start_pos[0], start_pos[1]),
-                                         pyasge.Point2D(player_pos[0], player_pos[1]))
-                    enemy.navigation_path = self.astar.path.copy()
-                    enemy.current_path_step = 0
-
-            if len(enemy.navigation_path) > 0:
-                enemy.current_speed_tick += 1
-                if enemy.current_speed_tick >= enemy.movement_speed:
-                    if enemy.current_path_step < len(enemy.navigation_path):
-                        move_to_position = enemy.navigation_path[enemy.current_path_step]
-                        enemy.sprite.x, enemy.sprite.y = move_to_position.x * self.data.game_map.tile_size[
-                            0], move_to_position.y * self.data.game_map.tile_size[1]
-                        enemy.current_path_step += 1
-                        enemy.current_speed_tick = 0
-
-                    if enemy.current_path_step >= len(enemy.navigation_path):
-                        enemy.navigation_path.clear()
-                        enemy.current_path_step = 0
-
     def update_camera(self):
 
         if self.data.gamepad.connected:
@@ -446,9 +320,8 @@ class GamePlay(GameState):
                 pass
 
     def render_powerups(self):
-        for powerup in self.powerups:
-            if not powerup.active:
-                self.data.renderer.render(powerup.sprite)
+        for index in self.visible_powerups.tolist():
+            self.data.renderer.render(self.powerup_sprites[index])
 
     def render(self, game_time: pyasge.GameTime) -> None:
         self.data.renderer.setViewport(pyasge.Viewport(0, 0, self.data.game_res[0], self.data.game_res[1]))
@@ -457,16 +330,18 @@ class GamePlay(GameState):
             self.data.renderer.setProjectionMatrix(self.camera.view)
             self.data.shaders["example"].uniform("rgb").set([1.0, 1.0, 0])
             self.data.renderer.shader = self.data.shaders["example"]
-            self.data.game_map.render(self.data.renderer, game_time)
-            self.data.renderer.render(self.player.sprite)
+            self.data.game_map.render(self.data.renderer, game_time, self.camera.view)
+            if self.player_visible:
+                self.data.renderer.render(self.player_sprite)
 
-            for enemy in self.enemies:
-                self.data.renderer.render(enemy.sprite)
-            for coin in self.coins:
-                if not coin.collected:
-                    self.data.renderer.render(coin.sprite)
+            for index in self.visible_enemies.tolist():
+                self.data.renderer.render(self.enemy_sprites[index])
+            for index in self.visible_coins.tolist():
+                self.data.renderer.render(self.coin_sprites[index])
 
             self.render_powerups()
+            profiler.count("render.sprites", self.sprites_submitted)
+            profiler.count("render.culled", self.sprites_culled)
             self.render_ui()
 
         elif self.id == GameStateID.WINNER_WINNER:
@@ -477,48 +352,20 @@ class GamePlay(GameState):
             self.render_main_menu(game_time)
 
     def render_loser_screen(self, game_time: pyasge.GameTime) -> None:
-
-        loser_text = pyasge.Text(self.data.renderer.getDefaultFont(), f"You Lose! Your Score Was: {self.player_score}",
-                                 400, 300)
-        loser_text.colour = pyasge.COLOURS.RED
-        self.data.renderer.render(loser_text)
-
-        leaderboard_text = pyasge.Text(self.data.renderer.getDefaultFont(), "Leaderboard", 400, 350)
-        leaderboard_text.colour = pyasge.COLOURS.WHITE
-        self.data.renderer.render(leaderboard_text)
-
-        y_offset = 400
-        for idx, entry in enumerate(self.leaderboard[:5]):
-            entry_text = pyasge.Text(self.data.renderer.getDefaultFont(), f"{idx + 1}. {entry.name}: {entry.score}",
-                                     400, y_offset)
-            entry_text.colour = pyasge.COLOURS.WHITE
-            self.data.renderer.render(entry_text)
-            y_offset += 50
-
-        restart_text = pyasge.Text(self.data.renderer.getDefaultFont(), "Press SPACE to restart", 450, 650)
-        restart_text.colour = pyasge.COLOURS.WHITE
-        self.data.renderer.render(restart_text)
+        self.loser_screen.render(self.data.renderer)
 
     def render_main_menu(self, game_time: pyasge.GameTime) -> None:
-        main_menu_text2 = pyasge.Text(self.data.renderer.getDefaultFont(), "The Maze Raider", 550, 350)
-        main_menu_text = pyasge.Text(self.data.renderer.getDefaultFont(), "Press Enter to Start", 450, 450)
-        self.data.renderer.render(main_menu_text)
-        self.data.renderer.render(main_menu_text2)
-    def render_winner_screen(self, game_time: pyasge.GameTime) -> None:
-
-        winner_text = pyasge.Text(self.data.renderer.getDefaultFont(), "You Win! Congratulations!", 400, 300)
-        winner_text.colour = pyasge.COLOURS.GREENYELLOW
-        self.data.renderer.render(winner_text)
+        self.main_menu.render(self.data.renderer)
 
-        continue_text = pyasge.Text(self.data.renderer.getDefaultFont(), "Press SPACE to continue", 450, 350)
-        continue_text.colour = pyasge.COLOURS.WHITE
-        self.data.renderer.render(continue_text)
+    def render_winner_screen(self, game_time: pyasge.GameTime) -> None:
+        self.winner_screen.render(self.data.renderer)
 
     def render_ui(self) -> None:
-
-        self.ui_label.string = f"Score: {self.player_score}  Lives: {self.player.lives}  Level: {self.level}"
-        self.ui_label.position = pyasge.Point2D(10, 10)
-        self.data.renderer.render(self.ui_label)
+        self.hud.render(self.data.renderer)
+        if self.show_profile:
+            if profiler.frames % OVERLAY_REFRESH == 0:
+                self.profile_summary = profiler.summary()
+            self.profile_overlay.render(self.data.renderer)
 
     def to_world(self, pos: pyasge.Point2D) -> pyasge.Point2D:
 
@@ -0,0 +1,122 @@
+import sqlite3
+
+
+class LeaderboardEntry:
+    def __init__(self, name, score, entry_id=None):
+        self.name = name
+        self.score = score
+        self.id = entry_id  # the row the entry is stored under, None if it is not stored
+
+
+class Leaderboard:
+    """
+    Every score ever posted, kept on disk in a SQLite database.
+
+    Each posted score is its own row under an autoincrementing id, so
+    the same name can appear any number of times. Entries are indexed
+    by (score descending, id ascending), so posting a score is an
+    O(log n) index insert and the top k entries are read straight off
+    the front of the index without sorting or loading the rest; among
+    equal scores the one posted first ranks higher. A count of the
+    entries on every score is kept alongside, so an entry's rank is a
+    sum over the distinct scores above it plus its ties instead of a
+    count of everyone ahead of it. Nothing is held in memory besides
+    SQLite's page cache, so the table can grow to millions of entries.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        """
+        Args:
+            path: The database file, created if needed; the default
+                keeps the leaderboard in memory for this run only
+        """
+        self.connection = sqlite3.connect(path)
+        counted = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'score_counts'").fetchone() is not None
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(entries)")}
+        if "base" in columns:
+            # a database from when names were made unique; its rows keep their order
+            with self.connection:
+                self.connection.executescript("""
+                    DROP INDEX IF EXISTS entries_by_rank;
+                    DROP INDEX IF EXISTS entries_by_base;
+                    ALTER TABLE entries RENAME TO named_entries;
+                """)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                score INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_by_rank ON entries (score DESC, id ASC);
+            CREATE TABLE IF NOT EXISTS score_counts (
+                score INTEGER PRIMARY KEY,
+                count INTEGER NOT NULL
+            );
+        """)
+        if "base" in columns:
+            with self.connection:
+                self.connection.executescript("""
+                    INSERT INTO entries (id, name, score) SELECT rowid, name, score FROM named_entries;
+                    DROP TABLE named_entries;
+                """)
+        if not counted:
+            # a database from before the counts were kept
+            with self.connection:
+                self.connection.execute(
+                    "INSERT INTO score_counts (score, count) SELECT score, COUNT(*) FROM entries GROUP BY score")
+
+    def __len__(self) -> int:
+        # SQLite counts by walking an index, so this is O(n); see `is_empty`
+        return self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @property
+    def is_empty(self) -> bool:
+        return self.connection.execute("SELECT 1 FROM entries LIMIT 1").fetchone() is None
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def add(self, name: str, score: int) -> LeaderboardEntry:
+        """ Posts a score, as a new entry even if the name has one already
+
+        Returns:
+            The new entry, with the id it was stored under
+        """
+        with self.connection:
+            entry_id = self.connection.execute("INSERT INTO entries (name, score) VALUES (?, ?)",
+                                               (name, score)).lastrowid
+            self._count_scores([(score,)])
+        return LeaderboardEntry(name, score, entry_id)
+
+    def _count_scores(self, scores) -> None:
+        self.connection.executemany("INSERT INTO score_counts (score, count) VALUES (?, 1) "
+                                    "ON CONFLICT (score) DO UPDATE SET count = count + 1", scores)
+
+    def add_many(self, entries) -> None:
+        """ Posts many (name, score) pairs in one transaction, in order """
+        entries = list(entries)
+        with self.connection:
+            self.connection.executemany("INSERT INTO entries (name, score) VALUES (?, ?)", entries)
+            self._count_scores((score,) for _, score in entries)
+
+    def top(self, count: int = 5) -> list:
+        """The best ``count`` entries, highest score first and ties in the order they were posted."""
+        rows = self.connection.execute(
+            "SELECT id, name, score FROM entries ORDER BY score DESC, id ASC LIMIT ?", (count,))
+        return [LeaderboardEntry(name, score, entry_id) for entry_id, name, score in rows]
+
+    def rank(self, entry_id: int):
+        """ The 1-based place of an entry, or None if there is no entry with that id
+
+        Costs O(distinct higher scores + entries tied with it), not O(n).
+        """
+        row = self.connection.execute("SELECT score FROM entries WHERE id = ?", (entry_id,)).fetchone()
+        if row is None:
+            return None
+        score = row[0]
+        higher = self.connection.execute(
+            "SELECT COALESCE(SUM(count), 0) FROM score_counts WHERE score > ?", (score,)).fetchone()[0]
+        tied = self.connection.execute(
+            "SELECT COUNT(*) FROM entries WHERE score = ? AND id < ?", (score, entry_id)).fetchone()[0]
+        return higher + tied + 1
@@ -0,0 +1,160 @@
+"""
+A frame profiler that can stay in the game, switched off, at almost no cost.
+
+Code marks the work it wants measured with ``with profiler.scope(name)``
+and counts events with ``profiler.count(name, amount)``. Each frame's
+totals are kept per name in a ring buffer of the last ``window``
+frames, from which `Profiler.summary` gives p50/p95/p99, and which can
+be saved with `Profiler.export_json` or `Profiler.export_csv`.
+
+While disabled, `scope` hands back one shared do-nothing context
+manager and `count` returns straight away, so an instrumented hot
+path pays for an attribute check and nothing else.
+
+The game shares one module level `profiler`; the pathfinding and
+simulation code use it without needing a window or pyasge.
+"""
+import csv
+import json
+import time
+
+import numpy as np
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _Metric:
+    __slots__ = ("kind", "total", "samples")
+
+    def __init__(self, kind: str, window: int) -> None:
+        self.kind = kind
+        self.total = 0.0
+        self.samples = np.zeros(window)
+
+
+class _Scope:
+    __slots__ = ("metric", "begin")
+
+    def __init__(self, metric: _Metric) -> None:
+        self.metric = metric
+        self.begin = 0.0
+
+    def __enter__(self):
+        self.begin = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metric.total += time.perf_counter() - self.begin
+        return False
+
+
+class Profiler:
+    """
+    Scoped timers and counters, summed per frame and kept for the last ``window`` frames.
+
+    Times are recorded in seconds and reported in milliseconds. A scope
+    must not be re-entered while it is open (it is not recursive).
+    """
+
+    def __init__(self, enabled: bool = False, window: int = 600) -> None:
+        self.enabled = enabled
+        self.window = window
+        self.frames = 0
+        self._metrics = {}  # name -> _Metric
+        self._scopes = {}  # name -> _Scope
+
+    def _metric(self, name: str, kind: str) -> _Metric:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = _Metric(kind, self.window)
+        return metric
+
+    def scope(self, name: str):
+        """A context manager adding the time spent inside it to ``name``."""
+        if not self.enabled:
+            return _NULL_SCOPE
+        scope = self._scopes.get(name)
+        if scope is None:
+            scope = self._scopes[name] = _Scope(self._metric(name, "time"))
+        return scope
+
+    def count(self, name: str, amount: float = 1) -> None:
+        if not self.enabled:
+            return
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metric(name, "count")
+        metric.total += amount
+
+    def end_frame(self) -> None:
+        """Files this frame's totals in to the ring buffers and starts the next frame."""
+        if not self.enabled:
+            return
+        slot = self.frames % self.window
+        for metric in self._metrics.values():
+            metric.samples[slot] = metric.total
+            metric.total = 0.0
+        self.frames += 1
+
+    def reset(self) -> None:
+        self.frames = 0
+        self._metrics.clear()
+        self._scopes.clear()
+
+    def samples(self, name: str) -> np.ndarray:
+        """The recorded per frame totals of ``name``, oldest first (milliseconds for scopes)."""
+        metric = self._metrics[name]
+        filled = min(self.frames, self.window)
+        start = self.frames % self.window if self.frames > self.window else 0
+        values = np.roll(metric.samples, -start)[:filled]
+        return values * 1000 if metric.kind == "time" else values
+
+    def summary(self) -> dict:
+        """ Percentiles of every metric over the recorded frames
+
+        Returns:
+            name -> {"kind", "mean", "p50", "p95", "p99", "max"}, with
+            scopes in milliseconds per frame and counters per frame
+        """
+        result = {}
+        for name, metric in sorted(self._metrics.items()):
+            values = self.samples(name)
+            if not len(values):
+                continue
+            p50, p95, p99 = np.percentile(values, (50, 95, 99))
+            result[name] = {"kind": metric.kind, "mean": float(values.mean()), "p50": float(p50),
+                            "p95": float(p95), "p99": float(p99), "max": float(values.max())}
+        return result
+
+    def export_json(self, path: str) -> None:
+        """Writes the summary and every recorded frame's totals as JSON."""
+        with open(path, "w") as file:
+            json.dump({"frames": self.frames, "window": self.window, "summary": self.summary(),
+                       "samples": {name: self.samples(name).tolist() for name in sorted(self._metrics)}},
+                      file, indent=1)
+
+    def export_csv(self, path: str) -> None:
+        """Writes one row per recorded frame with a column per metric."""
+        names = sorted(self._metrics)
+        columns = [self.samples(name) for name in names]
+        first = self.frames - min(self.frames, self.window)
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame"] + names)
+            for row in range(min(self.frames, self.window)):
+                writer.writerow([first + row] + [f"{column[row]:.6g}" for column in columns])
+
+
+# the game's shared profiler, off until something turns it on
+profiler = Profiler()
@@ -0,0 +1,148 @@
+import json
+import posixpath
+import time
+from collections import OrderedDict
+
+
+class ResourceManager:
+    """
+    Loads every texture and shader once and hands out shared references.
+
+    Textures are reference counted: `texture` hands out the shared
+    texture for a file and `release` gives it back. A texture nobody
+    holds any more is not dropped straight away but parked in an LRU of
+    idle textures, so the next level asking for the same file gets it
+    back for free; only once the idle textures add up to more than
+    ``max_idle_bytes`` are the least recently used ones dropped.
+    Textures and shaders named in a manifest are loaded up front and
+    pinned for the life of the manager.
+
+    Paths are normalised before they are used as keys, so
+    ``/data/textures/Coin.png``, ``./data/textures/Coin.png`` and
+    ``data/textures/Coin.png`` all share one texture.
+
+    The byte counts assume 4 bytes (RGBA) per texel; they are meant for
+    comparing loads, not for budgeting video memory exactly.
+    """
+
+    def __init__(self, renderer, max_idle_bytes: int = 64 * 1024 * 1024) -> None:
+        """
+        Args:
+            renderer (pyasge.Renderer): Loads the textures and shaders
+            max_idle_bytes: How much unused texture data to keep loaded
+        """
+        self.renderer = renderer
+        self.max_idle_bytes = max_idle_bytes
+        self._textures = {}  # key -> texture
+        self._sizes = {}  # key -> bytes
+        self._refs = {}  # key -> references handed out and not yet released
+        self._pinned = set()
+        self._idle = OrderedDict()  # key -> None, least recently released first
+        self._idle_bytes = 0
+        self._shaders = {}  # key -> shader
+        self.reset_stats()
+
+    @staticmethod
+    def key(path: str) -> str:
+        return posixpath.normpath(path.replace("\\", "/")).lstrip("/")
+
+    def reset_stats(self) -> None:
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+        self.bytes_loaded = 0
+        self.load_seconds = 0.0
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def __contains__(self, path: str) -> bool:
+        key = self.key(path)
+        return key in self._textures or key in self._shaders
+
+    def texture(self, path: str):
+        """ The shared texture for an image file, loading it on first use
+
+        Every call takes a reference that should be handed back with
+        `release` once the texture is no longer drawn.
+        """
+        key = self.key(path)
+        texture = self._textures.get(key)
+        if texture is None:
+            texture = self._load(key, self.renderer.loadTexture, path)
+            self._textures[key] = texture
+            self._sizes[key] = texture.width * texture.height * 4
+            self.bytes_loaded += self._sizes[key]
+        else:
+            self.hits += 1
+            if key in self._idle:
+                del self._idle[key]
+                self._idle_bytes -= self._sizes[key]
+
+        self._refs[key] = self._refs.get(key, 0) + 1
+        return texture
+
+    def release(self, path: str) -> None:
+        """Hands back a reference taken by `texture`."""
+        key = self.key(path)
+        refs = self._refs.get(key, 0) - 1
+        if refs < 0:
+            raise KeyError(f"{path} was released more often than it was taken")
+
+        self._refs[key] = refs
+        if refs == 0 and key not in self._pinned:
+            self._idle[key] = None
+            self._idle_bytes += self._sizes[key]
+            self._evict()
+
+    def shader(self, path: str):
+        """The shared pixel shader for a fragment shader file, loading it on first use."""
+        key = self.key(path)
+        shader = self._shaders.get(key)
+        if shader is None:
+            shader = self._shaders[key] = self._load(key, self.renderer.loadPixelShader, path)
+        else:
+            self.hits += 1
+        return shader
+
+    def preload(self, manifest_file: str) -> None:
+        """ Loads and pins everything listed in a JSON manifest
+
+        The manifest holds a ``textures`` and a ``shaders`` list of
+        paths; either may be left out.
+        """
+        with open(manifest_file) as file:
+            manifest = json.load(file)
+
+        for path in manifest.get("textures", []):
+            self.texture(path)
+            self._pinned.add(self.key(path))
+        for path in manifest.get("shaders", []):
+            self.shader(path)
+
+    def summary(self) -> str:
+        requests = self.loads + self.hits
+        hit_rate = 100 * self.hits / requests if requests else 0
+        return (f"{requests} requests, {self.loads} loads ({self.bytes_loaded / 1024 / 1024:.1f} MiB "
+                f"in {self.load_seconds * 1000:.0f} ms), {self.hits} hits ({hit_rate:.0f}% hit rate), "
+                f"{self.evictions} evictions, {len(self._textures)} textures "
+                f"({self.resident_bytes / 1024 / 1024:.1f} MiB) resident")
+
+    def _load(self, key: str, loader, path: str):
+        begin = time.perf_counter()
+        # the renderer resolves paths itself, so load from the original
+        resource = loader(path)
+        self.load_seconds += time.perf_counter() - begin
+        if resource is None:
+            raise FileNotFoundError(path)
+        self.loads += 1
+        return resource
+
+    def _evict(self) -> None:
+        while self._idle_bytes > self.max_idle_bytes:
+            key, _ = self._idle.popitem(last=False)
+            self._idle_bytes -= self._sizes.pop(key)
+            del self._textures[key]
+            del self._refs[key]
+            self.evictions += 1
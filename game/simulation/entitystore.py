@@ -0,0 +1,80 @@
+import numpy as np
+
+
+class EntityStore:
+    """
+    Structure-of-arrays storage for many entities of one kind.
+
+    Every component (position, speed tick, frozen flag, ...) is its own
+    NumPy array and an entity is just an index in to all of them, so
+    per-tick logic can update every entity with one array operation
+    instead of a Python loop over objects. Components are read and
+    written as attributes, e.g. ``store.x[i]`` or
+    ``store.speed_tick[moving] += 1``; the arrays returned are views of
+    the live entities only.
+
+    The views are rebuilt whenever the entity count changes, so reading
+    a component is a plain attribute lookup. Storage grows by doubling
+    as entities are added. Entities are never
+    removed one at a time (a level's entities live until the level is
+    cleared), so indices stay valid and can be kept elsewhere, e.g. in
+    a `SpatialHash`.
+
+    A ``changed`` flag is kept for every entity; `mark_changed` sets it
+    and the view clears it once the entity's sprite has been updated.
+    """
+
+    def __init__(self, **components) -> None:
+        """
+        Args:
+            components: name=(dtype, default) for every component
+        """
+        self._components = dict(components, changed=(bool, False))
+        self._capacity = 16
+        self._count = 0
+        self._arrays = {name: np.full(self._capacity, default, dtype=dtype)
+                        for name, (dtype, default) in self._components.items()}
+        self._refresh_views()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _refresh_views(self) -> None:
+        for name, array in self._arrays.items():
+            setattr(self, name, array[:self._count])
+
+    def add(self, **values) -> int:
+        """ Adds an entity, leaving unnamed components at their default
+
+        Returns:
+            The new entity's index
+        """
+        if self._count == self._capacity:
+            self._grow(self._capacity * 2)
+
+        index = self._count
+        self._count += 1
+        for name, (dtype, default) in self._components.items():
+            self._arrays[name][index] = values.pop(name, default)
+        if values:
+            raise KeyError(f"unknown components: {', '.join(values)}")
+        self._arrays["changed"][index] = True
+        self._refresh_views()
+        return index
+
+    def _grow(self, capacity: int) -> None:
+        for name, (dtype, default) in self._components.items():
+            grown = np.full(capacity, default, dtype=dtype)
+            grown[:self._count] = self._arrays[name][:self._count]
+            self._arrays[name] = grown
+        self._capacity = capacity
+
+    def clear(self) -> None:
+        """Removes every entity, keeping the allocated storage."""
+        for name, (dtype, default) in self._components.items():
+            self._arrays[name][:self._count] = default
+        self._count = 0
+        self._refresh_views()
+
+    def mark_changed(self, indices) -> None:
+        self._arrays["changed"][indices] = True
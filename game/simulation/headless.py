@@ -0,0 +1,138 @@
+"""
+Runs the game without a window, for soak tests and profiling.
+
+The `World` is loaded straight from a TMX map (no textures, no
+renderer) and ticked as fast as possible. The player is driven by a
+scripted list of clicks or by clicking a random reachable tile every
+so often. Finished levels move on to the next one and a lost game
+starts again from level 1, just as pressing space does in the game.
+
+With ``--profile`` every tick is a profiler frame, and the per tick
+percentiles are printed and saved as JSON (or CSV, for a .csv path).
+
+Run from the repository root::
+
+    python -m game.simulation.headless --ticks 100000 --seed 1
+    python -m game.simulation.headless --ticks 20000 --seed 1 --profile profile.json
+"""
+import argparse
+import random
+import time
+
+from game.gameobjects.costgrid import CostGrid
+from game.gameobjects.mapcache import load_map
+from game.profiler import profiler
+from game.simulation.world import Outcome, World
+
+
+def load_world(tmx_file: str, seed=None, path_workers: int = 0, cooperative: bool = True) -> World:
+    """Builds a world from a TMX map, through the map cache, without loading any of its images."""
+    compiled = load_map(tmx_file)
+    tile_size = [int(compiled.tilewidth * 2), int(compiled.tileheight * 2)]
+    try:
+        return World(CostGrid(compiled.costs, compiled.components), tile_size, seed=seed, path_workers=path_workers,
+                     cooperative=cooperative)
+    except ValueError as error:
+        raise ValueError(f"{tmx_file}: {error}") from error
+
+
+class RandomClicks:
+    """Clicks a random tile the player can reach every ``interval`` ticks."""
+
+    def __init__(self, interval: int = 120, seed=None) -> None:
+        self.interval = interval
+        self.random = random.Random(seed)
+
+    def __call__(self, world: World) -> None:
+        if world.ticks % self.interval:
+            return
+        cells = world.grid.reachable_cells(*world.tile(world.player.x, world.player.y))
+        if len(cells):
+            world.move_player_to(tuple(cells[self.random.randrange(len(cells))].tolist()))
+
+
+class ScriptedClicks:
+    """Replays clicks given as (tick, (x, y) tile) pairs."""
+
+    def __init__(self, clicks) -> None:
+        self.clicks = dict(clicks)
+
+    def __call__(self, world: World) -> None:
+        tile = self.clicks.get(world.ticks)
+        if tile is not None:
+            world.move_player_to(tile)
+
+
+def run(world: World, ticks: int, controller=None) -> dict:
+    """ Ticks the world, handling level changes, and reports what happened
+
+    Args:
+        world: The world to run
+        ticks: How many ticks to run for
+        controller: Called with the world before every tick, to feed it input
+
+    Returns:
+        A dict of counters and timings for the run
+    """
+    stats = {"ticks": 0, "levels_won": 0, "games_lost": 0, "coins": 0}
+    begin = time.perf_counter()
+    for _ in range(ticks):
+        if controller is not None:
+            controller(world)
+        world.tick()
+        profiler.end_frame()
+        stats["ticks"] += 1
+
+        outcome = world.outcome
+        if outcome == Outcome.WON:
+            stats["levels_won"] += 1
+            stats["coins"] += len(world.coins)
+            world.next_level()
+        elif outcome == Outcome.LOST:
+            stats["games_lost"] += 1
+            stats["coins"] += int(world.coins.collected.sum())
+            world.restart()
+
+    stats["seconds"] = time.perf_counter() - begin
+    stats["ticks_per_second"] = stats["ticks"] / stats["seconds"] if stats["seconds"] else 0.0
+    stats["level"] = world.level
+    stats["score"] = world.score
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--map", default="./data/map/Maze.tmx")
+    parser.add_argument("--ticks", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--click-interval", type=int, default=120,
+                        help="ticks between random clicks")
+    parser.add_argument("--profile", metavar="PATH", default=None,
+                        help="profile every tick and save the results here")
+    parser.add_argument("--no-cooperation", action="store_true",
+                        help="let enemies walk their routes without fitting them around each other")
+    args = parser.parse_args()
+
+    world = load_world(args.map, seed=args.seed, cooperative=not args.no_cooperation)
+    if args.profile:
+        profiler.window = max(args.ticks, 1)
+        profiler.reset()
+        profiler.enabled = True
+    stats = run(world, args.ticks, RandomClicks(args.click_interval, seed=args.seed))
+    world.pathing.close()
+    for name, value in stats.items():
+        print(f"{name:>16}: {value:.1f}" if isinstance(value, float) else f"{name:>16}: {value}")
+
+    if args.profile:
+        profiler.enabled = False
+        print("per tick (ms for scopes)      p50       p95       p99       max")
+        for name, metric in profiler.summary().items():
+            print(f"{name:>22}: {metric['p50']:9.3f} {metric['p95']:9.3f} {metric['p99']:9.3f} {metric['max']:9.3f}")
+        if args.profile.endswith(".csv"):
+            profiler.export_csv(args.profile)
+        else:
+            profiler.export_json(args.profile)
+
+
+if __name__ == "__main__":
+    main()
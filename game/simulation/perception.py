@@ -0,0 +1,64 @@
+import numpy as np
+
+
+class Perception:
+    """
+    Decides which enemies notice the player, for all enemies at once.
+
+    Every tick the distances from all enemies to the player are worked
+    out in one NumPy pass and compared against each enemy's detection
+    range. With ``line_of_sight`` on, enemies in range must also be able
+    to see the player's tile across the cost grid, so they can't notice
+    the player through a wall; only the enemies already in range are
+    traced. Separately, every enemy has a small chance each tick of
+    changing its mind anyway, rolled from the given NumPy generator so
+    seeded worlds stay repeatable.
+    """
+
+    # chance per tick of an enemy changing state on its own, as the old
+    # randint(0, 100) > 98 roll
+    WHIM_CHANCE = 2 / 101
+
+    def __init__(self, grid, tile_size, rng: np.random.Generator, line_of_sight: bool = True) -> None:
+        """
+        Args:
+            grid (CostGrid): The map, for line of sight
+            tile_size (Tuple[int,int]): The size of a tile in world units
+            rng: The generator for the random state changes
+            line_of_sight: Whether walls block detection
+        """
+        self.grid = grid
+        self.tile_size = tile_size
+        self.rng = rng
+        self.line_of_sight = line_of_sight
+
+    def detect(self, xs: np.ndarray, ys: np.ndarray, detection_range: np.ndarray,
+               player_x: float, player_y: float, candidates: np.ndarray = None) -> np.ndarray:
+        """ Which enemies can detect the player this tick
+
+        Args:
+            xs: The enemies' x positions in world units
+            ys: The enemies' y positions in world units
+            detection_range: Each enemy's detection range, in tiles
+            player_x: The player's x position in world units
+            player_y: The player's y position in world units
+            candidates: Optionally, a mask of the enemies to check at all
+
+        Returns:
+            A boolean array, True for every enemy that detects the player
+        """
+        distance = np.hypot(xs - player_x, ys - player_y)
+        seen = distance <= detection_range * self.tile_size[0]
+        if candidates is not None:
+            seen &= candidates
+
+        if self.line_of_sight and seen.any():
+            looking = np.flatnonzero(seen)
+            starts = np.column_stack((xs[looking] // self.tile_size[0], ys[looking] // self.tile_size[1]))
+            goal = (int(player_x // self.tile_size[0]), int(player_y // self.tile_size[1]))
+            seen[looking] = self.grid.line_of_sight_many(starts, goal)
+        return seen
+
+    def whims(self, count: int) -> np.ndarray:
+        """A boolean array marking which of count enemies change state on their own this tick."""
+        return self.rng.random(count) < self.WHIM_CHANCE
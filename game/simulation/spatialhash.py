@@ -0,0 +1,119 @@
+import math
+
+import numpy as np
+
+
+class SpatialHash:
+    """
+    A uniform grid of buckets for finding the entities near a box.
+
+    Entities are filed by a key (anything hashable, such as their index
+    in an `EntityStore`) under the cell holding their top left corner,
+    which for this game is always a tile as everything moves tile to
+    tile. A query for a box only has to look at the cells that box
+    covers, widened up and to the left by the largest entity size so
+    that entities whose corner lies outside the box but whose body
+    reaches in to it are still found. Candidates still need an exact
+    overlap test; the hash only rules out the far away ones.
+
+    Buckets are insertion ordered dicts, so queries return entities in
+    a repeatable order and removal is O(1).
+    """
+
+    def __init__(self, cell_size, max_size) -> None:
+        """
+        Args:
+            cell_size (Tuple[float,float]): The width and height of a cell
+            max_size (Tuple[float,float]): The largest entity width and height
+        """
+        self.cell_width, self.cell_height = cell_size
+        self.reach_x = math.ceil(max_size[0] / self.cell_width)
+        self.reach_y = math.ceil(max_size[1] / self.cell_height)
+        self._buckets = {}  # cell -> {key: None}
+        self._cells = {}  # key -> cell
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def __contains__(self, key) -> bool:
+        return key in self._cells
+
+    def cell_of(self, x: float, y: float):
+        return int(x // self.cell_width), int(y // self.cell_height)
+
+    def insert(self, key, x: float, y: float) -> None:
+        cell = self.cell_of(x, y)
+        self._cells[key] = cell
+        self._buckets.setdefault(cell, {})[key] = None
+
+    def remove(self, key) -> None:
+        cell = self._cells.pop(key, None)
+        if cell is None:
+            return
+        bucket = self._buckets[cell]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[cell]
+
+    def move(self, key, x: float, y: float) -> None:
+        """Refiles an entity after it moved to (x, y), inserting it if needed."""
+        cell = self.cell_of(x, y)
+        if self._cells.get(key) == cell:
+            return
+        self.remove(key)
+        self.insert(key, x, y)
+
+    def move_many(self, keys, xs, ys) -> None:
+        """ Refiles many entities at once, see `move`
+
+        Args:
+            keys (Sequence): The entities that moved
+            xs (numpy.ndarray): Their new x positions
+            ys (numpy.ndarray): Their new y positions
+        """
+        cells_x = np.floor_divide(xs, self.cell_width).astype(int).tolist()
+        cells_y = np.floor_divide(ys, self.cell_height).astype(int).tolist()
+        cells, buckets = self._cells, self._buckets
+        for key, cell in zip(keys, zip(cells_x, cells_y)):
+            old = cells.get(key)
+            if old == cell:
+                continue
+            if old is not None:
+                bucket = buckets[old]
+                del bucket[key]
+                if not bucket:
+                    del buckets[old]
+            cells[key] = cell
+            buckets.setdefault(cell, {})[key] = None
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._cells.clear()
+
+    def query(self, x: float, y: float, width: float, height: float) -> list:
+        """ Entities that may overlap the box at (x, y) of the given size
+
+        Returns:
+            A list of candidate keys, safe to keep using while the hash
+            is modified
+        """
+        min_x, min_y = self.cell_of(x, y)
+        max_x, max_y = self.cell_of(x + width, y + height)
+        min_x -= self.reach_x
+        min_y -= self.reach_y
+        buckets = self._buckets
+        found = []
+        if len(buckets) < (max_x - min_x + 1) * (max_y - min_y + 1):
+            # a big box (such as the camera's view) over a sparse hash:
+            # cheaper to check every occupied cell than every covered one
+            for (cell_x, cell_y), bucket in buckets.items():
+                if min_x <= cell_x <= max_x and min_y <= cell_y <= max_y:
+                    found.extend(bucket)
+            return found
+
+        for cell_y in range(min_y, max_y + 1):
+            for cell_x in range(min_x, max_x + 1):
+                bucket = buckets.get((cell_x, cell_y))
+                if bucket:
+                    found.extend(bucket)
+        return found
@@ -0,0 +1,71 @@
+import heapq
+import itertools
+
+
+class Timer:
+    """A scheduled callback; cancel it to stop it from firing."""
+
+    __slots__ = ("due", "callback", "cancelled")
+
+    def __init__(self, due: float, callback) -> None:
+        self.due = due
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class TimerQueue:
+    """
+    Callbacks scheduled on a simulation clock, kept in a min-heap by due time.
+
+    The queue never reads the wall clock; its owner tells it the time
+    with `run_due`, so timers fire on the same tick however fast the
+    simulation is run, and a seeded run replays exactly. Each call only
+    looks at the top of the heap, so a tick with nothing due is O(1)
+    and each timer that fires costs O(log n). Timers due at the same
+    time fire in the order they were scheduled. Cancelled timers stay
+    in the heap and are skipped when they come up.
+    """
+
+    def __init__(self) -> None:
+        self._heap = []  # (due, order scheduled, timer)
+        self._order = itertools.count()
+        self.now = 0.0
+
+    def __len__(self) -> int:
+        return sum(not timer.cancelled for _, _, timer in self._heap)
+
+    def schedule(self, delay: float, callback) -> Timer:
+        """ Calls ``callback()`` once ``delay`` seconds of simulation time have passed
+
+        Returns:
+            The timer, which can be cancelled until it fires
+        """
+        timer = Timer(self.now + delay, callback)
+        heapq.heappush(self._heap, (timer.due, next(self._order), timer))
+        return timer
+
+    def run_due(self, now: float) -> int:
+        """ Moves the clock on to ``now`` and fires every timer due by then
+
+        Timers scheduled by the callbacks fire in the same call if they
+        are already due.
+
+        Returns:
+            How many timers fired
+        """
+        self.now = now
+        heap = self._heap
+        fired = 0
+        while heap and heap[0][0] <= now:
+            timer = heapq.heappop(heap)[2]
+            if not timer.cancelled:
+                timer.cancelled = True  # fired, so cancelling it now does nothing
+                timer.callback()
+                fired += 1
+        return fired
+
+    def clear(self) -> None:
+        self._heap.clear()
@@ -0,0 +1,563 @@
+import random
+from enum import Enum
+
+import numpy as np
+
+from game.Pathfinding.CompactPath import EMPTY_PATH, tile_positions
+from game.Pathfinding.Cooperative import CooperativePlanner
+from game.Pathfinding.DStarLite import DStarLite
+from game.Pathfinding.FlowField import FlowField
+from game.Pathfinding.TilePathing import TilePathing
+from game.profiler import profiler
+from game.simulation.entitystore import EntityStore
+from game.simulation.perception import Perception
+from game.simulation.spatialhash import SpatialHash
+from game.simulation.timers import TimerQueue
+
+
+class PowerUpType(Enum):
+    EXTRA_LIFE = 'extra_life'
+    SCORE_MULTIPLIER = 'score_multiplier'
+    FREEZE = 'freeze'
+
+
+# power-up types by the code stored in the power-up store's ``kind``
+POWERUP_TYPES = list(PowerUpType)
+
+
+class Outcome(Enum):
+    PLAYING = 0
+    WON = 1
+    LOST = 2
+
+
+# collision boxes in world units, matching width * scale of the sprites
+# GamePlay draws for each kind of entity
+PLAYER_SIZE = (86.7, 67.2)
+ENEMY_SIZE = (78.25, 51.75)
+COIN_SIZE = (51.2, 51.2)
+POWERUP_SIZES = {
+    PowerUpType.EXTRA_LIFE: (51.2, 51.2),
+    PowerUpType.SCORE_MULTIPLIER: (42.0, 44.0),
+    PowerUpType.FREEZE: (45.0, 45.0),
+}
+LARGEST_SIZE = tuple(max(sizes) for sizes in zip(ENEMY_SIZE, COIN_SIZE, *POWERUP_SIZES.values()))
+
+POWERUP_DURATION = 5
+# ticks an enemy takes to move one tile, which is also one slot of the
+# cooperative planner's reservation clock
+ENEMY_SPEED = 9
+
+
+class Player:
+    # where the player spawns, in world space
+    START = (100, 100)
+
+    def __init__(self):
+        self.x, self.y = self.START
+        self.size = PLAYER_SIZE
+        self.navigation_path = EMPTY_PATH  # world positions of the path's tiles
+        self.current_path_step = 0
+        self.path_request = None
+        self.movement_speed = 3
+        self.current_speed_tick = 0
+        self.lives = 3
+        self.score_multiplier_active = False
+
+
+def enemy_store() -> EntityStore:
+    return EntityStore(x=(np.float64, 0), y=(np.float64, 0),
+                       logic_state=(np.int8, 0), detection_range=(np.int32, 5),
+                       movement_speed=(np.int32, ENEMY_SPEED), speed_tick=(np.int32, 0),
+                       path_step=(np.int32, 0), path_length=(np.int32, 0),
+                       replan_at=(np.int32, 0), frozen=(bool, False))
+
+
+def coin_store() -> EntityStore:
+    return EntityStore(x=(np.float64, 0), y=(np.float64, 0), collected=(bool, False))
+
+
+def powerup_store() -> EntityStore:
+    return EntityStore(x=(np.float64, 0), y=(np.float64, 0), kind=(np.int8, 0), active=(bool, False))
+
+
+class World:
+    """
+    The game's rules and state, with no window, renderer or pyasge.
+
+    Everything `GamePlay` used to keep on sprites (positions, paths,
+    lives, score, power-ups and their timers) lives here. The world
+    advances one fixed step per `tick` and keeps its own clock, so it
+    plays out the same whether it is driven by the game at 60 FPS or by
+    a headless loop as fast as possible. Anything that has to happen
+    at a later game time (power-ups wearing off) is scheduled on the
+    world's `TimerQueue` rather than checked every tick. Randomness
+    comes from the world's own generators; give it a seed to make a
+    run repeatable.
+
+    Positions are in world units (pixels), the same space the sprites
+    are drawn in. Paths come from the pathing as compact, shared tile
+    arrays; when one is handed to an agent the world positions of all
+    of its tiles are worked out in one go, so a step is a lookup rather
+    than a multiply.
+
+    Enemies, coins and power-ups are kept in `EntityStore` arrays so the
+    per-tick bookkeeping (speed ticks, distances to the player,
+    who needs a path) is done for all of them at once; only the few
+    entities that actually step or ask for a path in a tick are handled
+    one by one. Enemies, uncollected coins and unused power-ups are also
+    filed by index in a `SpatialHash` per kind, so the player's
+    collision checks only look at the entities around it. Whether
+    enemies notice the player is decided by a `Perception` pass, which
+    with ``line_of_sight`` on doesn't let them see through walls.
+
+    With ``cooperative`` on, wandering enemies don't walk their routes
+    blind: each route is first fitted around the other enemies' by a
+    `CooperativePlanner`, a window at a time, so enemies wait or step
+    aside instead of piling on to the same tiles.
+    """
+
+    # seconds of game time per tick
+    TIMESTEP = 1 / 60
+
+    def __init__(self, grid, tile_size, seed=None, path_workers: int = 0, pathing: TilePathing = None,
+                 line_of_sight: bool = True, cooperative: bool = True) -> None:
+        self.grid = grid
+        self.tile_size = tile_size
+        self.random = random.Random(seed)
+        self.np_random = np.random.default_rng(seed)
+        self.perception = Perception(grid, tile_size, self.np_random, line_of_sight)
+        self.pathing = pathing if pathing is not None else TilePathing(grid, path_workers=path_workers)
+        self.clock = 0.0
+        self.ticks = 0
+        self.timers = TimerQueue()  # power-up expiries and anything else due at a game time
+        self.multiplier_timer = None
+        self.freeze_timer = None
+        self.level = 1
+        self.score = 0
+        self.player = Player()
+        self.enemies = enemy_store()
+        self.enemy_paths = []  # per enemy, the world positions of the path it is walking
+        self.enemy_requests = []  # per enemy, its outstanding PathRequest or None
+        self.enemy_planners = {}  # enemy -> the DStarLiteSearch repairing its route since a cost change
+        self.enemy_routes = []  # per enemy, the compact tile path it is walking or waiting to have fitted
+        self.cooperative = cooperative
+        self.cooperation = CooperativePlanner(grid)
+        self.coins = coin_store()
+        self.powerups = powerup_store()
+        self.enemy_index = SpatialHash(tile_size, LARGEST_SIZE)
+        self.coin_index = SpatialHash(tile_size, LARGEST_SIZE)
+        self.powerup_index = SpatialHash(tile_size, LARGEST_SIZE)
+        self.flow_field = FlowField(grid)
+        self.setup_level()
+
+    # -- coordinates -----------------------------------------------------
+
+    def tile(self, x: float, y: float):
+        """The tile holding world position (x, y)."""
+        return int(x / self.tile_size[0]), int(y / self.tile_size[1])
+
+    def move_enemy(self, index: int, tile) -> None:
+        x = tile[0] * self.tile_size[0]
+        y = tile[1] * self.tile_size[1]
+        self.enemies.x[index] = x
+        self.enemies.y[index] = y
+        self.enemies.changed[index] = True
+        self.enemy_index.move(index, x, y)
+
+    def random_passable_tiles(self, count):
+        """ Picks count random tiles (with replacement) that the player can walk to from the start
+
+        Raises:
+            ValueError: If no passable tile can be reached from the start
+        """
+        start = self.tile(*Player.START)
+        cells = self.grid.reachable_cells(*start)
+        if not len(cells):
+            raise ValueError(f"no passable tile can be reached from the player's start tile {start}")
+        return [tuple(cells[self.random.randrange(len(cells))].tolist()) for _ in range(count)]
+
+    # -- levels ------------------------------------------------------------
+
+    def setup_level(self) -> None:
+        self.pathing.invalidate()
+        self.pathing.cache.reset_stats()
+        self.pathing.get_search()  # build the search tables while the level loads
+        self.flow_field = FlowField(self.grid)
+        self.replanner = DStarLite(self.grid)
+        self.grid_version = self.grid.version
+
+        if self.freeze_timer is not None:
+            self.freeze_timer.cancel()  # the frozen enemies are gone
+            self.freeze_timer = None
+        self.enemies.clear()
+        self.enemy_paths.clear()
+        self.enemy_requests.clear()
+        self.enemy_planners.clear()
+        self.enemy_routes.clear()
+        self.cooperation.clear()
+        self.coins.clear()
+        self.enemy_index.clear()
+        self.coin_index.clear()
+        self.powerup_index.clear()
+        self.init_powerups(5)
+        self.player.lives = 3
+
+        self.init_enemies(1 + self.level)
+        self.init_coins(10 + 10 * self.level)
+
+        self.reset_player()
+
+    def next_level(self) -> None:
+        self.level += 1
+        self.setup_level()
+
+    def restart(self) -> None:
+        self.level = 1
+        self.score = 0
+        self.player.lives = 3
+        self.setup_level()
+
+    def init_powerups(self, count=3):
+        self.powerups.clear()
+        for tile_x, tile_y in self.random_passable_tiles(count):
+            kind = POWERUP_TYPES.index(self.random.choice(POWERUP_TYPES))
+            x, y = tile_x * self.tile_size[0], tile_y * self.tile_size[1]
+            self.powerup_index.insert(self.powerups.add(x=x, y=y, kind=kind), x, y)
+
+    def init_enemies(self, count=3):
+        # only spawn where the enemy can reach the player
+        for tile in self.random_passable_tiles(count):
+            self.enemy_paths.append(EMPTY_PATH)
+            self.enemy_routes.append(EMPTY_PATH)
+            self.enemy_requests.append(None)
+            self.move_enemy(self.enemies.add(), tile)
+
+    def init_coins(self, count=20):
+        for tile_x, tile_y in self.random_passable_tiles(count):
+            x, y = tile_x * self.tile_size[0], tile_y * self.tile_size[1]
+            self.coin_index.insert(self.coins.add(x=x, y=y), x, y)
+
+    def reset_player(self):
+        self.player.x, self.player.y = Player.START
+        self.player.navigation_path = EMPTY_PATH
+        self.player.current_path_step = 0
+        self.player.current_speed_tick = 0
+        if self.player.path_request is not None:
+            self.player.path_request.cancel()
+            self.player.path_request = None
+
+    @property
+    def outcome(self) -> Outcome:
+        if not len(self.coin_index):
+            return Outcome.WON
+        if self.player.lives <= 0:
+            return Outcome.LOST
+        return Outcome.PLAYING
+
+    # -- input -------------------------------------------------------------
+
+    def move_player_to(self, target_tile) -> None:
+        """ Sends the player walking towards a tile
+
+        The player stops and waits for the route, which may take a few
+        ticks to be found.
+        """
+        if self.player.path_request is not None:
+            self.player.path_request.cancel()
+        self.player.navigation_path = EMPTY_PATH
+        self.player.current_path_step = 0
+        self.player.path_request = self.pathing.request_tiles(
+            self.tile(self.player.x, self.player.y), tuple(target_tile), self.assign_player_path)
+
+    def assign_player_path(self, path) -> None:
+        self.player.navigation_path = tile_positions(path, self.tile_size)
+        self.player.current_path_step = 0
+
+    def assign_enemy_path(self, index: int, path) -> None:
+        self.enemy_routes[index] = path
+        self.enemy_paths[index] = tile_positions(path, self.tile_size)
+        self.enemies.path_length[index] = len(path)
+        self.enemies.path_step[index] = 0
+        self.enemies.replan_at[index] = 0
+
+    def route_enemy(self, index: int, path) -> None:
+        """Hands an enemy a route it asked for, through the cooperative planner if there is one."""
+        if not self.cooperative or len(path) < 2:
+            self.assign_enemy_path(index, path)
+            return
+        self.enemy_routes[index] = path
+        self.cooperation.hold(index, tuple(path[0].tolist()), self.ticks // ENEMY_SPEED)
+        self.cooperation.submit(index)
+
+    def locate_enemy(self, index: int):
+        """The rest of an enemy's route, from the tile it is on, for the cooperative planner."""
+        route = self.enemy_routes[index]
+        if self.enemies.path_length[index] <= 0:
+            return route  # a new route, the enemy is still on its first tile
+        return route[max(int(self.enemies.path_step[index]) - 1, 0):]
+
+    def assign_cooperative_path(self, index: int, path, fitted: int) -> None:
+        self.assign_enemy_path(index, path)
+        # step on the reservation clock's slot boundaries, as the plan assumes
+        self.enemies.speed_tick[index] = self.ticks % ENEMY_SPEED
+        if len(path) - 1 > fitted:
+            # fit the next window once half of this one has been walked
+            self.enemies.replan_at[index] = max(fitted // 2, 1)
+
+    # -- cost changes ------------------------------------------------------
+
+    def route_crosses(self, positions, step: int, cells) -> bool:
+        """Whether the rest of a path of world positions, from step on, passes through any of cells."""
+        if step >= len(positions):
+            return False
+        tiles = (positions[step:] / self.tile_size).astype(np.int64)
+        return bool(np.isin(tiles[:, 1] * self.grid.width + tiles[:, 0], cells).any())
+
+    def apply_cost_changes(self) -> None:
+        """ Re-routes whoever is walking through tiles whose costs changed (see `GameMap.set_cost`)
+
+        The search tables are patched and the path cache emptied, which
+        also drops queued path requests, so anyone waiting on one asks
+        again. Routes through a tile that has been blocked are repaired
+        with a D* Lite search per enemy, kept while the enemy walks the
+        route so further changes only repair it again; routes that
+        avoid the changed tiles are left alone. Cooperative reservations
+        are dropped and every enemy's route fitted again as it walks on.
+        """
+        changed = self.grid.changed_cells(self.grid_version)
+        self.grid_version = self.grid.version
+        self.pathing.get_search()
+
+        if changed is None:
+            blocked = None  # the whole grid was refreshed, every route may be broken
+        else:
+            blocked = [y * self.grid.width + x for x, y in changed if not self.grid.passable[y, x]]
+
+        player = self.player
+        request = player.path_request
+        if request is not None and request.cancelled and not request.done:
+            self.move_player_to(request.goal)
+        elif blocked is None or self.route_crosses(player.navigation_path, player.current_path_step, blocked):
+            if len(player.navigation_path):
+                self.move_player_to(self.tile(*player.navigation_path[-1].tolist()))
+        if blocked == []:
+            return  # only opened tiles up, every route still works
+        # reservations and queued routes may run through the new walls
+        self.cooperation.clear()
+
+        enemies = self.enemies
+        walking = np.flatnonzero((enemies.path_length > 0) & (enemies.path_step < enemies.path_length))
+        for index, step in zip(walking.tolist(), enemies.path_step[walking].tolist()):
+            positions = self.enemy_paths[index]
+            if blocked is not None and not self.route_crosses(positions, step, blocked):
+                continue
+            tile = self.tile(enemies.x[index], enemies.y[index])
+            goal = self.tile(*positions[-1].tolist())
+            planner = self.enemy_planners.get(index)
+            if planner is None or planner.goal != goal:
+                planner = self.enemy_planners[index] = self.replanner.begin(tile, goal)
+            else:
+                planner.move_to(tile)
+            self.assign_enemy_path(index, planner.path())
+
+        if self.cooperative:
+            # fit every route around the others again from its next step
+            walking = (enemies.path_length > 0) & (enemies.path_step < enemies.path_length)
+            enemies.replan_at[walking] = enemies.path_step[walking] + 1
+
+    # -- simulation --------------------------------------------------------
+
+    def tick(self) -> None:
+        """Advances the world by one fixed timestep."""
+        self.clock += self.TIMESTEP
+        self.ticks += 1
+        self.timers.run_due(self.clock)
+        if self.grid.version != self.grid_version:
+            with profiler.scope("world.replan"):
+                self.apply_cost_changes()
+        with profiler.scope("world.enemies"):
+            self.update_enemies()
+        with profiler.scope("world.pathing"):
+            self.pathing.advance()  # spend this tick's search budget on queued paths
+        if self.cooperative:
+            with profiler.scope("world.cooperation"):
+                # the first step of a new path is taken at the start of the next slot
+                spent = self.cooperation.advance(self.ticks // ENEMY_SPEED + 1, self.locate_enemy,
+                                                 self.assign_cooperative_path)
+            profiler.count("cooperation.expansions", spent)
+        with profiler.scope("world.player"):
+            self.update_player()
+
+    @staticmethod
+    def overlaps(x: float, y: float, size, other_x: float, other_y: float, other_size) -> bool:
+        return x < other_x + other_size[0] and x + size[0] > other_x \
+            and y < other_y + other_size[1] and y + size[1] > other_y
+
+    def update_player(self):
+        player = self.player
+        if len(player.navigation_path) > 0:
+            player.current_speed_tick += 1
+            if player.current_speed_tick >= player.movement_speed:
+                if player.current_path_step < len(player.navigation_path):
+                    player.x, player.y = player.navigation_path[player.current_path_step].tolist()
+                    player.current_path_step += 1
+                    player.current_speed_tick = 0
+
+                    enemies = self.enemies
+                    nearby = self.enemy_index.query(player.x, player.y, *player.size)
+                    profiler.count("collision.tests", len(nearby))
+                    for enemy in nearby:
+                        if self.overlaps(player.x, player.y, player.size,
+                                         enemies.x[enemy], enemies.y[enemy], ENEMY_SIZE) \
+                                and not enemies.frozen[enemy]:
+                            player.lives -= 1
+
+                            self.reset_player()
+                            if player.lives <= 0:
+                                return
+
+                    coins = self.coins
+                    nearby = self.coin_index.query(player.x, player.y, *player.size)
+                    profiler.count("collision.tests", len(nearby))
+                    for coin in nearby:
+                        if self.overlaps(player.x, player.y, player.size, coins.x[coin], coins.y[coin], COIN_SIZE):
+                            points = 1
+                            if player.score_multiplier_active:
+                                points *= 2
+                            self.score += points
+                            coins.collected[coin] = True
+                            coins.changed[coin] = True
+                            self.coin_index.remove(coin)
+
+                powerups = self.powerups
+                nearby = self.powerup_index.query(player.x, player.y, *player.size)
+                profiler.count("collision.tests", len(nearby))
+                for powerup in nearby:
+                    powerup_type = POWERUP_TYPES[powerups.kind[powerup]]
+                    if self.overlaps(player.x, player.y, player.size,
+                                     powerups.x[powerup], powerups.y[powerup], POWERUP_SIZES[powerup_type]):
+                        self.apply_powerup(powerup_type)
+                        powerups.active[powerup] = True
+                        powerups.changed[powerup] = True
+                        self.powerup_index.remove(powerup)
+
+    def apply_powerup(self, powerup_type: PowerUpType):
+        if powerup_type == PowerUpType.EXTRA_LIFE:
+            self.player.lives += 1
+
+        elif powerup_type == PowerUpType.SCORE_MULTIPLIER:
+            self.player.score_multiplier_active = True
+            if self.multiplier_timer is not None:
+                self.multiplier_timer.cancel()
+            self.multiplier_timer = self.timers.schedule(POWERUP_DURATION, self.end_score_multiplier)
+
+        elif powerup_type == PowerUpType.FREEZE:
+            self.enemies.frozen[:] = True
+            if self.freeze_timer is not None:
+                self.freeze_timer.cancel()
+            self.freeze_timer = self.timers.schedule(POWERUP_DURATION, self.thaw_enemies)
+
+    def end_score_multiplier(self) -> None:
+        self.player.score_multiplier_active = False
+        self.multiplier_timer = None
+
+    def thaw_enemies(self) -> None:
+        self.enemies.frozen[:] = False
+        self.freeze_timer = None
+
+    def update_enemies(self):
+        enemies = self.enemies
+        if not len(enemies):
+            return
+
+        awake = ~enemies.frozen
+        logic_state = enemies.logic_state
+        path_step = enemies.path_step
+        path_length = enemies.path_length
+        speed_tick = enemies.speed_tick
+
+        # enemies that notice the player chase it (state 1); the rest now
+        # and then lose interest and go back to wandering (state 0)
+        seen = self.perception.detect(enemies.x, enemies.y, enemies.detection_range,
+                                      self.player.x, self.player.y, awake)
+        logic_state[seen] = 1
+        logic_state[awake & ~seen & self.perception.whims(len(enemies))] = 0
+
+        path_done = (path_length <= 0) | (path_step >= path_length)
+        for index in np.flatnonzero(awake & (logic_state == 0) & path_done).tolist():
+            request = self.enemy_requests[index]
+            if request is not None and request.pending or self.cooperation.waiting(index):
+                continue
+            self.enemy_planners.pop(index, None)
+            start = self.tile(enemies.x[index], enemies.y[index])
+            # wander to a random tile the enemy can actually get to
+            targets = self.grid.reachable_cells(*start)
+            if len(targets):
+                target = tuple(targets[self.random.randrange(len(targets))].tolist())
+                self.enemy_requests[index] = self.pathing.request_tiles(
+                    start, target, lambda path, index=index: self.route_enemy(index, path))
+
+        # walked half of a fitted window, fit the next one
+        replan_at = enemies.replan_at
+        for index in np.flatnonzero(awake & (replan_at > 0) & (path_step >= replan_at)).tolist():
+            replan_at[index] = 0
+            self.cooperation.submit(index)
+
+        chasing = awake & (logic_state == 1) & path_done
+        for index in np.flatnonzero(chasing).tolist():
+            # a wandering route still on its way would start from a tile the chaser has left
+            request = self.enemy_requests[index]
+            if request is not None:
+                request.cancel()
+                self.enemy_requests[index] = None
+            if self.cooperation.waiting(index):
+                self.cooperation.release(index)
+                self.enemy_routes[index] = EMPTY_PATH
+            self.chase_player(index)
+
+        # path requests answered straight away above may have changed these
+        moving = awake & ~chasing & (path_length > 0)
+        speed_tick[moving] += 1
+        due = moving & (speed_tick >= enemies.movement_speed)
+        if not due.any():
+            return
+
+        stepping = np.flatnonzero(due & (path_step < path_length))
+        if len(stepping):
+            paths = self.enemy_paths
+            walking = [(paths[index], step) for index, step in zip(stepping.tolist(), path_step[stepping].tolist())]
+            # item() reads a position without making an array view per enemy
+            xs = np.array([positions.item(step, 0) for positions, step in walking])
+            ys = np.array([positions.item(step, 1) for positions, step in walking])
+            enemies.x[stepping] = xs
+            enemies.y[stepping] = ys
+            enemies.changed[stepping] = True
+            self.enemy_index.move_many(stepping.tolist(), xs, ys)
+        path_step[stepping] += 1
+        speed_tick[stepping] = 0
+
+        finished = due & (path_step >= path_length)
+        for index in np.flatnonzero(finished).tolist():
+            self.enemy_paths[index] = EMPTY_PATH
+            self.enemy_routes[index] = EMPTY_PATH
+            self.cooperation.release(index)
+        path_length[finished] = 0
+        path_step[finished] = 0
+
+    def chase_player(self, index: int):
+        """ Moves a chasing enemy one step down the shared flow field
+
+        All chasers share a single distance map to the player's tile,
+        which is only rebuilt when the player moves to a new tile.
+        """
+        enemies = self.enemies
+        enemies.speed_tick[index] += 1
+        if enemies.speed_tick[index] < enemies.movement_speed[index]:
+            return
+
+        enemies.speed_tick[index] = 0
+        self.flow_field.update(self.tile(self.player.x, self.player.y))
+        step = self.flow_field.next_step(*self.tile(enemies.x[index], enemies.y[index]))
+        if step is not None:
+            self.move_enemy(index, step)
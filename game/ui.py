@@ -0,0 +1,85 @@
+class BoundText:
+    """
+    A text object that is created once and only rewritten when its values change.
+
+    ``binding`` returns the values the text shows (a tuple, or None to
+    hide the text) and ``template`` formats them. Every frame `refresh`
+    calls the binding; the string is only formatted and handed to the
+    text object, and the layout only worked out again, when the values
+    differ from last frame's. Static text has no binding at all.
+    """
+
+    def __init__(self, template: str, x: float, y: float, binding=None, colour=None, layout=None) -> None:
+        """
+        Args:
+            template: The text, with ``{}`` fields for the bound values
+            x: Where to draw the text
+            y: Where to draw the text
+            binding: Returns the values to show, or None to hide the text
+            colour: The text's colour, if not the renderer's default
+            layout: Called with the text object after its string changes,
+                to position it (e.g. to centre it on its new width)
+        """
+        self.template = template
+        self.x = x
+        self.y = y
+        self.binding = binding
+        self.colour = colour
+        self.layout = layout
+        self.text = None
+        self.values = None
+        self.visible = True
+
+    def refresh(self, screen) -> None:
+        values = self.binding() if self.binding is not None else ()
+        if self.text is not None and values == self.values:
+            return
+
+        self.values = values
+        self.visible = values is not None
+        if not self.visible:
+            return
+
+        string = self.template.format(*values)
+        if self.text is None:
+            self.text = screen.make_text(string, self.x, self.y)
+            if self.colour is not None:
+                self.text.colour = self.colour
+        else:
+            self.text.string = string
+            screen.updates += 1
+        if self.layout is not None:
+            self.layout(self.text)
+
+
+class Screen:
+    """
+    A retained set of `BoundText` drawn together, such as a menu or the HUD.
+
+    Text objects are made by ``make_text(string, x, y)`` the first time
+    the screen is drawn, and then kept; a static screen costs one
+    binding check per text per frame and nothing else. ``created`` and
+    ``updates`` count the text objects made and the strings rewritten,
+    so per frame churn can be measured.
+    """
+
+    def __init__(self, make_text, *texts: BoundText) -> None:
+        """
+        Args:
+            make_text: Creates a text object, e.g. a `pyasge.Text`
+            texts: The screen's texts, drawn in order
+        """
+        self._make_text = make_text
+        self.texts = list(texts)
+        self.created = 0
+        self.updates = 0
+
+    def make_text(self, string: str, x: float, y: float):
+        self.created += 1
+        return self._make_text(string, x, y)
+
+    def render(self, renderer) -> None:
+        for text in self.texts:
+            text.refresh(self)
+            if text.visible:
+                renderer.render(text.text)
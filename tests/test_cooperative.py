@@ -0,0 +1,82 @@
+from game.Pathfinding.CompactPath import compact_path
+from game.Pathfinding.Cooperative import CooperativePlanner, ReservationTable, without_loops
+from game.gameobjects.costgrid import CostGrid
+
+
+def test_reservations_are_first_come_first_served():
+    table = ReservationTable()
+    table.reserve("a", [5, 6, 7], slot=10)
+    table.reserve("b", [9, 6, 6], slot=10)  # (6, 11) is already a's
+    assert len(table) == 5
+    assert table.owner(6, 11) == "a" and table.owner(6, 12) == "b"
+    assert table.blocked("b", 6, 11) and not table.blocked("a", 6, 11)
+    assert not table.blocked("b", 7, 10)
+
+
+def test_lookup_reads_the_live_table():
+    table = ReservationTable()
+    lookup = table.lookup
+    table.reserve("a", [3], slot=0)
+    assert lookup((3, 0)) == "a" and lookup((3, 1)) is None
+    table.release("a")
+    assert lookup((3, 0)) is None
+    assert not hasattr(lookup, "__setitem__")
+
+
+def test_release_only_drops_the_agents_own_keys():
+    table = ReservationTable()
+    table.reserve("a", [1, 2], slot=0)
+    table.reserve("b", [2, 2], slot=0)
+    table.release("b")
+    assert table.owner(2, 1) == "a" and table.owner(2, 0) is None
+    table.clear()
+    assert len(table) == 0
+
+
+def test_without_loops_cuts_out_detours():
+    assert without_loops([1, 2, 3, 2, 4, 5, 4, 6]) == [1, 2, 4, 6]
+    assert without_loops([1, 1, 2]) == [1, 2]
+
+
+def positions(path, fitted, slot):
+    tiles = [tuple(tile) for tile in path[:fitted + 1].tolist()]
+    return {slot + step: tile for step, tile in enumerate(tiles)}
+
+
+def test_head_on_agents_are_fitted_around_each_other():
+    # a corridor with a bay to step aside in
+    grid = CostGrid([
+        [1, 1, 1, 0, 1, 1, 1],
+        [0, 0, 0, 0, 0, 0, 0],
+    ])
+    planner = CooperativePlanner(grid, window=8)
+    east = compact_path([(x, 1) for x in range(7)])
+    west = compact_path([(x, 1) for x in reversed(range(7))])
+
+    first, first_fitted, expanded = planner.fit("east", east, slot=0)
+    assert expanded == 0 and first_fitted == 6 and planner.reused == 1
+    second, second_fitted, _ = planner.fit("west", west, slot=0)
+    assert planner.fitted + planner.partial == 1
+
+    a = positions(first, first_fitted, 0)
+    b = positions(second, second_fitted, 0)
+    for slot in set(a) & set(b):
+        assert a[slot] != b[slot]
+        if slot - 1 in a and slot - 1 in b:
+            assert (a[slot], b[slot]) != (b[slot - 1], a[slot - 1])
+    # every step is to a neighbour or a wait, and on open tiles
+    for (x, y), (nx, ny) in zip(second.tolist(), second.tolist()[1:]):
+        assert abs(x - nx) + abs(y - ny) <= 1 and grid.is_passable(nx, ny)
+
+
+def test_advance_keeps_to_the_budget_and_queue_order():
+    grid = CostGrid([[0] * 10])
+    planner = CooperativePlanner(grid)
+    routes = {agent: compact_path([(x, 0) for x in range(agent, agent + 3)]) for agent in range(3)}
+    assigned = []
+    for agent in routes:
+        planner.submit(agent)
+    planner.advance(0, routes.get, lambda agent, path, fitted: assigned.append(agent), budget=2)
+    assert assigned == [0, 1] and planner.waiting(2)
+    planner.advance(1, routes.get, lambda agent, path, fitted: assigned.append(agent))
+    assert assigned == [0, 1, 2] and not planner.waiting(2)
@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from benchmarks.common import random_grid
+from game.gameobjects.costgrid import CostGrid
+
+
+@pytest.mark.parametrize("x, y", [(-1, 0), (0, -1), (4, 0), (0, 3), (-4, -3)])
+def test_set_cost_rejects_tiles_off_the_grid(x, y):
+    grid = CostGrid(np.zeros((3, 4), dtype=np.int32))
+    version = grid.version
+    with pytest.raises(IndexError):
+        grid.set_cost(x, y, 1)
+    # nothing wrapped round to the far edge
+    assert not grid.costs.any()
+    assert grid.version == version
+
+
+def brute_force_neighbours(costs):
+    height, width = len(costs), len(costs[0])
+    masks = np.zeros((height, width), dtype=np.uint8)
+    for y in range(height):
+        for x in range(width):
+            for bit, dx, dy in CostGrid.DIRECTIONS:
+                if 0 <= x + dx < width and 0 <= y + dy < height and costs[y + dy][x + dx] == 0:
+                    masks[y, x] |= bit
+    return masks
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_neighbour_masks_match_brute_force(seed):
+    costs = random_grid(13, 9, density=0.35, seed=seed)
+    grid = CostGrid(costs)
+    assert grid.costs.shape == (9, 13) and grid.costs.dtype == np.int32
+    assert (grid.passable == (np.array(costs) == 0)).all()
+    assert (grid.neighbours == brute_force_neighbours(costs)).all()
+
+
+def test_batch_queries_match_single_tiles():
+    costs = random_grid(10, 10, density=0.4, seed=7)
+    grid = CostGrid(costs)
+    coords = [(x, y) for y in range(-1, 11) for x in range(-1, 11)]
+    assert grid.is_passable_many(coords).tolist() == [grid.is_passable(x, y) for x, y in coords]
+
+    inside = [(x, y) for x, y in coords if grid.in_bounds(x, y)]
+    neighbours, valid = grid.passable_neighbours(inside)
+    for (x, y), around, open_ in zip(inside, neighbours, valid):
+        assert [tuple(tile) for tile in around] == [(x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)]
+        assert open_.tolist() == [grid.is_passable(*tile) for tile in around]
+
+
+def test_passable_cells_are_row_major_and_read_only():
+    grid = CostGrid([[0, 1, 0], [1, 0, 0]])
+    cells = grid.passable_cells()
+    assert cells.tolist() == [[0, 0], [2, 0], [1, 1], [2, 1]]
+    assert not cells.flags.writeable
+
+
+def flood_fill_regions(costs):
+    height, width = len(costs), len(costs[0])
+    regions = {}
+    for y in range(height):
+        for x in range(width):
+            if costs[y][x] or (x, y) in regions:
+                continue
+            regions[(x, y)] = (x, y)
+            stack = [(x, y)]
+            while stack:
+                cx, cy = stack.pop()
+                for nx, ny in ((cx, cy - 1), (cx + 1, cy), (cx, cy + 1), (cx - 1, cy)):
+                    if 0 <= nx < width and 0 <= ny < height and not costs[ny][nx] and (nx, ny) not in regions:
+                        regions[(nx, ny)] = (x, y)
+                        stack.append((nx, ny))
+    return regions
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_components_match_flood_fill(seed):
+    costs = random_grid(25, 20, density=0.45, seed=seed)
+    grid = CostGrid(costs)
+    labels = grid.components()
+    regions = flood_fill_regions(costs)
+    # same region exactly when same label
+    pairs = {}
+    for (x, y), region in regions.items():
+        assert pairs.setdefault(int(labels[y, x]), region) == region
+    assert len(pairs) == len(set(regions.values()))
+    assert (labels[~grid.passable] == -1).all()
+
+
+def test_connected_and_reachable_cells():
+    grid = CostGrid([
+        [0, 0, 1, 0],
+        [0, 1, 1, 0],
+        [0, 0, 1, 0],
+    ])
+    assert grid.connected((0, 0), (1, 2))
+    assert not grid.connected((0, 0), (3, 0))
+    assert not grid.connected((0, 0), (9, 9))
+    assert grid.reachable_cells(3, 1).tolist() == [[3, 0], [3, 1], [3, 2]]
+    # an agent stuck in a wall can walk out to either side
+    assert not grid.connected((2, 1), (0, 0))
+    assert grid.connected((2, 0), (3, 2))
+    assert len(grid.reachable_cells(2, 0)) == 8
+
+
+def test_set_cost_patches_masks_and_regions_like_a_rebuild():
+    rng = np.random.default_rng(8)
+    grid = CostGrid(random_grid(16, 12, density=0.4, seed=8))
+    grid.components()
+    version = grid.version
+    edits = []
+    for _ in range(60):
+        x, y = int(rng.integers(16)), int(rng.integers(12))
+        grid.set_cost(x, y, 0 if grid.costs[y, x] else 10)
+        edits.append((x, y))
+
+        rebuilt = CostGrid(grid.costs.copy())
+        assert (grid.neighbours == rebuilt.neighbours).all()
+        assert (grid.passable == rebuilt.passable).all()
+        # same partition, whatever the labels are called
+        pairs = set(zip(grid.components().ravel().tolist(), rebuilt.components().ravel().tolist()))
+        assert len(pairs) == len({label for label, _ in pairs}) == len({label for _, label in pairs})
+
+    assert grid.changed_cells(version) == edits
+    assert grid.changed_cells(grid.version) == []
+    grid.refresh()
+    assert grid.changed_cells(version) is None
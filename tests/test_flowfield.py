@@ -0,0 +1,67 @@
+from collections import deque
+
+import numpy as np
+
+from game.Pathfinding.FlowField import FlowField
+from game.gameobjects.costgrid import CostGrid
+
+# 0 is open, anything else a wall; the right hand column is cut off
+COSTS = [
+    [0, 0, 0, 0, 1, 0],
+    [0, 1, 1, 0, 1, 0],
+    [0, 1, 0, 0, 1, 0],
+    [0, 0, 0, 1, 1, 0],
+]
+
+
+def bfs_distances(costs, goal):
+    distances = {goal: 0}
+    queue = deque([goal])
+    while queue:
+        x, y = queue.popleft()
+        for nx, ny in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+            if 0 <= ny < len(costs) and 0 <= nx < len(costs[0]) and costs[ny][nx] == 0 \
+                    and (nx, ny) not in distances:
+                distances[(nx, ny)] = distances[(x, y)] + 1
+                queue.append((nx, ny))
+    return distances
+
+
+def test_distances_match_breadth_first_search():
+    field = FlowField(CostGrid(COSTS))
+    field.update((0, 0))
+    expected = bfs_distances(COSTS, (0, 0))
+    for y, row in enumerate(COSTS):
+        for x, cost in enumerate(row):
+            if cost == 0:
+                assert field.distance_to_goal(x, y) == expected.get((x, y), -1)
+
+
+def test_following_the_field_walks_a_shortest_route():
+    field = FlowField(CostGrid(COSTS))
+    field.update((0, 0))
+    tile = (2, 2)
+    steps = 0
+    while tile != (0, 0):
+        following = field.next_step(*tile)
+        assert abs(following[0] - tile[0]) + abs(following[1] - tile[1]) == 1
+        tile = following
+        steps += 1
+    assert steps == bfs_distances(COSTS, (0, 0))[(2, 2)]
+    assert field.next_step(0, 0) is None
+
+
+def test_unreachable_tiles_have_no_step():
+    field = FlowField(CostGrid(COSTS))
+    field.update((0, 0))
+    assert field.distance_to_goal(5, 0) == -1
+    assert field.next_step(5, 0) is None
+    assert field.next_step(-1, 0) is None
+
+
+def test_rebuilds_only_when_the_goal_moves():
+    field = FlowField(CostGrid(np.zeros((4, 4), dtype=np.int32)))
+    assert field.update((1, 1))
+    assert not field.update((1, 1))
+    assert field.update((2, 1))
+    assert field.rebuilds == 2
@@ -0,0 +1,49 @@
+import sqlite3
+
+from game.leaderboard import Leaderboard
+
+
+def test_same_name_posts_separate_entries():
+    board = Leaderboard()
+    first = board.add("YOU", 10)
+    second = board.add("YOU", 12)
+    assert [(entry.name, entry.score) for entry in board.top()] == [("YOU", 12), ("YOU", 10)]
+    assert first.id != second.id
+    assert len(board) == 2
+
+
+def test_ranks_by_score_then_post_order():
+    board = Leaderboard()
+    board.add_many([("Bob", 15), ("Alice", 7)])
+    early = board.add("Zed", 15)
+    late = board.add("Amy", 15)
+    assert [entry.name for entry in board.top(3)] == ["Bob", "Zed", "Amy"]
+    assert board.rank(early.id) == 2
+    assert board.rank(late.id) == 3
+    assert board.rank(board.add("YOU", 3).id) == 5
+    assert board.rank(12345) is None
+
+
+def test_top_is_limited_and_empty_board():
+    board = Leaderboard()
+    assert board.is_empty and board.top() == []
+    board.add_many((f"player{index}", index) for index in range(10))
+    assert [entry.score for entry in board.top(3)] == [9, 8, 7]
+
+
+def test_reads_a_database_with_unique_names(tmp_path):
+    path = str(tmp_path / "old.db")
+    connection = sqlite3.connect(path)
+    connection.executescript("""
+        CREATE TABLE entries (name TEXT NOT NULL UNIQUE, base TEXT NOT NULL,
+                              number INTEGER NOT NULL, score INTEGER NOT NULL);
+        CREATE UNIQUE INDEX entries_by_base ON entries (base, number);
+        INSERT INTO entries VALUES ('YOU', 'YOU', 1, 5), ('YOU2', 'YOU', 2, 9), ('Eve', 'Eve', 1, 5);
+    """)
+    connection.close()
+
+    board = Leaderboard(path)
+    assert [(entry.name, entry.score) for entry in board.top()] == [("YOU2", 9), ("YOU", 5), ("Eve", 5)]
+    entry = board.add("YOU", 5)
+    assert board.rank(entry.id) == 4
+    board.close()
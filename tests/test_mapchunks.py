@@ -0,0 +1,58 @@
+from game.gameobjects.mapchunks import MapChunks
+
+
+class StubRenderer:
+    """Records which chunks were re-rendered and drawn."""
+
+    def __init__(self) -> None:
+        self.blitted = []
+        self.drawn = []
+
+    def blit(self, chunk) -> None:
+        self.blitted.append(chunk)
+
+    def draw(self, chunk) -> None:
+        self.drawn.append(chunk)
+
+
+def draw(chunks, view=None) -> StubRenderer:
+    renderer = StubRenderer()
+    chunks.draw(view, renderer.blit, renderer.draw)
+    return renderer
+
+
+def test_chunk_layout_rounds_up_at_the_edges():
+    chunks = MapChunks(40, 20, (32, 32), chunk_tiles=16)
+    assert (chunks.columns, chunks.rows, len(chunks)) == (3, 2, 6)
+    assert chunks.chunk_of(39, 19) == (2, 1)
+    assert chunks.tiles((2, 1)) == (32, 16, 40, 20)
+    assert chunks.bounds((2, 1)) == (1024, 512, 256, 128)
+
+
+def test_only_dirty_chunks_are_blitted_again():
+    chunks = MapChunks(40, 20, (32, 32), chunk_tiles=16)
+    first = draw(chunks)
+    assert first.blitted == first.drawn and len(first.drawn) == 6
+
+    assert draw(chunks).blitted == []
+    chunks.mark_dirty(20, 17)
+    chunks.mark_dirty(-1, 0)  # off the map, ignored
+    again = draw(chunks)
+    assert again.blitted == [(1, 1)] and len(again.drawn) == 6
+
+    chunks.mark_all_dirty()
+    assert len(draw(chunks).blitted) == 6
+    assert (chunks.blits, chunks.draws) == (13, 24)
+
+
+def test_chunks_out_of_view_are_culled_and_stay_dirty():
+    chunks = MapChunks(64, 64, (32, 32), chunk_tiles=16)  # 512 units a chunk
+    view = (600, 100, 1024, 500)  # ends exactly on the third column
+    shown = draw(chunks, view)
+    assert shown.drawn == chunks.visible(*view) == [(1, 0)]
+    assert shown.blitted == [(1, 0)]
+    assert chunks.culled == 15
+    assert chunks.dirty.sum() == 15
+
+    # a view off the map draws nothing
+    assert draw(chunks, (-900, -900, -10, -10)).drawn == []
@@ -0,0 +1,62 @@
+import numpy as np
+
+from game.Pathfinding.PathCache import PathCache
+
+ROUTE = [(0, 0), (1, 0), (2, 0), (2, 1), (2, 2)]
+
+
+def test_exact_hit_returns_the_stored_path():
+    cache = PathCache()
+    stored = cache.put((0, 0), (2, 2), ROUTE, nodes_expanded=9)
+    assert cache.get((0, 0), (2, 2)) is stored
+    assert stored.tolist() == [list(tile) for tile in ROUTE]
+    assert (cache.hits, cache.misses, cache.nodes_saved) == (1, 0, 9)
+
+
+def test_suffix_of_a_cached_route_is_reused():
+    cache = PathCache()
+    stored = cache.put((0, 0), (2, 2), ROUTE)
+    suffix = cache.get((2, 0), (2, 2))
+    assert suffix.tolist() == [[2, 0], [2, 1], [2, 2]]
+    assert np.shares_memory(suffix, stored)  # a view, not a copy
+    assert cache.suffix_hits == 1
+    # another goal along the way is not a suffix
+    assert cache.get((0, 0), (2, 0)) is None
+    assert cache.misses == 1
+
+
+def test_unreachable_results_are_cached_empty():
+    cache = PathCache()
+    cache.put((0, 0), (5, 5), [])
+    assert len(cache.get((0, 0), (5, 5))) == 0
+
+
+def test_least_recently_used_path_is_evicted_with_its_suffixes():
+    cache = PathCache(max_paths=2)
+    cache.put((0, 0), (2, 2), ROUTE)
+    cache.put((9, 9), (8, 8), [(9, 9), (8, 9), (8, 8)])
+    cache.get((0, 0), (2, 2))  # now the most recently used
+    cache.put((5, 5), (5, 7), [(5, 5), (5, 6), (5, 7)])
+
+    assert len(cache) == 2
+    assert cache.get((9, 9), (8, 8)) is None
+    assert cache.get((8, 9), (8, 8)) is None
+    assert cache.get((1, 0), (2, 2)) is not None
+    assert cache.get((5, 6), (5, 7)).tolist() == [[5, 6], [5, 7]]
+
+
+def test_replacing_a_path_drops_its_old_suffixes():
+    cache = PathCache()
+    cache.put((0, 0), (2, 2), ROUTE)
+    cache.put((0, 0), (2, 2), [(0, 0), (0, 1), (0, 2), (1, 2), (2, 2)])
+    assert cache.get((1, 0), (2, 2)) is None
+    assert cache.get((0, 2), (2, 2)).tolist() == [[0, 2], [1, 2], [2, 2]]
+
+
+def test_clear_keeps_the_counters():
+    cache = PathCache()
+    cache.put((0, 0), (2, 2), ROUTE)
+    cache.get((0, 0), (2, 2))
+    cache.clear()
+    assert len(cache) == 0 and cache.get((1, 0), (2, 2)) is None
+    assert (cache.hits, cache.misses) == (1, 1)
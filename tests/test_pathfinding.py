@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+from benchmarks.common import perfect_maze, random_grid
+from game.Pathfinding.DStarLite import DStarLite
+from game.Pathfinding.GridAStar import GridAStar
+from game.Pathfinding.HPAStar import HierarchicalPlanner
+from game.Pathfinding.JumpPointSearch import GridJPS
+from game.gameobjects.costgrid import CostGrid
+
+GRIDS = {
+    "random": lambda seed: random_grid(40, 30, density=0.3, seed=seed),
+    "maze": lambda seed: perfect_maze(41, 31, seed=seed),
+}
+
+
+def queries(grid, count, seed):
+    rng = random.Random(seed)
+    cells = [tuple(cell) for cell in grid.passable_cells().tolist()]
+    return [(rng.choice(cells), rng.choice(cells)) for _ in range(count)]
+
+
+def assert_walkable(grid, path, start, goal):
+    tiles = [tuple(tile) for tile in path.tolist()]
+    assert tiles[0] == start and tiles[-1] == goal
+    for (x, y), (nx, ny) in zip(tiles, tiles[1:]):
+        assert abs(x - nx) + abs(y - ny) == 1
+        assert grid.is_passable(nx, ny)
+
+
+@pytest.mark.parametrize("kind", GRIDS)
+@pytest.mark.parametrize("seed", range(3))
+def test_jps_matches_astar_lengths(kind, seed):
+    grid = CostGrid(GRIDS[kind](seed))
+    astar, jps = GridAStar(grid), GridJPS(grid)
+    for start, goal in queries(grid, 40, seed):
+        expected = astar.search(start, goal)
+        path = jps.search(start, goal)
+        assert len(path) == len(expected)
+        if len(path):
+            assert_walkable(grid, path, start, goal)
+
+
+@pytest.mark.parametrize("kind", GRIDS)
+@pytest.mark.parametrize("seed", range(3))
+def test_hpa_paths_are_walkable_and_near_optimal(kind, seed):
+    grid = CostGrid(GRIDS[kind](seed))
+    astar, hpa = GridAStar(grid), HierarchicalPlanner(grid, cluster_size=8)
+    for start, goal in queries(grid, 40, seed):
+        expected = astar.search(start, goal)
+        path = hpa.search(start, goal)
+        assert bool(len(path)) == bool(len(expected))
+        if len(path):
+            assert_walkable(grid, path, start, goal)
+            assert len(expected) <= len(path) <= 1.5 * len(expected) + 8
+
+
+def test_hpa_follows_edits_after_update_cells():
+    grid = CostGrid([[0] * 32 for _ in range(32)])
+    hpa = HierarchicalPlanner(grid, cluster_size=8)
+    for x in range(32):
+        grid.set_cost(x, 15, 1 if x else 0)  # a wall with a single gap
+    hpa.update_cells([(x, 15) for x in range(32)])
+    start, goal = (31, 0), (31, 31)
+    path = hpa.search(start, goal)
+    assert_walkable(grid, path, start, goal)
+    assert (0, 15) in map(tuple, path.tolist())
+
+
+@pytest.mark.parametrize("kind", GRIDS)
+@pytest.mark.parametrize("seed", range(3))
+def test_dstar_lite_replans_like_astar_after_set_cost(kind, seed):
+    grid = CostGrid(GRIDS[kind](seed))
+    rng = random.Random(seed)
+    replanner = DStarLite(grid)
+    repairs = 0
+    for start, goal in queries(grid, 5, seed):
+        search = replanner.begin(start, goal)
+        tile = start
+        for _ in range(8):
+            path = search.path()
+            assert len(path) == len(GridAStar(grid).search(tile, goal))
+            if not len(path):
+                break
+            assert_walkable(grid, path, tile, goal)
+
+            # walk part of the way, then open or close tiles next to the route
+            tile = tuple(path[min(3, len(path) - 1)].tolist())
+            search.move_to(tile)
+            for x, y in rng.sample(path.tolist(), min(3, len(path))):
+                x, y = x + rng.choice((-1, 0, 1)), y + rng.choice((-1, 0, 1))
+                if grid.in_bounds(x, y) and (x, y) not in (tile, goal):
+                    grid.set_cost(x, y, 0 if grid.costs[y, x] else 10)
+        repairs += search.repairs
+    # the routes were repaired in place rather than searched again
+    assert repairs
+
+
+def test_dstar_lite_waits_out_a_goal_walled_off():
+    grid = CostGrid([[0] * 8 for _ in range(8)])
+    search = DStarLite(grid).begin((0, 0), (7, 7))
+    assert len(search.path()) == 15
+    grid.set_cost(6, 7, 1)
+    grid.set_cost(7, 6, 1)
+    assert len(search.path()) == 0
+    grid.set_cost(7, 6, 0)
+    path = search.path()
+    assert len(path) == 15 and (7, 6) in map(tuple, path.tolist())
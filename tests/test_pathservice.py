@@ -0,0 +1,40 @@
+import numpy as np
+
+from benchmarks.common import perfect_maze
+from game.Pathfinding.GridAStar import GridAStar
+from game.Pathfinding.PathService import PathService
+from game.gameobjects.costgrid import CostGrid
+
+QUERIES = [((1, 1), (19, 19)), ((19, 1), (1, 19)), ((1, 1), (1, 1))]
+
+
+def test_inline_callbacks_wait_for_poll():
+    service = PathService(CostGrid(perfect_maze(21, 21, seed=1)))
+    finished = []
+    future = service.submit((1, 1), (19, 19), finished.append)
+    assert future.done() and not finished
+    assert service.poll() == 1
+    assert finished == [future] and service.pending == 0
+    service.close()
+
+
+def test_workers_match_inline_search_and_follow_publish():
+    grid = CostGrid(perfect_maze(21, 21, seed=1))
+    service = PathService(grid, workers=1)
+    try:
+        futures = [service.submit(start, goal) for start, goal in QUERIES]
+        expected = GridAStar(grid)
+        for (start, goal), future in zip(QUERIES, futures):
+            tiles, _ = future.result(timeout=60)
+            assert np.array_equal(tiles, expected.search(start, goal))
+
+        # wall off the goal; only searches submitted after publishing see it
+        grid.set_cost(19, 18, 1)
+        grid.set_cost(18, 19, 1)
+        service.publish(grid)
+        tiles, _ = service.submit((1, 1), (19, 19)).result(timeout=60)
+        assert len(tiles) == 0
+        service.poll()
+        assert service.pending == 0
+    finally:
+        service.close()
@@ -0,0 +1,50 @@
+import csv
+import json
+
+from game.profiler import Profiler
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    with profiler.scope("work"):
+        pass
+    profiler.count("things", 3)
+    profiler.end_frame()
+    assert profiler.frames == 0 and profiler.summary() == {}
+
+
+def test_counters_are_summed_per_frame_and_ring_buffered():
+    profiler = Profiler(enabled=True, window=4)
+    for frame in range(6):
+        for _ in range(frame):
+            profiler.count("things")
+        profiler.end_frame()
+    # only the last four frames are kept, oldest first
+    assert profiler.samples("things").tolist() == [2, 3, 4, 5]
+    stats = profiler.summary()["things"]
+    assert stats["kind"] == "count" and stats["max"] == 5 and stats["mean"] == 3.5
+
+
+def test_scopes_report_milliseconds():
+    profiler = Profiler(enabled=True)
+    with profiler.scope("work"):
+        sum(range(10000))
+    profiler.end_frame()
+    (time_ms,) = profiler.samples("work").tolist()
+    assert 0 < time_ms < 1000
+    assert profiler.summary()["work"]["kind"] == "time"
+
+
+def test_exports(tmp_path):
+    profiler = Profiler(enabled=True, window=2)
+    for frame in range(3):
+        profiler.count("things", frame)
+        profiler.end_frame()
+
+    profiler.export_json(tmp_path / "profile.json")
+    saved = json.loads((tmp_path / "profile.json").read_text())
+    assert saved["frames"] == 3 and saved["samples"]["things"] == [1, 2]
+
+    profiler.export_csv(tmp_path / "profile.csv")
+    with open(tmp_path / "profile.csv", newline="") as file:
+        assert list(csv.reader(file)) == [["frame", "things"], ["1", "1"], ["2", "2"]]
@@ -0,0 +1,47 @@
+import random
+
+from game.simulation.spatialhash import SpatialHash
+
+SIZE = 64
+
+
+def overlaps(ax, ay, aw, ah, bx, by, bw, bh):
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+
+def test_query_finds_every_overlap_dense_and_sparse():
+    rng = random.Random(3)
+    spatial = SpatialHash((SIZE, SIZE), (SIZE, SIZE))
+    boxes = {key: (rng.uniform(0, 2000), rng.uniform(0, 2000), rng.uniform(8, SIZE), rng.uniform(8, SIZE))
+             for key in range(300)}
+    for key, (x, y, _, _) in boxes.items():
+        spatial.insert(key, x, y)
+
+    # small boxes cover few cells, the big ones more than are occupied
+    for width in (16, 100, 3000):
+        for _ in range(50):
+            x, y = rng.uniform(-100, 2000), rng.uniform(-100, 2000)
+            found = spatial.query(x, y, width, width)
+            assert len(found) == len(set(found))
+            expected = {key for key, box in boxes.items() if overlaps(x, y, width, width, *box)}
+            assert expected <= set(found)
+
+
+def test_move_remove_and_move_many():
+    spatial = SpatialHash((SIZE, SIZE), (SIZE, SIZE))
+    spatial.insert("a", 10, 10)
+    spatial.insert("b", 500, 500)
+    spatial.move("a", 700, 700)
+    assert "a" not in spatial.query(0, 0, 32, 32)
+    assert spatial.query(690, 690, 32, 32) == ["a"]
+
+    spatial.move_many(["a", "c"], [0.0, 300.0], [0.0, 300.0])
+    assert len(spatial) == 3
+    assert spatial.query(0, 0, 32, 32) == ["a"]
+    assert spatial.query(300, 300, 8, 8) == ["c"]
+
+    spatial.remove("b")
+    spatial.remove("b")
+    assert "b" not in spatial and spatial.query(480, 480, 64, 64) == []
+    spatial.clear()
+    assert len(spatial) == 0
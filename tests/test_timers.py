@@ -0,0 +1,51 @@
+from game.simulation.timers import TimerQueue
+
+
+def test_timers_fire_in_due_then_schedule_order():
+    timers = TimerQueue()
+    fired = []
+    for name, delay in (("c", 2.0), ("a", 1.0), ("b", 1.0), ("d", 5.0)):
+        timers.schedule(delay, lambda name=name: fired.append(name))
+
+    assert timers.run_due(0.5) == 0
+    assert timers.run_due(2.0) == 3
+    assert fired == ["a", "b", "c"]
+    assert len(timers) == 1
+
+
+def test_delays_count_from_the_queue_clock():
+    timers = TimerQueue()
+    timers.run_due(10.0)
+    fired = []
+    timers.schedule(1.0, lambda: fired.append(timers.now))
+    timers.run_due(10.5)
+    timers.run_due(11.0)
+    assert fired == [11.0]
+
+
+def test_cancelled_timers_never_fire():
+    timers = TimerQueue()
+    fired = []
+    keep = timers.schedule(1.0, lambda: fired.append("keep"))
+    drop = timers.schedule(1.0, lambda: fired.append("drop"))
+    drop.cancel()
+    assert len(timers) == 1
+    assert timers.run_due(1.0) == 1
+    assert fired == ["keep"]
+    keep.cancel()  # already fired, nothing happens
+    assert timers.run_due(2.0) == 0
+
+
+def test_callbacks_can_schedule_timers_already_due():
+    timers = TimerQueue()
+    fired = []
+    timers.schedule(1.0, lambda: timers.schedule(0.0, lambda: fired.append("chained")))
+    assert timers.run_due(1.0) == 2
+    assert fired == ["chained"]
+
+
+def test_clear_drops_everything():
+    timers = TimerQueue()
+    timers.schedule(1.0, lambda: None)
+    timers.clear()
+    assert len(timers) == 0 and timers.run_due(5.0) == 0
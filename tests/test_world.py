@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from benchmarks.common import perfect_maze
+from game.gameobjects.costgrid import CostGrid
+from game.simulation.headless import RandomClicks
+from game.simulation.world import LARGEST_SIZE, World
+
+
+def test_blocked_map_is_rejected_with_the_start_tile():
+    grid = CostGrid(np.ones((8, 8), dtype=np.int32))
+    with pytest.raises(ValueError, match=r"start tile \(1, 1\)"):
+        World(grid, (64, 64), seed=1)
+
+
+def test_spawns_only_on_reachable_tiles():
+    costs = np.ones((8, 8), dtype=np.int32)
+    costs[1:4, 1:4] = 0
+    world = World(CostGrid(costs), (64, 64), seed=1)
+    for x, y in world.random_passable_tiles(50):
+        assert costs[y, x] == 0
+    world.pathing.close()
+
+
+def test_spatial_hashes_track_the_live_entities():
+    world = World(CostGrid(perfect_maze(31, 31, seed=2)), (64, 64), seed=3, cooperative=False)
+    world.init_coins(200)
+    clicks = RandomClicks(interval=30, seed=4)
+    for _ in range(600):
+        clicks(world)
+        world.tick()
+
+    assert world.coins.collected.any()
+    assert sorted(world.coin_index.query(0, 0, 10 ** 6, 10 ** 6)) == \
+        np.flatnonzero(~world.coins.collected).tolist()
+
+    # a camera-sized view finds everything on screen, as GamePlay culls with it
+    rng = np.random.default_rng(5)
+    for min_x, min_y in rng.uniform(-500, 2000, size=(20, 2)).tolist():
+        max_x, max_y = min_x + 1280, min_y + 720
+        for index, store in ((world.enemy_index, world.enemies), (world.coin_index, world.coins)):
+            found = set(index.query(min_x, min_y, max_x - min_x, max_y - min_y))
+            on_screen = (store.x + LARGEST_SIZE[0] > min_x) & (store.x < max_x) & \
+                (store.y + LARGEST_SIZE[1] > min_y) & (store.y < max_y)
+            if store is world.coins:
+                on_screen &= ~world.coins.collected
+            assert set(np.flatnonzero(on_screen).tolist()) <= found
+    world.pathing.close()